@@ -0,0 +1,138 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from config import Config
+from utils import profiling, tracing
+from utils.mock_llm_server import ScriptedResponses, load_script, start_mock_server
+
+
+def run_session(session, quiet: bool = True, prefetch: bool = True, config=Config):
+    """Play a scripted session through the REPL turn loop, returns one timing row per turn and the tool token report"""
+    # Imported here so the client picks up the mock server's base URL
+    from utils.llm import LLMAgent
+    from utils.contract_functions import ContractFunctions
+    from utils.tool_executor import ToolExecutor
+    from utils.conversation import ConversationManager
+    from utils.prefetch import Prefetcher
+    from main import handle_turn
+
+    llm = LLMAgent(config)
+    contract_functions = ContractFunctions(config)
+    executor = ToolExecutor(contract_functions)
+    prefetcher = Prefetcher(contract_functions) if prefetch else None
+    # Scripted responses are consumed in order, so history is never summarized during a benchmark
+    conversation = ConversationManager(llm, token_budget=10**9)
+
+    rows = []
+    for turn in session["turns"]:
+        conversation.add_user_message(turn["user"])
+        contract_functions.timings.reset()
+        if prefetcher:
+            prefetcher.start(turn["user"])
+
+        output = io.StringIO() if quiet else sys.stdout
+        # The profile report is printed after stdout is restored
+        with profiling.turn(), contextlib.redirect_stdout(output), tracing.span("turn", input=turn["user"]):
+            metrics = handle_turn(
+                llm, contract_functions.available_tools, conversation, executor,
+                direct_response_tools=ContractFunctions.DIRECT_RESPONSE_TOOLS,
+                max_iterations=config.MAX_TOOL_ITERATIONS
+            )
+
+        timings = contract_functions.timings.reset()
+        rows.append({
+            "user": turn["user"],
+            "total": metrics["total"],
+            "ttft": metrics["ttft"],
+            "llm": metrics["llm_time"],
+            "rpc": timings.get("rpc", 0.0),
+            "signing": timings.get("signing", 0.0),
+            "receipt": timings.get("receipt", 0.0),
+            "prefetch": timings.get("prefetch", 0.0),
+            "prompt_tokens": metrics["usage_prompt_tokens"],
+            "cached_tokens": metrics["cached_tokens"],
+            "llm_calls": metrics["llm_calls"],
+            "model": metrics["model"],
+            "tool_calls": metrics["tool_calls"],
+        })
+
+    token_report = "\n".join([
+        executor.token_report(), llm.router.report(), llm.llm_client.report(), contract_functions.cache.report(),
+        contract_functions.rpc_stats.report()
+    ])
+    if prefetcher:
+        prefetcher.shutdown()
+    executor.shutdown()
+    conversation.shutdown()
+    contract_functions.shutdown()
+    return rows, token_report
+
+
+def print_rows(rows) -> None:
+    # Tools start while the reply is still streaming and reads run concurrently,
+    # so the columns can add up to more than the turn total
+    print(f"{'turn':<50} {'total':>7} {'ttft':>7} {'llm':>7} {'rpc':>7} {'signing':>8} {'receipt':>8} {'prefetch':>8} {'cached':>7} {'calls':>6}")
+    for row in rows:
+        ttft = f"{row['ttft']:.3f}" if row["ttft"] is not None else "-"
+        cached = f"{row['cached_tokens'] / row['prompt_tokens']:.0%}" if row["prompt_tokens"] else "-"
+        print(
+            f"{row['user'][:50]:<50} {row['total']:>7.3f} {ttft:>7} {row['llm']:>7.3f} {row['rpc']:>7.3f} "
+            f"{row['signing']:>8.3f} {row['receipt']:>8.3f} {row['prefetch']:>8.3f} {cached:>7} {row['llm_calls']:>3}/{row['tool_calls']:<2}"
+        )
+    totals = {key: sum(row[key] for row in rows) for key in ("total", "llm", "rpc", "signing", "receipt", "prefetch")}
+    print(
+        f"{'total':<50} {totals['total']:>7.3f} {'':>7} {totals['llm']:>7.3f} {totals['rpc']:>7.3f} "
+        f"{totals['signing']:>8.3f} {totals['receipt']:>8.3f} {totals['prefetch']:>8.3f}"
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark against a scripted mock LLM")
+    parser.add_argument("script", nargs="?", default="benchmarks/basic_session.json", help="Scripted session JSON file")
+    parser.add_argument("--json", help="Also write the per-turn rows to this file")
+    parser.add_argument("--no-prefetch", action="store_true", help="Do not prefetch chain reads while the model is thinking")
+    parser.add_argument("--local-chain", action="store_true", help="Run against an in-process EVM instead of anvil (needs eth-tester)")
+    parser.add_argument("--trace", default=Config.TRACE_PATH, help="Write tracing spans to this file, .jsonl or a Chrome trace")
+    parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR", help="Profile every turn with cProfile and tracemalloc, reports go to DIR")
+    parser.add_argument("--verbose", action="store_true", help="Show the assistant output of every turn")
+    args = parser.parse_args(argv)
+
+    session = load_script(args.script)
+    tracing.start(args.trace)
+    profiling.start(args.profile)
+    config = Config
+    if args.local_chain:
+        from utils.local_chain import LocalChain
+        config = LocalChain(Config).config
+
+    script = ScriptedResponses.from_session(session)
+    server = start_mock_server(script)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+
+    try:
+        rows, token_report = run_session(session, quiet=not args.verbose, prefetch=not args.no_prefetch, config=config)
+    finally:
+        server.shutdown()
+        tracing.stop()
+        summary = profiling.stop()
+
+    print_rows(rows)
+    print(f"\n{token_report}")
+    if summary:
+        print(f"Profile of all turns written to {summary}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+# Example usage, from agent/src with anvil running and the contracts deployed:
+#   python benchmark.py benchmarks/basic_session.json --json /tmp/latency.json
+# or without anvil, after `forge build`:
+#   python benchmark.py benchmarks/basic_session.json --local-chain
+if __name__ == "__main__":
+    sys.exit(main())
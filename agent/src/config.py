@@ -1,15 +1,28 @@
-from utils.load_abi import load_abi
+from pathlib import Path
+from utils.load_abi import load_abi_bundle
+from utils.parse_deployment import load_deployment
 
 class Config:
     RPC_URL = "http://localhost:8545"
+    # Append every JSON-RPC request and response to this file, play it back with RPC_URL = "replay://<file>"
+    RPC_RECORD_PATH = None
+    # RPC request stats per tool (the REPL's /stats) are also written here every RPC_STATS_INTERVAL seconds, None disables it
+    RPC_STATS_PATH = Path(__file__).parent / ".cache" / "rpc_stats.json"
+    RPC_STATS_INTERVAL = 30.0
+    # Nested timing spans (turn, LLM, tool, RPC, signing, receipt) are written here, .jsonl for one span
+    # per line, anything else as a Chrome trace for ui.perfetto.dev. None turns tracing off
+    TRACE_PATH = None
     CHAIN_ID = 31337
     PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80" # anvil dev key
     
-    POOL_SWAP_TEST = "0xdc64a140aa3e981100a9beca4e685f962f0cf6c9"
-    POOL_MANAGER_ADDRESS = "0x5fbdb2315678afecb367f032d93f642f64180aa3"
-    GRID_HOOK_ADDRESS = "0x9D71E6f99da38505b3c50cb0ec2ed754Ea13D040"
-    TOKEN0 = "0x0165878A594ca255338adfa4d48449f69242Eb8F"
-    TOKEN1 = "0xa513E6E4b8f2a923D98304ec87F64353C4D5C853"
+    # Addresses from the latest forge broadcast for CHAIN_ID, so a redeploy needs no edits here.
+    # The fallbacks are where script/Anvil.s.sol deploys on a fresh anvil
+    DEPLOYMENT = load_deployment(chain_id=CHAIN_ID)
+    POOL_SWAP_TEST = DEPLOYMENT.get("POOL_SWAP_TEST", "0xdc64a140aa3e981100a9beca4e685f962f0cf6c9")
+    POOL_MANAGER_ADDRESS = DEPLOYMENT.get("POOL_MANAGER_ADDRESS", "0x5fbdb2315678afecb367f032d93f642f64180aa3")
+    GRID_HOOK_ADDRESS = DEPLOYMENT.get("GRID_HOOK_ADDRESS", "0x9D71E6f99da38505b3c50cb0ec2ed754Ea13D040")
+    TOKEN0 = DEPLOYMENT.get("TOKEN0", "0x0165878A594ca255338adfa4d48449f69242Eb8F")
+    TOKEN1 = DEPLOYMENT.get("TOKEN1", "0xa513E6E4b8f2a923D98304ec87F64353C4D5C853")
     POOL_KEY = {
         "currency0": TOKEN0,
         "currency1": TOKEN1,
@@ -18,15 +31,39 @@ class Config:
         "hooks": GRID_HOOK_ADDRESS
     }
     
-    GRID_HOOK_ABI = load_abi("GridHook")
-    POOL_MANAGER_ABI = load_abi("PoolManager")
-    POOL_SWAP_TEST_ABI = load_abi("PoolSwapTest")
-    MOCK_TOKEN_ABI = load_abi("MockERC20")
+    ABIS = load_abi_bundle(["GridHook", "PoolManager", "PoolSwapTest", "MockERC20"])
+    GRID_HOOK_ABI = ABIS["GridHook"]
+    POOL_MANAGER_ABI = ABIS["PoolManager"]
+    POOL_SWAP_TEST_ABI = ABIS["PoolSwapTest"]
+    MOCK_TOKEN_ABI = ABIS["MockERC20"]
 
     DEFAULT_GRID_SIZE = 0.1
     DEFAULT_GRID_SPACING = 200
     
     LLM_MODEL = "gpt-4-turbo-preview"
+    # Single tool requests are routed to this model, set to None to always use LLM_MODEL
+    SMALL_LLM_MODEL = "gpt-4o-mini"
+    # Per request deadline in seconds, retries on timeouts/5xx/rate limits, and the percentile of
+    # recent time-to-first-token after which a duplicate (hedged) request is sent, None disables hedging
+    LLM_DEADLINE = 30.0
+    # Longest one attempt may wait for its first chunk before it is retried, within the deadline
+    LLM_ATTEMPT_TIMEOUT = 10.0
+    LLM_MAX_RETRIES = 3
+    LLM_HEDGE_PERCENTILE = 0.9
+    # USD per million (input, output) tokens, for the per-model cost report
+    MODEL_PRICES = {
+        "gpt-4-turbo-preview": (10.0, 30.0),
+        "gpt-4o-mini": (0.15, 0.60),
+    }
+
+    # Conversation memory: approximate prompt tokens of history sent per request,
+    # and how many of the latest turns are always kept verbatim
+    CONTEXT_TOKEN_BUDGET = 3000
+    KEEP_RECENT_TURNS = 4
+
+    # Maximum number of chained tool call steps per turn before the model must answer
+    MAX_TOOL_ITERATIONS = 5
+
     PROMPT = f"""You are a Grid Trading Assistant, specialized in helping users interact with Uniswap v4's Grid Hook and Pool Manager contracts. You understand the following key concepts:
 
 1. **Grid Trading Operations:**
@@ -51,11 +88,7 @@ class Config:
    - Tick spacing is set to {POOL_KEY['tickSpacing']}
 
 4. **Contract Addresses:**
-   - Grid Hook: {GRID_HOOK_ADDRESS}
-   - Pool Swap Test: {POOL_SWAP_TEST}
-   - Pool Manager: {POOL_MANAGER_ADDRESS}
-   - Token0: {TOKEN0}
-   - Token1: {TOKEN1}
+   - Listed in the deployment message that follows this prompt
 
 Please help users by:
 - Explaining operations in simple terms
@@ -70,6 +103,16 @@ Do not:
 - Guess at transaction outcomes
 
 When in doubt, ask for clarification or suggest checking the contract state.
+"""
+
+    # Deployment specific details, sent as a separate system message after PROMPT so the
+    # (much larger) PROMPT and tool schemas stay byte-identical across deployments
+    DEPLOYMENT_PROMPT = f"""**Contract Addresses:**
+- Grid Hook: {GRID_HOOK_ADDRESS}
+- Pool Swap Test: {POOL_SWAP_TEST}
+- Pool Manager: {POOL_MANAGER_ADDRESS}
+- Token0: {TOKEN0}
+- Token1: {TOKEN1}
 
 Note: You are connected to {RPC_URL} with chain ID {CHAIN_ID}.
 """
\ No newline at end of file
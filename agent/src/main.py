@@ -1,76 +1,211 @@
-import json
-from datetime import datetime
-from utils.llm import LLMAgent
-from utils.contract_functions import ContractFunctions
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
-from utils.initialize_web3 import initialize_web3
-from utils.contract_functions import ContractFunctions
+from utils.tool_executor import ToolExecutor
+from utils.conversation import ConversationManager
+from utils.command_parser import CommandParser, FastPathStats
+from utils.prefetch import Prefetcher
+from utils import profiling, tracing
 
 
-def main():
+def print_token(token):
+    print(token, end="", flush=True)
+
+
+def handle_turn(llm, tools, conversation, executor, direct_response_tools=frozenset(), max_iterations=5):
+    """
+    Run one user turn: stream the reply, start every tool as soon as its arguments
+    are complete (read-only tools run concurrently) and let the model chain further
+    calls for up to `max_iterations` steps. When the router sees a single intent for one
+    of the `direct_response_tools`, its results are printed as they are, without another
+    LLM call. The model is picked by the router from the user's message. Returns
+    per-turn latency metrics.
+    """
+    started = time.perf_counter()
+    ttft = None
+    llm_time = 0.0
+    llm_calls = 0
+    usage_prompt_tokens = 0
+    cached_tokens = 0
+    tool_calls = 0
+    prompt_tokens = conversation.prompt_tokens()
+
+    context = conversation.context()
+    user_input = next(m["content"] for m in reversed(context) if m["role"] == "user")
+    decision = llm.route(user_input, context)
+    # Anything else, e.g. "check my balance then swap half", needs the model to see the results
+    direct_response = decision.intent in direct_response_tools
+
+    print("\nAssistant: ", end="", flush=True)
+    for iteration in range(max_iterations + 1):
+        pending = []
+
+        def start_tool(tool_call, parent_id):
+            pending.append(executor.submit(tool_call, parent_id))
+
+        # The last step gets no tools, so the loop always ends with an answer
+        step_tools = tools if iteration < max_iterations else None
+        completion, decision = llm.routed_chat_completion(
+            conversation.context(), step_tools, decision, on_content=print_token, on_tool_call=start_tool
+        )
+        conversation.append(completion.message)
+        llm_calls += 1
+        llm_time += completion.total_time
+        usage_prompt_tokens += completion.prompt_tokens
+        cached_tokens += completion.cached_tokens
+        if ttft is None:
+            ttft = completion.time_to_first_token
+
+        if not completion.tool_calls:
+            break
+
+        # Add tool results in the same order as the calls in the assistant message
+        outputs = [future.result() for future in pending]
+        for output in outputs:
+            conversation.append(output.message)
+        tool_calls += len(outputs)
+
+        # Self-explanatory results are shown directly instead of being restated by the model
+        if direct_response and all(output.message["name"] in direct_response_tools for output in outputs):
+            print("\n".join(output.result.render().strip() for output in outputs), end="")
+            break
+    print()
+    conversation.end_turn()
+
+    return {
+        "prompt_tokens": prompt_tokens,
+        "ttft": ttft,
+        "total": time.perf_counter() - started,
+        "llm_time": llm_time,
+        "usage_prompt_tokens": usage_prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "llm_calls": llm_calls,
+        "model": decision.model,
+        "route": decision.reason,
+        "tool_calls": tool_calls
+    }
+
+
+def handle_fast_path(parser, command, contract_functions, conversation):
+    """Run a command recognized by the local parser straight against the contracts, without the LLM"""
+    with contract_functions.rpc_stats.tool(command.tool):
+        result = getattr(contract_functions, command.tool)(**command.args)
+    reply = parser.render(command, result)
+    print(f"\nAssistant: {reply}")
+    conversation.append({"role": "assistant", "content": reply})
+    conversation.end_turn()
+
+
+def create_llm():
+    # openai and web3 take most of the startup time, so they are only imported in the background
+    from utils.llm import LLMAgent
+    return LLMAgent(Config)
+
+
+def create_contract_functions():
+    from utils.contract_functions import ContractFunctions
+    return ContractFunctions(Config)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Grid trading assistant REPL")
+    arg_parser.add_argument(
+        "--profile", nargs="?", const="profiles", metavar="DIR",
+        help="Profile every turn with cProfile and tracemalloc, writing pstats files and a summary to DIR (default: profiles)"
+    )
+    args = arg_parser.parse_args(argv)
+
     try:
-        web3 = initialize_web3(Config.RPC_URL)
+        # Before anything is created, so the web3 instance gets its RPC spans
+        tracing.start(Config.TRACE_PATH)
+
+        # The prompt is shown right away, the first command waits for whatever is still loading
+        startup = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+        llm_future = startup.submit(create_llm)
+        contract_functions_future = startup.submit(create_contract_functions)
+        startup.shutdown(wait=False)
+
         print(f"Connected to network at {Config.RPC_URL}")
-        
-        llm = LLMAgent(Config)
-        
-        # Initialize Contract Functions
-        contract_functions = ContractFunctions(Config)
+        print("\nGrid Trading Bot initialized. Type 'exit' or 'bye' to quit, '/stats' for RPC request stats.")
+        print(f"Connected to Grid Hook at: {Config.GRID_HOOK_ADDRESS}\n")
+        first_input = input("> ").strip()
+
+        llm = llm_future.result()
+        contract_functions = contract_functions_future.result()
+        # After startup, so imports are not part of the first turn's allocations
+        profiling.start(args.profile)
+        print(f"Using account (public key): {contract_functions.account.address}")
         
         # Contract functions
         tools = contract_functions.available_tools
         
-        messages = []
-        
-        print("\nGrid Trading Bot initialized. Type 'exit' or 'bye' to quit.")
-        print(f"Connected to Grid Hook at: {Config.GRID_HOOK_ADDRESS}")
-        print(f"Using account (public key): {web3.eth.account.from_key(Config.PRIVATE_KEY).address}\n")
+        # Conversation history, kept within the token budget
+        conversation = ConversationManager(llm, Config.CONTEXT_TOKEN_BUDGET, Config.KEEP_RECENT_TURNS)
+
+        # Regular commands skip the LLM entirely
+        parser = CommandParser(Config.POOL_KEY)
+        fast_path_stats = FastPathStats()
+
+        # Tools run in the background while the rest of the reply is still streaming
+        executor = ToolExecutor(contract_functions)
+
+        # Likely chain reads start while the model is still thinking
+        prefetcher = Prefetcher(contract_functions)
         
         while True:
-            user_input = input("> ").strip()
+            user_input = first_input if first_input is not None else input("> ").strip()
+            first_input = None
             if user_input.lower() in ['exit', 'bye']:
+                print(f"[{fast_path_stats}]")
+                print(executor.token_report())
+                print(llm.router.report())
+                print(llm.llm_client.report())
+                print(prefetcher.report())
                 print("Goodbye!")
+                prefetcher.shutdown()
+                executor.shutdown()
+                conversation.shutdown()
+                contract_functions.shutdown()
+                tracing.stop()
+                summary = profiling.stop()
+                if summary:
+                    print(f"Profile of all turns written to {summary}")
                 break
+
+            if user_input.lower() == "/stats":
+                print(contract_functions.rpc_stats.report() + "\n")
+                continue
             
             # Add user message to conversation
-            messages.append({"role": "user", "content": user_input})
-            
-            # Get LLM response
-            completion = llm.create_chat_completion(messages, tools)
-            
-            # Handle the response
-            assistant_message = completion.choices[0].message
-            tool_calls = assistant_message.tool_calls
-            
-            if tool_calls:
-                for tool_call in tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # Call the appropriate function
-                    if hasattr(contract_functions, function_name):
-                        result = getattr(contract_functions, function_name)(**function_args)
-                    else:
-                        result = f"Function {function_name} not found"
-                    
-                    # Add function call and result to messages
-                    messages.append(assistant_message)
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "name": function_name,
-                        "content": str(result)
-                    })
-                
-                # Get final response
-                completion = llm.client.chat.completions.create(
-                    model="gpt-4-turbo-preview",
-                    messages=messages
-                )
-                print("\nAssistant:", completion.choices[0].message.content)
-            else:
-                messages.append(assistant_message)
-                print("\nAssistant:", assistant_message.content)
+            conversation.add_user_message(user_input)
+
+            command = parser.parse(user_input)
+            if command:
+                started = time.perf_counter()
+                with profiling.turn(command.tool), tracing.span("turn", input=user_input, fast_path=command.tool):
+                    handle_fast_path(parser, command, contract_functions, conversation)
+                fast_path_stats.record_hit(command.tool, time.perf_counter() - started)
+                print(f"[fast path {command.tool}, turn {time.perf_counter() - started:.2f}s, {fast_path_stats}]\n")
+                continue
+
+            prefetcher.start(user_input)
+            try:
+                with profiling.turn(), tracing.span("turn", input=user_input):
+                    metrics = handle_turn(
+                        llm, tools, conversation, executor,
+                        direct_response_tools=contract_functions.DIRECT_RESPONSE_TOOLS,
+                        max_iterations=Config.MAX_TOOL_ITERATIONS
+                    )
+            except Exception as e:
+                # A failed completion (deadline, retries exhausted) only loses this turn
+                conversation.drop_last_turn()
+                print(f"\nError: {str(e)}\nThe request was not completed, tools that already ran are not undone.\n")
+                continue
+            fast_path_stats.record_miss(metrics["total"])
+            ttft = f"{metrics['ttft']:.2f}s" if metrics["ttft"] is not None else "n/a"
+            cached = f"{metrics['cached_tokens'] / metrics['usage_prompt_tokens']:.0%}" if metrics["usage_prompt_tokens"] else "n/a"
+            print(f"[{metrics['model']} ({metrics['route']}), ~{metrics['prompt_tokens']} prompt tokens ({cached} cached), time to first token {ttft}, turn {metrics['total']:.2f}s, {metrics['llm_calls']} LLM call(s), {metrics['tool_calls']} tool call(s)]\n")
 
     except Exception as e:
         print(f"\nError: {str(e)}")
@@ -79,4 +214,4 @@ def main():
 
 if __name__ == "__main__":
     exit_code = main()
-    exit(exit_code if exit_code is not None else 0)
\ No newline at end of file
+    exit(exit_code if exit_code is not None else 0)
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from config import Config
+from utils.tool_results import ErrorResult
+
+
+# Tool calls measured in every iteration, reads first so the writes do not change what they return
+OPERATIONS = [
+    ("check_positions", {}),
+    ("get_balances", {}),
+    ("swap", {"zero_for_one": True, "amount": "0.01"}),
+    ("place_order", {"tick": 120, "zero_for_one": True, "amount": "1"}),
+]
+
+
+def run_operations(contract_functions, timings) -> None:
+    # Every operation starts cold, so replay runs the same requests in the same order as the recording
+    contract_functions.nonce_manager.reset()
+    for name, args in OPERATIONS:
+        contract_functions.cache.invalidate()
+        started = time.perf_counter()
+        result = getattr(contract_functions, name)(**args)
+        timings.setdefault(name, []).append(time.perf_counter() - started)
+        if isinstance(result, ErrorResult):
+            raise RuntimeError(result.render())
+
+
+def record(path: str) -> None:
+    """Run every operation once against Config.RPC_URL and write its JSON-RPC traffic to `path`"""
+    from utils.contract_functions import ContractFunctions
+
+    if os.path.exists(path):
+        os.remove(path)
+    config = type("RecordConfig", (Config,), {"RPC_RECORD_PATH": path})
+    contract_functions = ContractFunctions(config)
+    timings = {}
+    try:
+        run_operations(contract_functions, timings)
+    finally:
+        contract_functions.shutdown()
+    print_timings(timings)
+
+
+def replay(path: str, iterations: int, realtime: bool = False):
+    """Run the operations `iterations` times against the recording, returns seconds per call by operation"""
+    from utils.contract_functions import ContractFunctions
+
+    scheme = "replay+timed" if realtime else "replay"
+    config = type("ReplayConfig", (Config,), {"RPC_URL": f"{scheme}://{path}"})
+    contract_functions = ContractFunctions(config)
+    provider = contract_functions.web3.provider
+    timings = {}
+    try:
+        for _ in range(iterations):
+            provider.rewind()
+            run_operations(contract_functions, timings)
+    finally:
+        contract_functions.shutdown()
+    if provider.misses:
+        print(f"{provider.misses} request(s) were not in the recording, record it again with the current code")
+    return timings
+
+
+def print_timings(timings) -> None:
+    print(f"{'operation':<20} {'calls':>6} {'min ms':>8} {'median ms':>10} {'mean ms':>8}")
+    for name, samples in timings.items():
+        print(
+            f"{name:<20} {len(samples):>6} {min(samples) * 1000:>8.3f} "
+            f"{statistics.median(samples) * 1000:>10.3f} {statistics.mean(samples) * 1000:>8.3f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the contract tools against recorded JSON-RPC traffic")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("recording", nargs="?", default="benchmarks/rpc_recording.jsonl", help="JSONL file of recorded requests")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--realtime", action="store_true", help="Wait as long as each recorded request took")
+    parser.add_argument("--json", help="Also write the per-operation samples to this file")
+    args = parser.parse_args(argv)
+
+    if args.mode == "record":
+        record(args.recording)
+        return 0
+
+    timings = replay(args.recording, args.iterations, args.realtime)
+    print_timings(timings)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(timings, f, indent=2)
+    return 0
+
+
+# Example usage, from agent/src:
+#   python rpc_benchmark.py record /tmp/rpc.jsonl     (anvil running, contracts deployed)
+#   python rpc_benchmark.py replay /tmp/rpc.jsonl --iterations 500
+if __name__ == "__main__":
+    sys.exit(main())
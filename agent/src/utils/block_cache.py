@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+from web3 import Web3
+
+
+class BlockCache:
+    def __init__(self, web3: Web3, poll_interval: float = 1.0):
+        """
+        Chain reads cached for the block they were made at. The block number is checked at most
+        every `poll_interval` seconds and the cache is dropped when it changes; writes sent from
+        here call `invalidate` so their effects are seen right away. Concurrent reads of the same
+        key share one request, so a tool call that arrives while its prefetch is still running
+        waits for it instead of repeating it.
+        """
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.block = None
+        self._checked_at = 0.0
+        self._entries: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Value of `key` at the current block, calling `loader` only if it is not cached yet"""
+        self._check_block()
+        prefetching = self.prefetching_active
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = Future()
+                entry.prefetched = prefetching
+                entry.used = False
+                self._entries[key] = entry
+                owner = True
+                if prefetching:
+                    self.prefetched += 1
+                else:
+                    self.misses += 1
+            else:
+                owner = False
+                if not prefetching:
+                    self.hits += 1
+                    if entry.prefetched and not entry.used:
+                        entry.used = True
+                        self.prefetch_hits += 1
+
+        if not owner:
+            return entry.result()
+
+        try:
+            entry.set_result(loader())
+        except Exception as e:
+            # Failed reads are not cached, the next caller tries again
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry.set_exception(e)
+        return entry.result()
+
+
+    def invalidate(self) -> None:
+        """Drop everything, e.g. after sending a transaction"""
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = 0.0
+
+
+    @contextmanager
+    def prefetching(self):
+        """Reads made inside this block are counted as prefetches rather than hits or misses"""
+        self._local.prefetching = True
+        try:
+            yield
+        finally:
+            self._local.prefetching = False
+
+
+    @property
+    def prefetching_active(self) -> bool:
+        return getattr(self._local, "prefetching", False)
+
+
+    def _check_block(self) -> None:
+        if time.monotonic() - self._checked_at < self.poll_interval:
+            return
+        block = self.web3.eth.block_number
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if block != self.block:
+                self.block = block
+                self._entries.clear()
+
+
+    def report(self) -> str:
+        with self._lock:
+            lookups = self.hits + self.misses
+            hit_rate = self.hits / lookups if lookups else 0.0
+            prefetch_rate = self.prefetch_hits / self.prefetched if self.prefetched else 0.0
+            return (
+                f"chain cache: {self.hits}/{lookups} reads from memory ({hit_rate:.0%}), "
+                f"{self.prefetch_hits}/{self.prefetched} prefetched reads used ({prefetch_rate:.0%})"
+            )
@@ -0,0 +1,133 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+from utils.tool_results import ToolResult, ErrorResult, TransactionResult
+
+
+MAX_TICK = 887272
+
+AMOUNT = r"(?P<amount>\d+(?:\.\d+)?)"
+TOKEN_IN = r"(?P<token_in>token[01])"
+TOKEN_OUT = r"(?P<token_out>token[01])"
+TICK = r"(?P<tick>-?\d+)"
+
+# Each pattern matches the whole (lowercased, trimmed) input, anything else goes to the LLM
+PATTERNS = [
+    ("swap", re.compile(rf"swap {AMOUNT} {TOKEN_IN} (?:for|to) {TOKEN_OUT}")),
+    ("place_order", re.compile(rf"(?:create position|place order) {AMOUNT} {TOKEN_IN} for {TOKEN_OUT} at tick {TICK}")),
+    ("get_hook_permissions", re.compile(r"(?:what )?(?:grid ?hook|hook) permissions(?: exist| are enabled)?|(?:show|get) (?:the )?(?:grid ?hook|hook) permissions")),
+    ("check_positions", re.compile(r"how many open orders do (?:we|i) have|(?:show|check) (?:all |my )?(?:positions|orders|open orders)")),
+    ("check_positions", re.compile(rf"(?:show|check) (?:the )?(?:position|positions|orders?) at tick {TICK}")),
+    ("check_positions", re.compile(r"(?:show|check) (?:the )?(?:positions|orders) between tick (?P<lower_tick>-?\d+) and (?:tick )?(?P<upper_tick>-?\d+)")),
+    ("get_balances", re.compile(r"what(?: is|'s) my balance|(?:show|check) my balances?|what tokens do i have")),
+    ("get_balances", re.compile(r"(?:show|check) (?:the )?(?P<address>gridhook|pool) balances?")),
+    ("get_balances", re.compile(r"balance of (?P<address>0x[0-9a-f]{40})")),
+]
+
+
+@dataclass
+class ParsedCommand:
+    tool: str
+    args: Dict[str, Any]
+
+
+@dataclass
+class FastPathStats:
+    """Hit rate of the fast path and the time it saved compared to LLM turns"""
+    hits: int = 0
+    misses: int = 0
+    fast_path_time: float = 0.0
+    llm_time: float = 0.0
+    tools: Dict[str, int] = field(default_factory=dict)
+
+    def record_hit(self, tool: str, elapsed: float) -> None:
+        self.hits += 1
+        self.fast_path_time += elapsed
+        self.tools[tool] = self.tools.get(tool, 0) + 1
+
+    def record_miss(self, elapsed: float) -> None:
+        self.misses += 1
+        self.llm_time += elapsed
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def time_saved(self) -> float:
+        """Estimated as if every fast path hit had taken as long as an average LLM turn"""
+        if not self.misses:
+            return 0.0
+        return self.hits * (self.llm_time / self.misses) - self.fast_path_time
+
+    def __str__(self) -> str:
+        return (
+            f"fast path {self.hits}/{self.hits + self.misses} turns ({self.hit_rate:.0%}), "
+            f"~{self.time_saved:.1f}s saved"
+        )
+
+
+class CommandParser:
+    def __init__(self, pool_key: Dict[str, Any]):
+        """Parse the regular commands from the prompt locally, so they can skip the LLM"""
+        self.tick_spacing = pool_key["tickSpacing"]
+
+
+    def parse(self, user_input: str) -> Optional[ParsedCommand]:
+        """Return the tool call for a recognized command, or None if the LLM should handle it"""
+        text = " ".join(user_input.lower().strip().rstrip("?.!").split())
+        for tool, pattern in PATTERNS:
+            match = pattern.fullmatch(text)
+            if match:
+                return self._validate(tool, match.groupdict())
+        return None
+
+
+    def _validate(self, tool: str, groups: Dict[str, str]) -> Optional[ParsedCommand]:
+        args = {}
+
+        if "amount" in groups:
+            if float(groups["amount"]) <= 0:
+                return None
+            args["amount"] = groups["amount"]
+
+        if "token_in" in groups:
+            # "token0 for token1" sells token0
+            if groups["token_in"] == groups["token_out"]:
+                return None
+            args["zero_for_one"] = groups["token_in"] == "token0"
+
+        for name in ("tick", "lower_tick", "upper_tick"):
+            if name in groups:
+                tick = int(groups[name])
+                if abs(tick) > MAX_TICK:
+                    return None
+                args[name] = tick
+
+        if "lower_tick" in args and args["lower_tick"] > args["upper_tick"]:
+            return None
+
+        if groups.get("address"):
+            args["address"] = groups["address"]
+
+        return ParsedCommand(tool, args)
+
+
+    def render(self, command: ParsedCommand, result: ToolResult) -> str:
+        """Templated reply for a fast path command"""
+        args = command.args
+        if isinstance(result, ErrorResult):
+            return result.render()
+        if isinstance(result, TransactionResult) and not result.success:
+            return f"The {result.action.lower()} transaction reverted.\n{result.render()}"
+        if command.tool == "swap":
+            sold, bought = ("token0", "token1") if args["zero_for_one"] else ("token1", "token0")
+            return f"Swapped {args['amount']} {sold} for {bought}.\n{result.render()}"
+        if command.tool == "place_order":
+            sold, bought = ("token0", "token1") if args["zero_for_one"] else ("token1", "token0")
+            note = ""
+            if args["tick"] % self.tick_spacing:
+                note = f" (rounded down to a multiple of the tick spacing {self.tick_spacing})"
+            return f"Placed an order selling {args['amount']} {sold} for {bought} at tick {args['tick']}{note}.\n{result.render()}"
+        return result.render()
@@ -1,17 +1,162 @@
 from web3 import Web3
 from eth_account import Account
 from eth_abi import encode
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from config import Config
+from utils.block_cache import BlockCache
 from utils.initialize_web3 import initialize_web3
+from utils.grid_events import position_id
+from utils.nonce_manager import NonceManager
+from utils.parse_deployment import missing_contracts
+from utils.snapshot import WarmStartSnapshot
+from utils.timings import Timings
+from utils.rpc_stats import RPCStats
+from utils import tracing
+from utils.tool_results import (
+    ErrorResult, TransactionResult, Position, PositionsResult, PermissionsResult, TokenBalance, BalancesResult, ToolResult
+)
+
+
+# Function signatures of the tools exposed to the LLM, keep them stable so the prompt prefix can be cached
+TOOL_SCHEMAS = (
+    {
+        "type": "function",
+        "function": {
+            "name": "place_order",
+            "description": "Place a buy or sell order in the pool.\n- To buy token1: set zero_for_one=true (selling token0 to buy token1)\n- To buy token0: set zero_for_one=false (selling token1 to buy token0)\nExamples:\n- 'buy 100 token1 at tick 123' -> tick=123, zero_for_one=true, amount=100\n- 'sell 50 token0 at tick -100' -> tick=-100, zero_for_one=true, amount=50",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tick": {"type": "integer", "description": "The tick price at which to place the order"},
+                    "zero_for_one": {"type": "boolean", "description": "True if buying token1 (selling token0), False if buying token0 (selling token1)"},
+                    "amount": {"type": "string", "description": "Amount of tokens to buy/sell"}
+                },
+                "required": ["tick", "zero_for_one", "amount"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "check_positions",
+            "description": "Check pending orders and claimable tokens at specific ticks.\nIf no tick or range is provided, checks positions around current tick (-60, -1, 0, 1, 60).\nExamples:\n- 'show all positions'\n- 'check position at tick 100'\n- 'what orders are pending at tick 0'\n- 'show orders between tick -600 and 600' -> lower_tick=-600, upper_tick=600",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tick": {
+                        "type": "integer",
+                        "description": "Specific tick to check. If not provided, checks multiple ticks around 0"
+                    },
+                    "lower_tick": {
+                        "type": "integer",
+                        "description": "Lowest tick of a range to scan, used together with upper_tick"
+                    },
+                    "upper_tick": {
+                        "type": "integer",
+                        "description": "Highest tick of a range to scan, used together with lower_tick"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_hook_permissions",
+            "description": "Get the permissions for the GridHook contract to understand which hooks are enabled",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "additionalProperties": False
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "swap",
+            "description": "Perform a swap in the pool.\n- To swap token0 for token1: set zero_for_one=true\n- To swap token1 for token0: set zero_for_one=false\nExamples:\n- 'swap 1.5 token0 for token1' -> zero_for_one=true, amount=1.5\n- 'swap 2 token1 for token0' -> zero_for_one=false, amount=2",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "zero_for_one": {
+                        "type": "boolean",
+                        "description": "True if swapping token0 for token1, False if swapping token1 for token0"
+                    },
+                    "amount": {
+                        "type": "string",
+                        "description": "Amount to swap (in human readable format, e.g. '1.5')"
+                    }
+                },
+                "required": ["zero_for_one", "amount"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_balances",
+            "description": "Get token balances and names for an address. Shows balances of both tokens and ETH.\nExamples:\n- 'what is my balance'\n- 'show gridhook balance'\n- 'check pool balance'\n- 'what tokens do I have'\n- 'balance of 0x123...'",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "address": {
+                        "type": "string",
+                        "description": "Address to check balances for. Can be 'user', 'gridhook', 'pool', or a specific Ethereum address"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+)
+
+
+# Order of the flags returned by getHookPermissions
+HOOK_PERMISSIONS = (
+    "beforeInitialize",
+    "afterInitialize",
+    "beforeAddLiquidity",
+    "afterAddLiquidity",
+    "beforeRemoveLiquidity",
+    "afterRemoveLiquidity",
+    "beforeSwap",
+    "afterSwap",
+    "beforeDonate",
+    "afterDonate",
+    "beforeSwapReturnDelta",
+    "afterSwapReturnDelta",
+    "afterAddLiquidityReturnDelta",
+    "afterRemoveLiquidityReturnDelta",
+)
+
+# Storage slot of the `pools` mapping in PoolManager, see StateLibrary.POOLS_SLOT
+POOLS_SLOT = 6
 
 
 class ContractFunctions:
+    # Tools that only read chain state, safe to run concurrently
+    READ_ONLY_TOOLS = frozenset({"check_positions", "get_hook_permissions", "get_balances"})
+    # Tools whose output is already a readable answer, shown to the user without another LLM call
+    DIRECT_RESPONSE_TOOLS = frozenset({"check_positions", "get_hook_permissions", "get_balances"})
+
     def __init__(self, config: Config):
         """Initialize with Config class"""
-        self.web3 = initialize_web3(config.RPC_URL)
+        self.web3 = initialize_web3(config.RPC_URL, config.RPC_RECORD_PATH)
         self.config = config
         self.account = Account.from_key(config.PRIVATE_KEY)
+        self.nonce_manager = NonceManager(self.web3, self.account.address)
+
+        # Time spent in RPC requests, signing and waiting for receipts
+        self.timings = Timings()
+        self.timings.instrument(self.web3)
+
+        # Reads are served from memory until the next block or until we send a transaction
+        self.cache = BlockCache(self.web3)
+        self._token_metadata = None
+        self._pool_id = None
+        self._position_ids: Dict[Tuple[int, bool], int] = {}
         
         # Convert addresses to checksum format
         self.grid_hook_address = self.web3.to_checksum_address(config.GRID_HOOK_ADDRESS)
@@ -24,6 +169,10 @@ class ContractFunctions:
             address=self.grid_hook_address,
             abi=config.GRID_HOOK_ABI
         )
+        self.pool_manager = self.web3.eth.contract(
+            address=self.web3.to_checksum_address(config.POOL_MANAGER_ADDRESS),
+            abi=config.POOL_MANAGER_ABI
+        )
         
         # Create pool key with checksum addresses and fee 3000 (0.3%)
         self.pool_key = {
@@ -34,29 +183,88 @@ class ContractFunctions:
             'hooks': self.grid_hook_address
         }
 
+        # RPC request counts and latency per tool, method and contract function
+        self.rpc_stats = RPCStats({
+            self.grid_hook_address: ("GridHook", config.GRID_HOOK_ABI),
+            self.pool_manager.address: ("PoolManager", config.POOL_MANAGER_ABI),
+            self.pool_swap_test: ("PoolSwapTest", config.POOL_SWAP_TEST_ABI),
+            self.token0: ("Token0", config.MOCK_TOKEN_ABI),
+            self.token1: ("Token1", config.MOCK_TOKEN_ABI),
+        })
+        self.rpc_stats.instrument(self.web3)
+        tracing.instrument(self.web3, self.rpc_stats.label)
+        if config.RPC_STATS_PATH:
+            self.rpc_stats.start(config.RPC_STATS_PATH, config.RPC_STATS_INTERVAL)
+
+        # Caches from the previous session on this chain, saved periodically and on shutdown
+        self.snapshot = WarmStartSnapshot(self.web3, config.CHAIN_ID, {
+            "pool_key": self.pool_key,
+            "pool_swap_test": self.pool_swap_test,
+            "pool_manager": config.POOL_MANAGER_ADDRESS
+        })
+        state = self.snapshot.load()
+        if state:
+            self.restore_state(state)
+        else:
+            self.check_deployment()
+        self.snapshot.start(self.snapshot_state)
+
+
+    def check_deployment(self) -> None:
+        """Catch a stale broadcast (e.g. anvil restarted without redeploying) before the first tool call"""
+        try:
+            missing = missing_contracts(self.web3, {
+                "GridHook": self.grid_hook_address,
+                "PoolSwapTest": self.pool_swap_test,
+                "PoolManager": self.config.POOL_MANAGER_ADDRESS,
+                "Token0": self.token0,
+                "Token1": self.token1
+            })
+            if missing:
+                print(f"Warning: no contract code for {', '.join(missing)} at {self.config.RPC_URL}, redeploy with startup.sh")
+        except Exception as e:
+            print(f"Could not check the deployment at {self.config.RPC_URL}: {str(e)}")
+
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """
+        Caches worth keeping between sessions, the deployment check passed if a snapshot exists.
+        Pool and position IDs are local hashes and not worth a file, token metadata is four calls
+        """
+        return {"token_metadata": self._token_metadata}
+
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        if state.get("token_metadata"):
+            self._token_metadata = tuple(state["token_metadata"])
+
 
     def build_and_send_tx(self, function, value: int = 0) -> Dict[str, Any]:
         """Helper method to build and send transactions"""
         try:
             tx = function.build_transaction({
                 'from': self.account.address,
-                'nonce': self.web3.eth.get_transaction_count(self.account.address),
+                'nonce': self.nonce_manager.next_nonce(),
                 'gas': function.estimate_gas({'from': self.account.address}),
                 'gasPrice': self.web3.eth.gas_price,
                 'value': value
             })
             
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.account._private_key.hex())
+            with self.timings.measure("signing"):
+                signed_tx = self.web3.eth.account.sign_transaction(tx, self.account._private_key.hex())
             tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            with self.timings.measure("receipt"):
+                tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            self.cache.invalidate()
             
             return tx_receipt
         except Exception as e:
+            self.nonce_manager.reset()
             print(f"Transaction failed: {str(e)}")
             raise
 
 
-    def place_order(self, tick: int, zero_for_one: bool, amount: str) -> str:
+    def place_order(self, tick: int, zero_for_one: bool, amount: str) -> ToolResult:
         """Place a limit order in the GridHook"""
         try:        
             # Convert to Wei (multiply by 10^18)
@@ -70,63 +278,60 @@ class ContractFunctions:
             tx_receipt = self.build_and_send_tx(function)
             if not tx_receipt:
                 raise
-            return f"tx hash: 0x{tx_receipt.transactionHash.hex()}"
+            return TransactionResult("Order", f"0x{tx_receipt.transactionHash.hex()}", tx_receipt["status"] == 1, tx_receipt["gasUsed"])
 
         except Exception as e:
-            return f"Error placing order: {str(e)}"
+            return ErrorResult("placing order", str(e))
 
     
-    def check_positions(self, tick: int = None) -> str:
-        """Check pending orders and claimable tokens at specific ticks"""
+    def check_positions(self, tick: int = None, lower_tick: int = None, upper_tick: int = None) -> ToolResult:
+        """Check pending orders and claimable tokens at specific ticks, in a single batched call"""
         try:
-            result = []
-            ticks_to_check = [tick] if tick is not None else [-60, -1, 0, 1, 60]
-            
-            for current_tick in ticks_to_check:
-                for zero_for_one in [True, False]:
-                    try:
-                        # Get position ID
-                        position_id = self.grid_hook.functions.getPositionId(
-                            self.pool_key,
-                            current_tick,
-                            zero_for_one
-                        ).call()
-                        
-                        # Get pending orders amount
-                        pool_id = self._get_pool_id()
-                        pending_amount = self.grid_hook.functions.pendingOrders(
-                            pool_id,
-                            current_tick,
-                            zero_for_one
-                        ).call()
-                        
-                        # Get claimable output tokens
-                        claimable = self.grid_hook.functions.claimableOutputTokens(position_id).call()
-                        
-                        # Get total claim tokens supply
-                        claim_supply = self.grid_hook.functions.claimTokensSupply(position_id).call()
-                        
-                        # Only add to results if there's any activity
-                        if pending_amount > 0 or claimable > 0 or claim_supply > 0:
-                            result.append(
-                                f"\nPosition at tick {current_tick} "
-                                f"({'sell token0' if zero_for_one else 'sell token1'}):\n"
-                                f"Position ID: {position_id}\n"
-                                f"Pending order amount: {self.format_amount(pending_amount)} tokens\n"
-                                f"Claimable output tokens: {self.format_amount(claimable)} tokens\n"
-                                f"Total claim tokens supply: {self.format_amount(claim_supply)} tokens"
-                            )
-                    
-                    except Exception as e:
-                        result.append(f"Error checking position at tick {current_tick}: {str(e)}")
-            
-            return "\n".join(result) if result else "No active positions found"
-                   
+            positions = []
+            if lower_tick is not None and upper_tick is not None:
+                # Scan the range on every usable tick
+                step = self.pool_key['tickSpacing']
+                # Floor to a usable tick like getLowerUsableTick, an unaligned start would miss every order
+                lower_tick = lower_tick // step * step
+                ticks_to_check = list(range(lower_tick, upper_tick + 1, step))
+                function = self.grid_hook.functions.getPositionsBatch(
+                    self.pool_key, self.account.address, lower_tick, upper_tick, step
+                )
+                key = ("positions", lower_tick, upper_tick, step)
+            else:
+                ticks_to_check = [tick] if tick is not None else [-60, -1, 0, 1, 60]
+                function = self.grid_hook.functions.getPositionsBatch(
+                    self.pool_key, self.account.address, ticks_to_check
+                )
+                key = ("positions", tuple(ticks_to_check))
+
+            # Entries are laid out as [tick0 zeroForOne, tick0 oneForZero, tick1 zeroForOne, ...]
+            pending, supply, claimable, balances = self.cache.get(key, function.call)
+            _, current_tick = self.get_slot0()
+            pool_id = self._get_pool_id()
+
+            for i, tick_i in enumerate(ticks_to_check):
+                for side, zero_for_one in enumerate([True, False]):
+                    j = 2 * i + side
+                    # Only add to results if there's any activity
+                    if pending[j] > 0 or claimable[j] > 0 or supply[j] > 0:
+                        positions.append(Position(
+                            tick=tick_i,
+                            zero_for_one=zero_for_one,
+                            position_id=self._get_position_id(pool_id, tick_i, zero_for_one),
+                            pending=pending[j],
+                            claimable=claimable[j],
+                            supply=supply[j],
+                            balance=balances[j]
+                        ))
+
+            return PositionsResult(positions, current_tick)
+
         except Exception as e:
-            return f"Error checking positions: {str(e)}"
+            return ErrorResult("checking positions", str(e))
         
 
-    def swap(self, zero_for_one: bool, amount: str) -> str:
+    def swap(self, zero_for_one: bool, amount: str) -> ToolResult:
         """
         Perform a swap in the pool using the same implementation as swap.py
         """
@@ -161,21 +366,27 @@ class ContractFunctions:
                 'from': self.account.address,
                 'gas': 500000,
                 'gasPrice': self.web3.eth.gas_price,
-                'nonce': self.web3.eth.get_transaction_count(self.account.address),
+                'nonce': self.nonce_manager.next_nonce(),
             })
 
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.account._private_key.hex())
+            with self.timings.measure("signing"):
+                signed_tx = self.web3.eth.account.sign_transaction(tx, self.account._private_key.hex())
             tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            with self.timings.measure("receipt"):
+                tx_receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            self.cache.invalidate()
 
-            return f"Swap transaction sent! Hash: {tx_hash.hex()}\nTransaction status: {'Success' if tx_receipt['status'] == 1 else 'Failed'}\nGas used: {tx_receipt['gasUsed']}"
+            return TransactionResult("Swap", f"0x{tx_hash.hex()}", tx_receipt["status"] == 1, tx_receipt["gasUsed"])
 
         except Exception as e:
-            return f"Error performing swap: {str(e)}"
+            self.nonce_manager.reset()
+            return ErrorResult("performing swap", str(e))
 
 
     def _get_pool_id(self) -> bytes:
         """Helper function to get pool ID from pool key"""
+        if self._pool_id is not None:
+            return self._pool_id
         encoded = encode(
             ['address', 'address', 'uint24', 'int24', 'address'],
             [
@@ -186,34 +397,39 @@ class ContractFunctions:
                 Web3.to_checksum_address(self.pool_key['hooks'])
             ]
         )
-        return self.web3.keccak(encoded)
+        self._pool_id = bytes(self.web3.keccak(encoded))
+        return self._pool_id
+
+
+    def _get_position_id(self, pool_id: bytes, tick: int, zero_for_one: bool) -> int:
+        key = (tick, zero_for_one)
+        if key not in self._position_ids:
+            self._position_ids[key] = position_id(pool_id, tick, zero_for_one)
+        return self._position_ids[key]
+
+
+    def get_slot0(self) -> Tuple[int, int]:
+        """Current sqrtPriceX96 and tick of the pool, read straight from PoolManager storage"""
+        def load():
+            slot = self.web3.keccak(encode(['bytes32', 'uint256'], [self._get_pool_id(), POOLS_SLOT]))
+            word = int.from_bytes(self.pool_manager.get_function_by_signature("extsload(bytes32)")(slot).call(), "big")
+            # Slot0 packs sqrtPriceX96 (160 bits), tick (int24), protocolFee and lpFee
+            tick = (word >> 160) & 0xFFFFFF
+            if tick >= 1 << 23:
+                tick -= 1 << 24
+            return word & ((1 << 160) - 1), tick
+
+        return self.cache.get(("slot0",), load)
     
 
-    def get_hook_permissions(self) -> str:
+    def get_hook_permissions(self) -> ToolResult:
         """Get permissions for the GridHook contract to understand which hooks are enabled"""
         try:
             permissions = self.grid_hook.functions.getHookPermissions().call()
-            result = "GridHook Permissions:\n"
-            result += "-------------------\n"
-            result += f"beforeInitialize: {'✅' if permissions[0] else '❌'}\n"
-            result += f"afterInitialize: {'✅' if permissions[1] else '❌'}\n"
-            result += f"beforeAddLiquidity: {'✅' if permissions[2] else '❌'}\n"
-            result += f"afterAddLiquidity: {'✅' if permissions[3] else '❌'}\n"
-            result += f"beforeRemoveLiquidity: {'✅' if permissions[4] else '❌'}\n"
-            result += f"afterRemoveLiquidity: {'✅' if permissions[5] else '❌'}\n"
-            result += f"beforeSwap: {'✅' if permissions[6] else '❌'}\n"
-            result += f"afterSwap: {'✅' if permissions[7] else '❌'}\n"
-            result += f"beforeDonate: {'✅' if permissions[8] else '❌'}\n"
-            result += f"afterDonate: {'✅' if permissions[9] else '❌'}\n"
-            result += f"beforeSwapReturnDelta: {'✅' if permissions[10] else '❌'}\n"
-            result += f"afterSwapReturnDelta: {'✅' if permissions[11] else '❌'}\n"
-            result += f"afterAddLiquidityReturnDelta: {'✅' if permissions[12] else '❌'}\n"
-            result += f"afterRemoveLiquidityReturnDelta: {'✅' if permissions[13] else '❌'}\n"
-            
-            return result
+            return PermissionsResult(dict(zip(HOOK_PERMISSIONS, permissions)))
 
         except Exception as e:
-            return f"Error getting hook permissions: {str(e)}"
+            return ErrorResult("getting hook permissions", str(e))
 
 
     def format_amount(self, amount: int) -> str:
@@ -221,7 +437,7 @@ class ContractFunctions:
         return f"{float(eth_amount):.4f}"  # Show only 4 decimal places
 
 
-    def get_balances(self, address: str = None) -> str:
+    def get_balances(self, address: str = None) -> ToolResult:
         """Get token balances for a specific address or default to user's address"""
         try:
             # Determine target address
@@ -239,16 +455,22 @@ class ContractFunctions:
             token0_contract = self.web3.eth.contract(address=self.token0, abi=self.config.MOCK_TOKEN_ABI)
             token1_contract = self.web3.eth.contract(address=self.token1, abi=self.config.MOCK_TOKEN_ABI)
             
-            # Get token names and symbols
-            token0_name = token0_contract.functions.name().call()
-            token0_symbol = token0_contract.functions.symbol().call()
-            token1_name = token1_contract.functions.name().call()
-            token1_symbol = token1_contract.functions.symbol().call()
+            # Token names and symbols never change, read them once
+            if self._token_metadata is None:
+                self._token_metadata = (
+                    token0_contract.functions.name().call(),
+                    token0_contract.functions.symbol().call(),
+                    token1_contract.functions.name().call(),
+                    token1_contract.functions.symbol().call()
+                )
+            token0_name, token0_symbol, token1_name, token1_symbol = self._token_metadata
             
             # Get balances
-            balance0 = token0_contract.functions.balanceOf(target_address).call() / 1e18
-            balance1 = token1_contract.functions.balanceOf(target_address).call() / 1e18
-            eth_balance = self.web3.eth.get_balance(target_address) / 1e18
+            balance0, balance1, eth_balance = self.cache.get(("balances", target_address), lambda: (
+                token0_contract.functions.balanceOf(target_address).call(),
+                token1_contract.functions.balanceOf(target_address).call(),
+                self.web3.eth.get_balance(target_address)
+            ))
             
             # Create readable address label
             address_label = {
@@ -257,101 +479,25 @@ class ContractFunctions:
                 self.pool_swap_test: "Pool's"
             }.get(target_address, f"Address {target_address}'s")
             
-            return f"""
-{address_label} balances:
-• {balance0:.6f} {token0_symbol} ({token0_name})
-• {balance1:.6f} {token1_symbol} ({token1_name})
-• {eth_balance:.6f} ETH
-"""
+            return BalancesResult(
+                label=address_label,
+                address=target_address,
+                tokens=[
+                    TokenBalance(token0_symbol, token0_name, balance0),
+                    TokenBalance(token1_symbol, token1_name, balance1)
+                ],
+                eth=eth_balance
+            )
         except Exception as e:
-            return f"Error getting balances: {str(e)}"
+            return ErrorResult("getting balances", str(e))
+
+
+    def shutdown(self) -> None:
+        self.snapshot.close()
+        self.rpc_stats.close()
 
 
     @property
     def available_tools(self):
-        """Load function signatures from JSON file"""
-        return [
-    {
-        "type": "function",
-        "function": {
-            "name": "place_order",
-            "description": "Place a buy or sell order in the pool.\n- To buy token1: set zero_for_one=true (selling token0 to buy token1)\n- To buy token0: set zero_for_one=false (selling token1 to buy token0)\nExamples:\n- 'buy 100 token1 at tick 123' -> tick=123, zero_for_one=true, amount=100\n- 'sell 50 token0 at tick -100' -> tick=-100, zero_for_one=true, amount=50",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "tick": {"type": "integer", "description": "The tick price at which to place the order"},
-                    "zero_for_one": {"type": "boolean", "description": "True if buying token1 (selling token0), False if buying token0 (selling token1)"},
-                    "amount": {"type": "string", "description": "Amount of tokens to buy/sell"}
-                },
-                "required": ["tick", "zero_for_one", "amount"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "check_positions",
-            "description": "Check pending orders and claimable tokens at specific ticks.\nIf no tick is provided, checks positions around current tick (-60, -1, 0, 1, 60).\nExamples:\n- 'show all positions'\n- 'check position at tick 100'\n- 'what orders are pending at tick 0'",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "tick": {
-                        "type": "integer",
-                        "description": "Specific tick to check. If not provided, checks multiple ticks around 0"
-                    }
-                },
-                "required": []
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_hook_permissions",
-            "description": "Get the permissions for the GridHook contract to understand which hooks are enabled",
-            "parameters": {
-                "type": "object",
-                "properties": {},
-                "additionalProperties": False
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "swap",
-            "description": "Perform a swap in the pool.\n- To swap token0 for token1: set zero_for_one=true\n- To swap token1 for token0: set zero_for_one=false\nExamples:\n- 'swap 1.5 token0 for token1' -> zero_for_one=true, amount=1.5\n- 'swap 2 token1 for token0' -> zero_for_one=false, amount=2",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "zero_for_one": {
-                        "type": "boolean",
-                        "description": "True if swapping token0 for token1, False if swapping token1 for token0"
-                    },
-                    "amount": {
-                        "type": "string",
-                        "description": "Amount to swap (in human readable format, e.g. '1.5')"
-                    }
-                },
-                "required": ["zero_for_one", "amount"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_balances",
-            "description": "Get token balances and names for an address. Shows balances of both tokens and ETH.\nExamples:\n- 'what is my balance'\n- 'show gridhook balance'\n- 'check pool balance'\n- 'what tokens do I have'\n- 'balance of 0x123...'",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "address": {
-                        "type": "string",
-                        "description": "Address to check balances for. Can be 'user', 'gridhook', 'pool', or a specific Ethereum address"
-                    }
-                },
-                "required": []
-            }
-        }
-    }
-]
\ No newline at end of file
+        """Tool schemas for the LLM, the tuple built once at import so requests stay byte-identical across turns"""
+        return TOOL_SCHEMAS
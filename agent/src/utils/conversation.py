@@ -0,0 +1,130 @@
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List
+
+
+# Position IDs and raw wei amounts are long digit runs that cost many tokens and mean little in old turns
+LONG_NUMBER = re.compile(r"\d{13,}")
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough token count for a list of messages (~4 characters per token plus per-message overhead)"""
+    total = 0
+    for message in messages:
+        total += 4 + len(message.get("content") or "") // 4
+        for tool_call in message.get("tool_calls") or []:
+            total += 4 + (len(tool_call["function"]["name"]) + len(tool_call["function"]["arguments"])) // 4
+    return total
+
+
+def digest_tool_output(content: str, max_chars: int = 160) -> str:
+    """Compact form of an old tool result: long numbers elided, whitespace collapsed, truncated"""
+    text = " ".join(LONG_NUMBER.sub(lambda m: f"{m.group()[:4]}…", content).split())
+    if len(text) > max_chars:
+        text = text[:max_chars].rstrip() + f"… [{len(content)} chars]"
+    return text
+
+
+class ConversationManager:
+    def __init__(self, llm, token_budget: int = 3000, keep_recent_turns: int = 4):
+        """
+        Keep the conversation within a token budget. The last `keep_recent_turns` turns are sent
+        verbatim, older tool outputs are replaced by digests and older turns are summarized in the background.
+        """
+        self.llm = llm
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+
+        self.turns: List[List[Dict[str, Any]]] = []
+        self.summary = ""
+        self._lock = threading.Lock()
+        self._summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        self._pending_summary: Future = None
+
+
+    def add_user_message(self, content: str) -> None:
+        """Start a new turn"""
+        with self._lock:
+            self.turns.append([{"role": "user", "content": content}])
+
+
+    def append(self, message: Dict[str, Any]) -> None:
+        """Add an assistant or tool message to the current turn"""
+        with self._lock:
+            self.turns[-1].append(message)
+
+
+    def drop_last_turn(self) -> None:
+        """Forget the current turn, e.g. after it failed halfway and may be malformed"""
+        with self._lock:
+            if self.turns:
+                self.turns.pop()
+
+
+    def context(self) -> List[Dict[str, Any]]:
+        """Messages to send to the model for the next request"""
+        with self._lock:
+            old_turns = self.turns[:-self.keep_recent_turns] if self.keep_recent_turns else self.turns
+            recent_turns = self.turns[len(old_turns):]
+
+            recent = [message for turn in recent_turns for message in turn]
+            old = [[self._digest(message) for message in turn] for turn in old_turns]
+
+            summary = []
+            if self.summary:
+                summary = [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}]
+
+            # Drop the oldest digested turns until the request fits, they are still covered
+            # by the summary once the background summarization catches up
+            while old and estimate_tokens(summary + [m for turn in old for m in turn] + recent) > self.token_budget:
+                old.pop(0)
+
+            return summary + [message for turn in old for message in turn] + recent
+
+
+    def end_turn(self) -> None:
+        """Call once a turn is complete, summarizes old turns in the background when over budget"""
+        with self._lock:
+            history = [message for turn in self.turns for message in turn]
+            if estimate_tokens(history) <= self.token_budget or len(self.turns) <= self.keep_recent_turns:
+                return
+            if self._pending_summary is not None and not self._pending_summary.done():
+                return
+            old_turns = self.turns[:-self.keep_recent_turns] if self.keep_recent_turns else list(self.turns)
+            self._pending_summary = self._summarizer.submit(self._summarize, old_turns, self.summary)
+
+
+    def prompt_tokens(self) -> int:
+        return estimate_tokens(self.context())
+
+
+    def _summarize(self, old_turns: List[List[Dict[str, Any]]], previous_summary: str) -> None:
+        transcript = [f"Previous summary: {previous_summary}"] if previous_summary else []
+        for turn in old_turns:
+            for message in turn:
+                if message.get("content"):
+                    transcript.append(f"{message['role']}: {self._digest(message)['content']}")
+                for tool_call in message.get("tool_calls") or []:
+                    transcript.append(f"call: {tool_call['function']['name']}({tool_call['function']['arguments']})")
+
+        try:
+            summary = self.llm.summarize("\n".join(transcript))
+        except Exception as e:
+            print(f"Error summarizing conversation: {str(e)}")
+            return
+
+        with self._lock:
+            # Only the summarized turns are replaced, turns added meanwhile are kept
+            self.turns = self.turns[len(old_turns):]
+            self.summary = summary
+
+
+    def _digest(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if message.get("role") != "tool":
+            return message
+        return {**message, "content": digest_tool_output(message.get("content") or "")}
+
+
+    def shutdown(self) -> None:
+        self._summarizer.shutdown(wait=False)
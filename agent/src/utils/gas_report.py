@@ -0,0 +1,80 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+def load_gas_table(path: str) -> Dict[str, int]:
+    """
+    Load a gas table from a forge `snapshots/` directory or from a merged JSON file.
+    Entries are keyed as "<group>/<name>".
+    """
+    source = Path(path)
+    table = {}
+
+    if source.is_dir():
+        # forge writes one `<group>.json` file per snapshot group
+        for file_path in sorted(source.glob("*.json")):
+            with open(file_path) as f:
+                for name, gas in json.load(f).items():
+                    table[f"{file_path.stem}/{name}"] = int(gas)
+    else:
+        with open(source) as f:
+            table = {name: int(gas) for name, gas in json.load(f).items()}
+
+    return table
+
+
+def diff_gas_tables(
+        baseline: Dict[str, int],
+        current: Dict[str, int]
+    ) -> List[Tuple[str, int, int, float]]:
+    """Return (name, baseline gas, current gas, change in %) for every entry present in both tables"""
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name], current[name]
+        change = (after - before) * 100 / before if before else 0.0
+        rows.append((name, before, after, change))
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare GridHook gas benchmark runs")
+    parser.add_argument("baseline", help="Baseline snapshots directory or merged JSON table")
+    parser.add_argument("current", nargs="?", default="../snapshots", help="Current snapshots directory or merged JSON table")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Fail if any entry grows by more than this many percent")
+    parser.add_argument("--save", help="Write the current table as merged JSON to this path, e.g. to use as the next baseline")
+    args = parser.parse_args(argv)
+
+    baseline = load_gas_table(args.baseline)
+    current = load_gas_table(args.current)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    regressions = 0
+    print(f"{'benchmark':<70} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, before, after, change in diff_gas_tables(baseline, current):
+        flag = ""
+        if change > args.threshold:
+            flag = "  <-- regression"
+            regressions += 1
+        print(f"{name:<70} {before:>12} {after:>12} {change:>+8.2f}%{flag}")
+
+    for name in sorted(current.keys() - baseline.keys()):
+        print(f"{name:<70} {'-':>12} {current[name]:>12}      new")
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name:<70} {baseline[name]:>12} {'-':>12}  removed")
+
+    if regressions:
+        print(f"\n{regressions} benchmark(s) grew by more than {args.threshold}%")
+        return 1
+    return 0
+
+
+# Example usage, from agent/:
+#   python src/utils/gas_report.py baseline.json ../snapshots --save baseline.json
+if __name__ == "__main__":
+    sys.exit(main())
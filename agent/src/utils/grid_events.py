@@ -0,0 +1,141 @@
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+
+
+GRID_EVENTS = (
+    "OrderPlaced",
+    "OrderCancelled",
+    "OrderFilled",
+    "Redeemed",
+    "GridCreated",
+    "BalancesSynced",
+    # ERC1155 claim token movements, the only events that cover every mint and burn
+    "TransferSingle",
+    "TransferBatch",
+)
+
+
+class GridEventDecoder:
+    def __init__(self, web3: Web3, grid_hook_address: str, grid_hook_abi: list):
+        """Decode GridHook domain events from raw logs"""
+        self.web3 = web3
+        self.address = web3.to_checksum_address(grid_hook_address)
+        self.contract = web3.eth.contract(address=self.address, abi=grid_hook_abi)
+
+        # topic0 -> event name, for the events we know how to decode
+        self.topics = {
+            event_abi_to_log_topic(entry): entry["name"]
+            for entry in grid_hook_abi
+            if entry.get("type") == "event" and entry.get("name") in GRID_EVENTS
+        }
+
+
+    def decode(self, log) -> Optional[Dict[str, Any]]:
+        """Decode a single log, returns None for logs that are not GridHook domain events"""
+        if not log["topics"]:
+            return None
+        name = self.topics.get(bytes(log["topics"][0]))
+        if name is None:
+            return None
+
+        event = getattr(self.contract.events, name)().process_log(log)
+        return {
+            "event": name,
+            "block_number": event["blockNumber"],
+            "log_index": event["logIndex"],
+            "tx_hash": "0x" + bytes(event["transactionHash"]).hex(),
+            **{k: (bytes(v) if isinstance(v, (bytes, bytearray)) else v) for k, v in event["args"].items()},
+        }
+
+
+    def get_events(self, from_block: int = 0, to_block="latest") -> List[Dict[str, Any]]:
+        """Fetch and decode every GridHook domain event in a block range with a single eth_getLogs"""
+        logs = self.web3.eth.get_logs({
+            "address": self.address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [list(self.topics.keys())],
+        })
+        events = [self.decode(log) for log in logs]
+        return [event for event in events if event is not None]
+
+
+def position_id(pool_id: bytes, tick: int, zero_for_one: bool) -> int:
+    """Same as GridHook.getPositionId, computed locally from a pool ID"""
+    return int.from_bytes(Web3.keccak(encode(["bytes32", "int24", "bool"], [pool_id, tick, zero_for_one])), "big")
+
+
+class OrderBook:
+    """
+    Order book state rebuilt from a stream of decoded GridHook events. Claim token balances and
+    supply follow the ERC1155 TransferSingle/TransferBatch events, so grid position mints, batch
+    settlements and transfers between accounts are all covered; the order events drive pending
+    and claimable amounts.
+    """
+
+    def __init__(self):
+        self.pending: Dict[Tuple[bytes, int, bool], int] = defaultdict(int)
+        self.claim_supply: Dict[int, int] = defaultdict(int)
+        self.claimable: Dict[int, int] = defaultdict(int)
+        self.balances: Dict[Tuple[str, int], int] = defaultdict(int)
+        self.last_block = 0
+
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        name = event["event"]
+
+        if name == "OrderPlaced":
+            self.pending[(event["poolId"], event["tick"], event["zeroForOne"])] += event["inputAmount"]
+
+        elif name == "OrderCancelled":
+            self.pending[(event["poolId"], event["tick"], event["zeroForOne"])] -= event["inputAmount"]
+
+        elif name == "OrderFilled":
+            pid = position_id(event["poolId"], event["tick"], event["zeroForOne"])
+            self.pending[(event["poolId"], event["tick"], event["zeroForOne"])] -= event["inputAmount"]
+            self.claimable[pid] += event["outputAmount"]
+
+        elif name == "Redeemed":
+            self.claimable[event["positionId"]] -= event["outputAmount"]
+
+        elif name == "GridCreated":
+            # createGridPosition overwrites the pending amount at every grid line,
+            # selling token0 above tick 0 and token1 at or below it
+            tick = event["lowerTick"]
+            while tick <= event["upperTick"]:
+                self.pending[(event["poolId"], tick, tick > 0)] = event["amountPerGrid"]
+                tick += event["gridSpacing"]
+
+        elif name == "BalancesSynced":
+            self.claimable[event["positionId"]] = event["claimableOutputTokens"]
+            self.pending[(event["poolId"], event["tick"], event["zeroForOne"])] = event["pendingOrders"]
+
+        elif name == "TransferSingle":
+            self._transfer(event["from"], event["to"], event["id"], event["amount"])
+
+        elif name == "TransferBatch":
+            for pid, amount in zip(event["ids"], event["amounts"]):
+                self._transfer(event["from"], event["to"], pid, amount)
+
+        self.last_block = max(self.last_block, event["block_number"])
+
+
+    def _transfer(self, sender: str, receiver: str, pid: int, amount: int) -> None:
+        # Mints come from and burns go to the zero address
+        if int(sender, 16) == 0:
+            self.claim_supply[pid] += amount
+        else:
+            self.balances[(sender, pid)] -= amount
+        if int(receiver, 16) == 0:
+            self.claim_supply[pid] -= amount
+        else:
+            self.balances[(receiver, pid)] += amount
+
+
+    def apply_all(self, events: List[Dict[str, Any]]) -> "OrderBook":
+        for event in events:
+            self.apply(event)
+        return self
@@ -1,9 +1,23 @@
 from web3 import Web3
 
-def initialize_web3(RPC_URL: str):
+def initialize_web3(RPC_URL: str, record_path: str = None):
     try:
-        web3 = Web3(Web3.HTTPProvider(RPC_URL))
+        # In-process chain for tests and simulations, see utils/local_chain.py
+        if RPC_URL.startswith("eth-tester://"):
+            from utils.local_chain import local_web3
+            web3 = local_web3()
+        # Recorded traffic played back without a node, see utils/rpc_replay.py
+        elif RPC_URL.startswith(("replay://", "replay+timed://")):
+            from utils.rpc_replay import ReplayProvider
+            scheme, path = RPC_URL.split("://", 1)
+            web3 = Web3(ReplayProvider(path, realtime=scheme == "replay+timed"))
+        else:
+            web3 = Web3(Web3.HTTPProvider(RPC_URL))
+
+        if record_path:
+            from utils.rpc_replay import RPCRecorder
+            RPCRecorder(record_path).instrument(web3)
         return web3
     except Exception as e:
         print(f"An error occurred while initializing Web3: {str(e)}")
-        raise
\ No newline at end of file
+        raise
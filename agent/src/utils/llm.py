@@ -1,39 +1,252 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
+from dataclasses import dataclass, field
+import time
+from utils.router import ModelRouter, RouteDecision, validate_tool_call
+from utils.llm_client import ResilientLLMClient
+from utils import tracing
 load_dotenv()
 import os
 
 
+@dataclass
+class StreamedCompletion:
+    """Result of a streamed chat completion, assembled from its deltas"""
+    content: str = ""
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    time_to_first_token: Optional[float] = None
+    total_time: float = 0.0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    model: str = ""
+
+    @property
+    def message(self) -> Dict[str, Any]:
+        """The assistant message to append to the conversation"""
+        message = {"role": "assistant", "content": self.content or None}
+        if self.tool_calls:
+            message["tool_calls"] = self.tool_calls
+        return message
+
+
 class LLMAgent:
     def __init__(self, config):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Retries and timeouts are handled by ResilientLLMClient, not by the SDK
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        self.llm_client = ResilientLLMClient(
+            self.client,
+            deadline=config.LLM_DEADLINE,
+            attempt_timeout=config.LLM_ATTEMPT_TIMEOUT,
+            max_retries=config.LLM_MAX_RETRIES,
+            hedge_percentile=config.LLM_HEDGE_PERCENTILE
+        )
         self.model = config.LLM_MODEL
         self.prompt = config.PROMPT
+        self.deployment_prompt = config.DEPLOYMENT_PROMPT
+        self.router = ModelRouter(config.LLM_MODEL, config.SMALL_LLM_MODEL, config.MODEL_PRICES)
+
+
+    def _add_system_prompt(self, messages: List[Dict[str, Any]]) -> None:
+        # Add system prompt to the start of messages, followed by the deployment details.
+        # Both are the same on every request, so the provider can cache this prefix. Checked by the
+        # prompt itself, a conversation summary is a system message too
+        if messages and messages[0].get("content") == self.prompt:
+            return
+        messages[0:0] = [
+            {"role": "system", "content": self.prompt},
+            {"role": "system", "content": self.deployment_prompt}
+        ]
 
 
     def create_chat_completion(
-            self, 
-            messages: List[Dict[str, str]], 
+            self,
+            messages: List[Dict[str, str]],
             tools: List[Dict[str, Any]] = None
         ) -> Any:
         """Create a chat completion with the OpenAI API"""
         try:
-            # Add system prompt to the start of messages
-            if not any(msg.get("role") == "system" for msg in messages):
-                messages.insert(0, {
-                    "role": "system",
-                    "content": self.prompt
-                })
-            
+            self._add_system_prompt(messages)
+
             # Create completion
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=tools if tools else None
-            )
-            
+            with tracing.span("llm", model=self.model, messages=len(messages)):
+                completion = self.llm_client.run(self.llm_client.create(
+                    model=self.model,
+                    messages=messages,
+                    tools=tools if tools else None
+                ))
+
             return completion
         except Exception as e:
             print(f"Error creating chat completion: {str(e)}")
             raise
+
+
+    def stream_chat_completion(
+            self,
+            messages: List[Dict[str, Any]],
+            tools: List[Dict[str, Any]] = None,
+            on_content: Callable[[str], None] = None,
+            on_tool_call: Callable[[Dict[str, Any], Optional[int]], None] = None,
+            model: str = None
+        ) -> StreamedCompletion:
+        """
+        Stream a chat completion, calling `on_content` for every text delta and
+        `on_tool_call` as soon as a tool call's arguments are complete, with the ID of the
+        LLM span as the parent for the tool's span. Deltas are processed on the LLM client's
+        loop thread, where no span is active.
+        """
+        try:
+            self._add_system_prompt(messages)
+            result = StreamedCompletion(model=model or self.model)
+            started = time.perf_counter()
+
+            content = []
+            tool_calls: Dict[int, Dict[str, Any]] = {}
+            completed = set()
+            llm_span_id = None
+
+            def complete_tool_calls(before_index: int = None):
+                # Tool calls stream one after another, so once a later index shows up
+                # (or the stream ends) every earlier call has all of its arguments
+                for index in sorted(tool_calls):
+                    if index in completed or (before_index is not None and index >= before_index):
+                        continue
+                    completed.add(index)
+                    if on_tool_call:
+                        on_tool_call(tool_calls[index], llm_span_id)
+
+            def process(chunk):
+                if chunk.usage:
+                    # Sent in a last chunk without choices
+                    result.prompt_tokens = chunk.usage.prompt_tokens
+                    result.completion_tokens = chunk.usage.completion_tokens
+                    details = chunk.usage.prompt_tokens_details
+                    result.cached_tokens = (details.cached_tokens or 0) if details else 0
+                if not chunk.choices:
+                    return
+                delta = chunk.choices[0].delta
+
+                if result.time_to_first_token is None and (delta.content or delta.tool_calls):
+                    result.time_to_first_token = time.perf_counter() - started
+
+                if delta.content:
+                    content.append(delta.content)
+                    if on_content:
+                        on_content(delta.content)
+
+                for tool_call_delta in delta.tool_calls or []:
+                    complete_tool_calls(before_index=tool_call_delta.index)
+                    tool_call = tool_calls.setdefault(tool_call_delta.index, {
+                        "id": "",
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+                    if tool_call_delta.id:
+                        tool_call["id"] = tool_call_delta.id
+                    if tool_call_delta.function:
+                        tool_call["function"]["name"] += tool_call_delta.function.name or ""
+                        tool_call["function"]["arguments"] += tool_call_delta.function.arguments or ""
+
+            async def consume():
+                async for chunk in self.llm_client.stream(
+                    model=result.model,
+                    messages=messages,
+                    tools=tools if tools else None,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                ):
+                    process(chunk)
+
+            with tracing.span("llm", model=result.model, messages=len(messages)) as span:
+                llm_span_id = tracing.current_span_id()
+                self.llm_client.run(consume())
+                complete_tool_calls()
+                span.update(
+                    ttft=result.time_to_first_token, prompt_tokens=result.prompt_tokens,
+                    cached_tokens=result.cached_tokens, tool_calls=len(tool_calls)
+                )
+
+            result.content = "".join(content)
+            result.tool_calls = [tool_calls[index] for index in sorted(tool_calls)]
+            result.total_time = time.perf_counter() - started
+            self.router.record(result.model, result.total_time, result.prompt_tokens, result.completion_tokens)
+            return result
+        except Exception as e:
+            print(f"Error streaming chat completion: {str(e)}")
+            raise
+
+
+    def route(self, user_input: str, messages: List[Dict[str, Any]]) -> RouteDecision:
+        """Choose the model for a turn"""
+        return self.router.route(user_input, messages)
+
+
+    def routed_chat_completion(
+            self,
+            messages: List[Dict[str, Any]],
+            tools: List[Dict[str, Any]],
+            decision: RouteDecision,
+            on_content: Callable[[str], None] = None,
+            on_tool_call: Callable[[Dict[str, Any], Optional[int]], None] = None
+        ) -> tuple[StreamedCompletion, RouteDecision]:
+        """
+        Stream a completion with the routed model. Each of the small model's tool calls is validated
+        and started as soon as its arguments are complete, only its text is held back until the
+        stream ends. On the first invalid call the large model is used for the rest of the turn: if
+        nothing was started yet the step is retried on it, with the discarded attempt's time and
+        tokens added to the returned completion, otherwise the step keeps the calls already running
+        and the large model continues from their results. Returns the completion and the decision to keep using.
+        """
+        if decision.model == self.model:
+            return self.stream_chat_completion(messages, tools, on_content, on_tool_call, model=self.model), decision
+
+        started = []
+        problem = None
+
+        def release(tool_call, parent_id):
+            nonlocal problem
+            if problem is None:
+                problem = validate_tool_call(tool_call, tools)
+            if problem is None:
+                started.append(tool_call)
+                if on_tool_call:
+                    on_tool_call(tool_call, parent_id)
+
+        completion = self.stream_chat_completion(messages, tools, None, release, model=decision.model)
+        if problem is not None:
+            decision = self.router.escalate(decision, problem)
+            if not started:
+                escalated = self.stream_chat_completion(messages, tools, on_content, on_tool_call, model=self.model)
+                # The user waited for both attempts
+                if escalated.time_to_first_token is not None:
+                    escalated.time_to_first_token += completion.total_time
+                escalated.total_time += completion.total_time
+                escalated.prompt_tokens += completion.prompt_tokens
+                escalated.cached_tokens += completion.cached_tokens
+                escalated.completion_tokens += completion.completion_tokens
+                return escalated, decision
+            # Calls that already run (writes included) cannot be taken back, they stay in this step
+            completion.tool_calls = started
+
+        if on_content and completion.content:
+            on_content(completion.content)
+        return completion, decision
+
+
+    def summarize(self, transcript: str) -> str:
+        """Summarize older conversation turns so they can replace the full history"""
+        with tracing.span("llm summarize", model=self.model):
+            completion = self.llm_client.run(self.llm_client.create(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Summarize this conversation between a user and a grid trading assistant in a few short lines. "
+                                   "Keep ticks, amounts, directions, transaction outcomes and open questions, drop everything else."
+                    },
+                    {"role": "user", "content": transcript}
+                ]
+            ))
+        return completion.choices[0].message.content
@@ -0,0 +1,176 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Optional
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, RateLimitError, InternalServerError
+from utils import profiling
+
+
+# Errors worth another attempt, anything else (bad request, auth, ...) fails right away
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError, asyncio.TimeoutError)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class ResilientLLMClient:
+    def __init__(
+            self,
+            client: AsyncOpenAI,
+            deadline: float = 30.0,
+            attempt_timeout: float = 10.0,
+            max_retries: int = 3,
+            backoff: float = 0.5,
+            hedge_percentile: Optional[float] = 0.9,
+            hedge_min_samples: int = 10
+        ):
+        """
+        Chat completions with a per-request deadline, jittered retries on retryable errors and
+        optional hedging. An attempt that gets no response (for a stream, no first chunk) within
+        `attempt_timeout` counts as a retryable failure, so a stall does not use up the deadline. With
+        hedging, when the first chunk takes longer than the `hedge_percentile` of recent
+        first-chunk latencies, a duplicate request is sent and whichever answers first is used.
+        Runs its own event loop on a background thread so synchronous callers can use it.
+        """
+        self.client = client
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        self.latencies = deque(maxlen=100)
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True, name="llm-client").start()
+
+
+    def run(self, coroutine) -> Any:
+        """Run a coroutine on the client's event loop and wait for its result"""
+        if profiling.enabled():
+            # Response parsing happens on the loop thread, with --profile it counts towards the turn
+            coroutine = profiling.profiled(coroutine)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+
+    async def create(self, **kwargs) -> Any:
+        """Non-streaming completion within the deadline, retried on retryable errors"""
+        deadline = time.monotonic() + self.deadline
+        return await self._with_retries(lambda: self.client.chat.completions.create(**kwargs), deadline)
+
+
+    async def stream(self, **kwargs) -> AsyncIterator[Any]:
+        """Streaming completion: the first chunk is retried and hedged, the rest must arrive within the deadline"""
+        deadline = time.monotonic() + self.deadline
+        started = time.monotonic()
+        stream, first_chunk = await self._with_retries(lambda: self._first_chunk(kwargs), deadline)
+        self.latencies.append(time.monotonic() - started)
+
+        try:
+            chunk = first_chunk
+            while chunk is not None:
+                yield chunk
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DeadlineExceeded(f"completion did not finish within {self.deadline}s")
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), remaining)
+                except StopAsyncIteration:
+                    chunk = None
+        finally:
+            await stream.close()
+
+
+    async def _first_chunk(self, kwargs):
+        threshold = self._hedge_threshold()
+        tasks = [asyncio.ensure_future(self._open_stream(kwargs))]
+        winner = None
+        try:
+            if threshold is None:
+                winner = tasks[0]
+                return await winner
+
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            if not done:
+                # Primary is slower than usual, race it against a duplicate
+                self.hedges += 1
+                tasks.append(asyncio.ensure_future(self._open_stream(kwargs)))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if len(tasks) > 1 and task is tasks[1]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Losers, or every request when the deadline cancels this attempt
+            for task in tasks:
+                if task is winner:
+                    continue
+                if task.done():
+                    self._close_cancelled(task)
+                else:
+                    task.cancel()
+                    task.add_done_callback(self._close_cancelled)
+
+
+    async def _open_stream(self, kwargs):
+        stream = await self.client.chat.completions.create(**kwargs)
+        try:
+            first_chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            first_chunk = None
+        except BaseException:
+            await stream.close()
+            raise
+        return stream, first_chunk
+
+
+    async def _with_retries(self, attempt, deadline: float):
+        for retry in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"no response within {self.deadline}s")
+            try:
+                return await asyncio.wait_for(attempt(), min(remaining, self.attempt_timeout))
+            except RETRYABLE_ERRORS as e:
+                if retry == self.max_retries:
+                    raise
+                # Full jitter backoff, never sleeping past the deadline
+                delay = random.uniform(0, self.backoff * 2 ** retry)
+                if time.monotonic() + delay >= deadline:
+                    raise DeadlineExceeded(f"no response within {self.deadline}s, last error: {str(e) or type(e).__name__}") from e
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+
+    def _hedge_threshold(self) -> Optional[float]:
+        if self.hedge_percentile is None or len(self.latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile))]
+
+
+    @staticmethod
+    def _close_cancelled(task) -> None:
+        # A losing request that already got its stream still holds a connection
+        if not task.cancelled() and task.exception() is None:
+            stream, _ = task.result()
+            asyncio.ensure_future(stream.close())
+
+
+    def report(self) -> str:
+        return f"llm client: {self.retries} retr(ies), {self.hedges} hedged request(s), {self.hedge_wins} won by the hedge"
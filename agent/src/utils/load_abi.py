@@ -1,13 +1,79 @@
 from pathlib import Path
+from typing import Dict, List
 import json
+import os
+
+
+ABI_DIR = Path(__file__).parent.parent / 'abi'
+ARTIFACTS_DIR = Path(__file__).parent.parent.parent.parent / 'out'
+# ABIs of the contracts the agent uses, extracted from the (much larger) Foundry artifacts
+BUNDLE_PATH = ABI_DIR / 'bundle.json'
 
 
 def load_abi(contract_name: str) -> dict:
     """Load ABI from Foundry artifacts"""
-    current_dir = Path(__file__).parent
-    project_root = current_dir.parent.parent.parent
-    artifact_path = project_root / 'out' / f'{contract_name}.sol' / f'{contract_name}.json'    
+    artifact_path = ARTIFACTS_DIR / f'{contract_name}.sol' / f'{contract_name}.json'
     with open(artifact_path) as f:
         contract_json = json.load(f)
         return contract_json['abi']
 
+
+def load_abi_bundle(contract_names: List[str]) -> Dict[str, list]:
+    """
+    Load ABIs from the compact bundle in `abi/`. An entry is re-extracted from its Foundry artifact
+    when the artifact's mtime changed (e.g. after `forge build`); without artifacts the bundle, or
+    else the ABIs checked into `abi/`, are used as they are.
+    """
+    try:
+        with open(BUNDLE_PATH) as f:
+            bundle = json.load(f)
+    except (OSError, ValueError):
+        bundle = {}
+
+    abis = {}
+    changed = False
+    for name in contract_names:
+        artifact_path = ARTIFACTS_DIR / f'{name}.sol' / f'{name}.json'
+        # Without artifacts the checked-in ABI is the source, so removing out/ does not leave its ABI behind
+        source = str(artifact_path) if artifact_path.exists() else _checked_in_abi_path(name)
+        try:
+            mtime = os.stat(source).st_mtime_ns
+        except (OSError, TypeError):
+            mtime = None
+
+        entry = bundle.get(name)
+        if entry and entry.get('source') == source and entry['mtime'] == mtime:
+            abis[name] = entry['abi']
+            continue
+
+        abi = load_abi(name) if source == str(artifact_path) else _load_checked_in_abi(name)
+        bundle[name] = {'source': source, 'mtime': mtime, 'abi': abi}
+        abis[name] = abi
+        changed = True
+
+    if changed:
+        # Written to a temporary file first so a concurrent start never reads half a bundle
+        try:
+            tmp_path = BUNDLE_PATH.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(bundle, f, separators=(',', ':'))
+            os.replace(tmp_path, BUNDLE_PATH)
+        except OSError:
+            pass
+    return abis
+
+
+def _checked_in_abi_path(contract_name: str) -> str:
+    for path in (ABI_DIR / f'{contract_name}_abi.json', ABI_DIR / f'{contract_name}.json'):
+        if path.exists():
+            return str(path)
+    return None
+
+
+def _load_checked_in_abi(contract_name: str) -> list:
+    path = _checked_in_abi_path(contract_name)
+    if path is None:
+        raise FileNotFoundError(f"No ABI for {contract_name}, run `forge build` first")
+    with open(path) as f:
+        data = json.load(f)
+    return data['abi'] if isinstance(data, dict) else data
@@ -0,0 +1,184 @@
+import json
+from typing import Any, Dict, List, Tuple
+from eth_abi import encode
+from eth_account import Account
+from web3 import Web3
+from utils.contract_functions import HOOK_PERMISSIONS
+from utils.load_abi import ARTIFACTS_DIR
+
+# RPC_URL that selects the in-process chain in initialize_web3
+LOCAL_CHAIN_URL = "eth-tester://"
+
+# Runtime code of the deterministic CREATE2 deployer forge scripts use: calldata is salt ++ init code
+CREATE2_DEPLOYER_RUNTIME = bytes.fromhex(
+    "7fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffe03601600081602082378035828234f58015156039578182fd5b8082525050506014600cf3"
+)
+# Init code that returns the runtime code above: CODECOPY it to memory 0 and RETURN it
+CREATE2_DEPLOYER_INIT = bytes.fromhex(f"60{len(CREATE2_DEPLOYER_RUNTIME):02x}80600b6000396000f3") + CREATE2_DEPLOYER_RUNTIME
+
+# Same as script/Anvil.s.sol
+HOOK_FLAGS = ("afterInitialize", "afterSwap")
+POOL_FEE = 3000
+SQRT_PRICE_1_1 = 79228162514264337593543950336
+MAX_UINT256 = 2**256 - 1
+INITIAL_BALANCE = 100_000 * 10**18
+
+_active_chain = None
+
+
+def hook_flags(permissions: Tuple[str, ...] = HOOK_FLAGS) -> int:
+    """Address bits a hook with these permissions must have, the first of HOOK_PERMISSIONS is the highest"""
+    return sum(1 << (len(HOOK_PERMISSIONS) - 1 - HOOK_PERMISSIONS.index(name)) for name in permissions)
+
+
+def mine_hook_salt(deployer: str, init_code: bytes, flags: int, max_attempts: int = 1_000_000) -> Tuple[str, bytes]:
+    """CREATE2 salt that puts a hook at an address whose low bits are exactly `flags`, like HookMiner.find"""
+    mask = (1 << len(HOOK_PERMISSIONS)) - 1
+    prefix = b"\xff" + bytes.fromhex(deployer[2:])
+    init_code_hash = Web3.keccak(init_code)
+    for salt in range(max_attempts):
+        salt_bytes = salt.to_bytes(32, "big")
+        address = Web3.keccak(prefix + salt_bytes + init_code_hash)[12:]
+        if int.from_bytes(address, "big") & mask == flags:
+            return Web3.to_checksum_address(address), salt_bytes
+    raise ValueError(f"No hook address with flags {flags:#x} in {max_attempts} salts")
+
+
+def load_artifact(contract_name: str) -> Tuple[List[Dict[str, Any]], bytes]:
+    """ABI and creation bytecode from a Foundry artifact in out/"""
+    path = ARTIFACTS_DIR / f"{contract_name}.sol" / f"{contract_name}.json"
+    if not path.exists():
+        raise FileNotFoundError(f"No {contract_name} artifact at {path}, run `forge build` first")
+    with open(path) as f:
+        artifact = json.load(f)
+    bytecode = (artifact.get("bytecode") or {}).get("object", "")
+    bytecode = bytecode[2:] if bytecode.startswith("0x") else bytecode
+    if not bytecode:
+        raise ValueError(f"The {contract_name} artifact has no bytecode, run `forge build` first")
+    return artifact["abi"], bytes.fromhex(bytecode)
+
+
+def local_web3() -> Web3:
+    """Web3 of the in-process chain, created with the default Config on first use"""
+    global _active_chain
+    if _active_chain is None:
+        from config import Config
+        LocalChain(Config)
+    return _active_chain.web3
+
+
+class LocalChain:
+    def __init__(self, config, liquidity: int = 100 * 10**18):
+        """
+        An in-process py-evm chain with the same deployment as script/Anvil.s.sol: PoolManager,
+        PoolSwapTest, two MockERC20 and the GridHook at a mined hook address, the pool initialized
+        at price 1 and `liquidity` added over the full range when the PoolModifyLiquidityTest
+        artifact is there. No HTTP, so scripted runs are limited by the EVM only. `config` is the
+        Config to start from, `self.config` is a copy with this chain's URL and addresses.
+        """
+        global _active_chain
+        try:
+            from web3 import EthereumTesterProvider
+            provider = EthereumTesterProvider()
+        except ImportError as e:
+            raise ImportError("The in-process chain needs eth-tester and py-evm: pip install 'web3[tester]'") from e
+
+        self.web3 = Web3(provider)
+        self.tester = provider.ethereum_tester
+        self.account = Account.from_key(config.PRIVATE_KEY).address
+        self.tick_spacing = config.POOL_KEY["tickSpacing"]
+        self.liquidity = liquidity
+
+        # The agent's key, funded from one of the prefunded test accounts
+        self.tester.add_account(config.PRIVATE_KEY)
+        funder = self.tester.get_accounts()[0]
+        self._wait(self.web3.eth.send_transaction({"from": funder, "to": self.account, "value": 1000 * 10**18}))
+
+        self.addresses = self._deploy()
+        self.config = type("LocalConfig", (config,), {
+            "RPC_URL": LOCAL_CHAIN_URL,
+            "CHAIN_ID": self.web3.eth.chain_id,
+            **self.addresses,
+            "POOL_KEY": {
+                **config.POOL_KEY,
+                "currency0": self.addresses["TOKEN0"],
+                "currency1": self.addresses["TOKEN1"],
+                "fee": POOL_FEE,
+                "hooks": self.addresses["GRID_HOOK_ADDRESS"],
+            },
+        })
+        _active_chain = self
+
+
+    def _deploy(self) -> Dict[str, str]:
+        manager = self._deploy_contract("PoolManager", "0x0000000000000000000000000000000000000000")
+
+        # The hook validates its own address in the constructor, so it has to be deployed with CREATE2
+        factory = self._wait(self.web3.eth.send_transaction({"from": self.account, "data": CREATE2_DEPLOYER_INIT}))["contractAddress"]
+        _, hook_bytecode = load_artifact("GridHook")
+        init_code = hook_bytecode + encode(["address"], [manager.address])
+        hook_address, salt = mine_hook_salt(factory, init_code, hook_flags())
+        self._wait(self.web3.eth.send_transaction({"from": self.account, "to": factory, "data": salt + init_code}))
+        if not self.web3.eth.get_code(hook_address):
+            raise RuntimeError(f"GridHook was not deployed at {hook_address}")
+
+        swap_router = self._deploy_contract("PoolSwapTest", manager.address)
+        token0, token1 = sorted(
+            [self._deploy_token("MockA", "A"), self._deploy_token("MockB", "B")],
+            key=lambda token: int(token.address, 16)
+        )
+
+        spenders = [hook_address, swap_router.address]
+        try:
+            lp_router = self._deploy_contract("PoolModifyLiquidityTest", manager.address)
+            spenders.append(lp_router.address)
+        except (OSError, ValueError):
+            lp_router = None
+
+        for token in (token0, token1):
+            self._transact(token.functions.mint(self.account, INITIAL_BALANCE))
+            for spender in spenders:
+                self._transact(token.functions.approve(spender, MAX_UINT256))
+
+        pool_key = (token0.address, token1.address, POOL_FEE, self.tick_spacing, hook_address)
+        self._transact(manager.functions.initialize(pool_key, SQRT_PRICE_1_1))
+        if lp_router is not None:
+            # Full range, same as TickMath.minUsableTick / maxUsableTick
+            max_tick = 887272 // self.tick_spacing * self.tick_spacing
+            self._transact(lp_router.functions.modifyLiquidity(pool_key, (-max_tick, max_tick, self.liquidity, b"\x00" * 32), b""))
+
+        return {
+            "POOL_MANAGER_ADDRESS": manager.address,
+            "GRID_HOOK_ADDRESS": hook_address,
+            "POOL_SWAP_TEST": swap_router.address,
+            "TOKEN0": token0.address,
+            "TOKEN1": token1.address,
+        }
+
+
+    def _deploy_contract(self, contract_name: str, *args):
+        abi, bytecode = load_artifact(contract_name)
+        contract = self.web3.eth.contract(abi=abi, bytecode=bytecode)
+        address = self._wait(contract.constructor(*args).transact({"from": self.account}))["contractAddress"]
+        return self.web3.eth.contract(address=address, abi=abi)
+
+
+    def _deploy_token(self, name: str, symbol: str):
+        abi, _ = load_artifact("MockERC20")
+        # solmate's MockERC20 takes its metadata in the constructor, forge-std's in initialize()
+        if any(entry["type"] == "constructor" and entry["inputs"] for entry in abi):
+            return self._deploy_contract("MockERC20", name, symbol, 18)
+        token = self._deploy_contract("MockERC20")
+        self._transact(token.functions.initialize(name, symbol, 18))
+        return token
+
+
+    def _transact(self, function):
+        return self._wait(function.transact({"from": self.account}))
+
+
+    def _wait(self, tx_hash):
+        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        if receipt["status"] != 1:
+            raise RuntimeError(f"Deployment transaction {tx_hash.hex()} reverted")
+        return receipt
@@ -0,0 +1,264 @@
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+
+
+class ScriptedResponses:
+    """
+    Completions played back in order, one per distinct request. Each response is a dict with
+    optional "content", "tool_calls" ([{"name", "arguments"}]), "delay" (seconds before the first token)
+    and "faults", e.g. [{"status": 500}, {"stall": 5.0}], applied to the first requests for that response.
+    Repeated requests (retries, hedged duplicates) get the same response as the first one.
+    """
+
+    def __init__(
+            self,
+            responses: List[Dict[str, Any]] = None,
+            first_token_delay: float = 0.0,
+            chunk_delay: float = 0.0,
+            error_rate: float = 0.0,
+            stall_rate: float = 0.0,
+            stall_delay: float = 5.0,
+            seed: int = None
+        ):
+        self.responses = copy.deepcopy(list(responses or []))
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        # Random faults on top of the scripted ones
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_delay = stall_delay
+        self.requests = 0
+        self.faults = 0
+        self._random = random.Random(seed)
+        self._served: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_prefix = ""
+
+
+    @classmethod
+    def from_session(cls, session: Dict[str, Any]) -> "ScriptedResponses":
+        faults = session.get("faults", {})
+        return cls(
+            [response for turn in session["turns"] for response in turn["responses"]],
+            session.get("first_token_delay", 0.0),
+            session.get("chunk_delay", 0.0),
+            faults.get("error_rate", 0.0),
+            faults.get("stall_rate", 0.0),
+            faults.get("stall_delay", 5.0),
+            faults.get("seed")
+        )
+
+
+    def extend(self, responses: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.responses.extend(responses)
+
+
+    def next(self, request: Dict[str, Any]) -> tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Response for a request and the fault to inject into it, if any"""
+        key = json.dumps([request.get("model"), request.get("messages"), request.get("tools")], sort_keys=True)
+        with self._lock:
+            self.requests += 1
+            if key not in self._served:
+                self._served[key] = self.responses.pop(0) if self.responses else {"content": "OK"}
+            response = self._served[key]
+
+            fault = None
+            if response.get("faults"):
+                fault = response["faults"].pop(0)
+            elif self._random.random() < self.error_rate:
+                fault = {"status": 500}
+            elif self._random.random() < self.stall_rate:
+                fault = {"stall": self.stall_delay}
+            if fault:
+                self.faults += 1
+            return response, fault
+
+
+    def usage(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Approximate usage, ~4 characters per token. Like provider-side prompt caching, the part of
+        the prompt shared with the previous request counts as cached once it is at least 1024 tokens,
+        in 128 token increments.
+        """
+        prompt = json.dumps(request.get("tools") or []) + json.dumps(request.get("messages") or [])
+        with self._lock:
+            shared = 0
+            for a, b in zip(prompt, self._last_prefix):
+                if a != b:
+                    break
+                shared += 1
+            self._last_prefix = prompt
+
+        prompt_tokens = len(prompt) // 4
+        cached_tokens = shared // 4 // 128 * 128
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": 0,
+            "total_tokens": prompt_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens if cached_tokens >= 1024 else 0},
+        }
+
+
+def _chunks(text: str, size: int = 8) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+def _tool_calls(response: Dict[str, Any], request_number: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"call_{request_number}_{index}",
+            "type": "function",
+            "function": {
+                "name": tool_call["name"],
+                "arguments": json.dumps(tool_call.get("arguments", {}))
+            }
+        }
+        for index, tool_call in enumerate(response.get("tool_calls") or [])
+    ]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    script: ScriptedResponses = None
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or "{}")
+        response, fault = self.script.next(request)
+        request_number = self.script.requests
+
+        if fault and "status" in fault:
+            data = json.dumps({"error": {"message": "injected fault", "type": "server_error"}}).encode()
+            self.send_response(fault["status"])
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if fault and "stall" in fault:
+            time.sleep(fault["stall"])
+        time.sleep(response.get("delay", self.script.first_token_delay))
+
+        if request.get("stream"):
+            self._stream(request, response, request_number)
+        else:
+            self._complete(request, response, request_number)
+
+
+    def _envelope(self, request: Dict[str, Any], request_number: int, obj: str) -> Dict[str, Any]:
+        return {
+            "id": f"chatcmpl-mock-{request_number}",
+            "object": obj,
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+        }
+
+
+    def _complete(self, request: Dict[str, Any], response: Dict[str, Any], request_number: int):
+        tool_calls = _tool_calls(response, request_number)
+        message = {"role": "assistant", "content": response.get("content")}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        body = {
+            **self._envelope(request, request_number, "chat.completion"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+            "usage": self.script.usage(request),
+        }
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+    def _stream(self, request: Dict[str, Any], response: Dict[str, Any], request_number: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        envelope = self._envelope(request, request_number, "chat.completion.chunk")
+
+        def send(delta: Dict[str, Any], finish_reason: str = None):
+            chunk = {**envelope, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.script.chunk_delay)
+
+        send({"role": "assistant", "content": ""})
+        if response.get("content"):
+            for text in _chunks(response["content"]):
+                send({"content": text})
+
+        tool_calls = _tool_calls(response, request_number)
+        for index, tool_call in enumerate(tool_calls):
+            send({"tool_calls": [{
+                "index": index,
+                "id": tool_call["id"],
+                "type": "function",
+                "function": {"name": tool_call["function"]["name"], "arguments": ""}
+            }]})
+            for arguments in _chunks(tool_call["function"]["arguments"]):
+                send({"tool_calls": [{"index": index, "function": {"arguments": arguments}}]})
+
+        send({}, "tool_calls" if tool_calls else "stop")
+        if (request.get("stream_options") or {}).get("include_usage"):
+            chunk = {**envelope, "choices": [], "usage": self.script.usage(request)}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+    def log_message(self, format, *args):
+        pass
+
+
+    def handle_one_request(self):
+        # Clients drop stalled requests on purpose (deadlines, hedging), that is not an error here
+        try:
+            super().handle_one_request()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def start_mock_server(script: ScriptedResponses, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve `script` on a background thread, the OpenAI base URL is http://host:port/v1"""
+    handler = type("ScriptedMockLLMHandler", (MockLLMHandler,), {"script": script})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_script(path: str) -> Dict[str, Any]:
+    """
+    Load a scripted session: {"first_token_delay", "chunk_delay", "turns": [{"user", "responses"}],
+    "faults": {"error_rate", "stall_rate", "stall_delay", "seed"}}
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+# Example usage, from agent/src:
+#   python utils/mock_llm_server.py benchmarks/basic_session.json --port 8000
+#   OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=mock python main.py
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI compatible server that plays back scripted completions")
+    parser.add_argument("script", help="Scripted session JSON file")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    script = ScriptedResponses.from_session(load_script(args.script))
+    server = start_mock_server(script, port=args.port)
+    print(f"Mock LLM server listening on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,27 @@
+import threading
+from web3 import Web3
+
+
+class NonceManager:
+    def __init__(self, web3: Web3, address: str):
+        """Hand out consecutive nonces for one account, safe to share between threads"""
+        self.web3 = web3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+
+
+    def next_nonce(self) -> int:
+        """Reserve the next nonce, reading the pending count from the node only once"""
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self.web3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+
+    def reset(self) -> None:
+        """Forget the local counter, e.g. after a transaction failed before it reached the node"""
+        with self._lock:
+            self._next_nonce = None
@@ -1,47 +1,126 @@
-
 import json
+import os
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+BROADCAST_DIR = Path(__file__).parent.parent.parent.parent / "broadcast"
+# Parsed broadcasts, keyed by file path, mtime and size, so startup does not re-read large broadcast JSON
+CACHE_PATH = Path(__file__).parent.parent / ".cache" / "deployments.json"
+
+# Contract name in the broadcast -> Config attribute, the two MockERC20 tokens are ordered by address
+CONFIG_NAMES = {
+    "GridHook": "GRID_HOOK_ADDRESS",
+    "PoolManager": "POOL_MANAGER_ADDRESS",
+    "PoolSwapTest": "POOL_SWAP_TEST",
+}
+
 
-def parse_deployments(broadcast_dir: str = "../broadcast") -> List[Tuple[str, str]]:
+def latest_broadcast(broadcast_dir: Path = BROADCAST_DIR, chain_id: int = None) -> Optional[Path]:
+    """Most recently written run-latest.json, only looking at broadcast/<script>/<chain id>/"""
+    pattern = f"*/{chain_id}/run-latest.json" if chain_id is not None else "*/*/run-latest.json"
+    candidates = list(Path(broadcast_dir).glob(pattern))
+    if not candidates:
+        return None
+    return max(candidates, key=lambda path: path.stat().st_mtime_ns)
+
+
+def parse_deployments(broadcast_dir: str = BROADCAST_DIR, chain_id: int = None) -> List[Tuple[str, str]]:
     """
     Parse contract deployments from the latest broadcast file.
     """
     try:
-        # Find the latest broadcast file
-        broadcast_path = Path(broadcast_dir)
-        latest_files = list(broadcast_path.rglob("run-latest.json"))
-        
-        if not latest_files:
+        file_path = latest_broadcast(Path(broadcast_dir), chain_id)
+        if file_path is None:
             raise FileNotFoundError("No run-latest.json files found")
-            
+
+        stat = file_path.stat()
+        key = f"{file_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+        cache = _read_cache()
+        if key in cache:
+            return [tuple(deployment) for deployment in cache[key]]
+
+        with open(file_path) as f:
+            data = json.load(f)
+
         deployments = []
-        
-        # Parse each run-latest.json file found
-        for file_path in latest_files:
-            with open(file_path) as f:
-                data = json.load(f)
-                
-            # Extract contract deployments from transactions
-            for tx in data.get("transactions", []):
-                if tx.get("transactionType") == "CREATE" and tx.get("contractAddress"):
-                    contract_name = tx.get("contractName")
-                    contract_address = tx.get("contractAddress")
-                    
-                    if contract_name and contract_address:
-                        deployments.append((contract_name, contract_address))
-        
+        # Extract contract deployments from transactions, the hook is deployed with CREATE2
+        for tx in data.get("transactions", []):
+            if tx.get("transactionType") in ("CREATE", "CREATE2") and tx.get("contractAddress"):
+                contract_name = tx.get("contractName")
+                contract_address = tx.get("contractAddress")
+
+                if contract_name and contract_address:
+                    deployments.append((contract_name, contract_address))
+
+        # Only the latest broadcast is worth keeping
+        _write_cache({key: deployments})
         return deployments
-                    
+
     except Exception as e:
         print(f"Error parsing deployments: {str(e)}")
         return []
 
+
+def load_deployment(broadcast_dir: str = BROADCAST_DIR, chain_id: int = None) -> Dict[str, str]:
+    """Config attribute -> address for the contracts of the latest broadcast, empty if there is none"""
+    if latest_broadcast(Path(broadcast_dir), chain_id) is None:
+        return {}
+
+    addresses = {}
+    tokens = []
+    for name, address in parse_deployments(broadcast_dir, chain_id):
+        if name in CONFIG_NAMES:
+            addresses[CONFIG_NAMES[name]] = address
+        elif name == "MockERC20":
+            tokens.append(address)
+
+    # Pools order their currencies by address
+    if len(tokens) >= 2:
+        token0, token1 = sorted(tokens[-2:], key=lambda address: int(address, 16))
+        addresses["TOKEN0"], addresses["TOKEN1"] = token0, token1
+    return addresses
+
+
+def missing_contracts(web3, addresses: Dict[str, str]) -> List[str]:
+    """Names of the `addresses` without code on chain, checked in a single batched eth_getCode request"""
+    # Imported here, config imports this module and must not load web3 at startup
+    from web3.exceptions import Web3TypeError
+    names = list(addresses)
+    try:
+        with web3.batch_requests() as batch:
+            for name in names:
+                batch.add(web3.eth.get_code(web3.to_checksum_address(addresses[name])))
+            codes = batch.execute()
+    except Web3TypeError:
+        # Providers without batching (e.g. the in-process chain) are asked one address at a time
+        codes = [web3.eth.get_code(web3.to_checksum_address(addresses[name])) for name in names]
+    return [name for name, code in zip(names, codes) if not code]
+
+
+def _read_cache() -> Dict[str, list]:
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache: Dict[str, list]) -> None:
+    try:
+        CACHE_PATH.parent.mkdir(exist_ok=True)
+        tmp_path = CACHE_PATH.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        pass
+
+
 # Example usage
 if __name__ == "__main__":
     deployments = parse_deployments()
-    
+
     print("Contract Deployments:")
     print("--------------------")
     for name, address in deployments:
-        print(f"{name}: {address}")
\ No newline at end of file
+        print(f"{name}: {address}")
@@ -0,0 +1,69 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from utils.router import INTENTS
+from utils import profiling
+
+
+TICK = re.compile(r"\btick (-?\d+)")
+TICK_RANGE = re.compile(r"\btick (-?\d+) and (?:tick )?(-?\d+)")
+ADDRESS = re.compile(r"\b(gridhook|pool|0x[0-9a-f]{40})\b")
+
+
+class Prefetcher:
+    def __init__(self, contract_functions, max_workers: int = 2):
+        """
+        Start the chain reads a turn is likely to need as soon as the user hits Enter, while the
+        model is still thinking. Reads go through the block cache of `contract_functions`, so the
+        tool call that follows is served from memory. The guess is a keyword match, a wrong one
+        only costs a few reads of a local node.
+        """
+        self.contract_functions = contract_functions
+        self.cache = contract_functions.cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+
+
+    def guess(self, user_input: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Read-only tool calls, with the arguments the model would most likely use"""
+        text = user_input.lower()
+        calls = []
+
+        if INTENTS["get_balances"].search(text):
+            address = ADDRESS.search(text)
+            calls.append(("get_balances", {"address": address.group(1)} if address else {}))
+
+        if INTENTS["check_positions"].search(text):
+            tick_range = TICK_RANGE.search(text)
+            tick = TICK.search(text)
+            if tick_range:
+                lower, upper = sorted(int(value) for value in tick_range.groups())
+                calls.append(("check_positions", {"lower_tick": lower, "upper_tick": upper}))
+            elif tick:
+                calls.append(("check_positions", {"tick": int(tick.group(1))}))
+            else:
+                # The default ladder around the current tick, slot0 included
+                calls.append(("check_positions", {}))
+        return calls
+
+
+    def start(self, user_input: str) -> List[str]:
+        """Prefetch in the background, returns the names of the tools being warmed up"""
+        calls = self.guess(user_input)
+        for name, args in calls:
+            self._pool.submit(self._prefetch, name, args)
+        return [name for name, _ in calls]
+
+
+    def _prefetch(self, name: str, args: Dict[str, Any]) -> None:
+        # The result itself is thrown away, what matters is the cache entries its reads leave behind
+        with self.cache.prefetching(), self.contract_functions.timings.measure("prefetch"), \
+                self.contract_functions.rpc_stats.tool(f"prefetch {name}"), profiling.thread():
+            getattr(self.contract_functions, name)(**args)
+
+
+    def report(self) -> str:
+        return self.cache.report()
+
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,204 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Frames of the profiler itself and of the import system are left out of the allocation report
+ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, __file__),
+)
+
+_DISABLED = nullcontext()
+_profiler = None
+
+
+class TurnProfiler:
+    def __init__(self, directory, top: int = 10, frames: int = 1):
+        """
+        Profile REPL turns with cProfile and tracemalloc. Every turn is written to
+        `directory`/turn-NNN.pstats and summarized as its `top` functions by cumulative time and
+        `top` lines by memory the turn allocated and still holds at its end. Work a turn hands to
+        other threads (tool calls, the LLM client's event loop) is profiled when it enters through
+        `thread()`. Allocations are only traced during turns and with `frames` stack frames, so
+        long scripted sessions do not pay for tracing everything in between.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.top = top
+        self.turn = 0
+        self.total = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._finished: List[cProfile.Profile] = []
+        self._main = None
+        self._started = None
+        self.frames = frames
+        # Allocation site -> [bytes, blocks] still held at the end of the turn that allocated them, over all turns
+        self._allocations: Dict[str, List[int]] = {}
+
+
+    def start_turn(self) -> None:
+        self.turn += 1
+        # Only allocations made during the turn are traced, a snapshot then costs what the turn allocated
+        tracemalloc.start(self.frames)
+        self._started = time.perf_counter()
+        self._main = cProfile.Profile()
+        try:
+            self._main.enable()
+        except ValueError:
+            # Like in thread(): on Python 3.12+ a prefetch that is already running holds the one
+            # active profiler, which then sees this thread too
+            self._main = None
+        except BaseException:
+            tracemalloc.stop()
+            raise
+
+
+    @contextmanager
+    def thread(self):
+        """Profile the block as part of the current turn, for work running outside the REPL thread"""
+        if getattr(self._local, "depth", 0) == 0:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler, which then already sees every thread
+                profile = None
+            self._local.profile = profile
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0 and self._local.profile is not None:
+                self._local.profile.disable()
+                with self._lock:
+                    self._finished.append(self._local.profile)
+                self._local.profile = None
+
+
+    def end_turn(self, label: str = "") -> str:
+        """Stop profiling the turn, write its pstats file and return a short report"""
+        if self._main is not None:
+            self._main.disable()
+        elapsed = time.perf_counter() - self._started
+        # Before the stats are merged, so the profiler's own allocations stay out of the report
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        allocations = snapshot.filter_traces(ALLOCATION_FILTERS).statistics("lineno")
+        for stat in allocations:
+            totals = self._allocations.setdefault(str(stat.traceback), [0, 0])
+            totals[0] += stat.size
+            totals[1] += stat.count
+        # Background work still running (e.g. a prefetch) is counted in the turn it finishes in
+        with self._lock:
+            profiles, self._finished = [profile for profile in (self._main, *self._finished) if profile is not None], []
+
+        heading = f"[profile turn {self.turn}{' ' + label if label else ''}: {elapsed:.2f}s"
+        if profiles:
+            stats = pstats.Stats(profiles[0], stream=io.StringIO())
+            for profile in profiles[1:]:
+                stats.add(profile)
+            path = self.directory / f"turn-{self.turn:03d}.pstats"
+            stats.dump_stats(path)
+            if self.total is None:
+                self.total = pstats.Stats(str(path), stream=io.StringIO())
+            else:
+                self.total.add(str(path))
+            lines = [f"{heading}, {path}]", "  top cumulative time:"]
+            lines.extend(f"    {seconds:8.3f}s {calls:>8} calls  {name}" for name, calls, seconds in self._top_functions(stats))
+        else:
+            # The profiler that saw this turn belongs to work still running, it is counted when that ends
+            lines = [f"{heading}, profiled by a background thread that is still running]"]
+        lines.append("  top allocations still held at the end of the turn:")
+        lines.extend(f"    {_format_size(stat.size):>10} {stat.count:>8} blocks  {stat.traceback}" for stat in allocations[:self.top])
+        return "\n".join(lines)
+
+
+    def close(self) -> Optional[Path]:
+        """Write all turns combined to all-turns.pstats and summary.txt, returns the summary's path"""
+        if self.total is None:
+            return None
+
+        self.total.dump_stats(self.directory / "all-turns.pstats")
+
+        summary = io.StringIO()
+        summary.write(f"{self.turn} turn(s) profiled\n\n")
+        self.total.stream = summary
+        self.total.sort_stats("cumulative").print_stats(self.top * 3)
+        self.total.sort_stats("tottime").print_stats(self.top * 3)
+        summary.write("Memory still held at the end of the turn that allocated it, by line, summed over all turns:\n")
+        allocations = sorted(self._allocations.items(), key=lambda item: -item[1][0])
+        for site, (size, count) in allocations[:self.top * 3]:
+            summary.write(f"{_format_size(size):>10} {count:>8} blocks  {site}\n")
+
+        path = self.directory / "summary.txt"
+        path.write_text(summary.getvalue())
+        return path
+
+
+    def _top_functions(self, stats: pstats.Stats):
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:self.top]
+        return [(pstats.func_std_string(function), calls, cumulative) for function, (_, calls, _, cumulative, _) in rows]
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024 or unit == "MiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def start(directory, top: int = 10) -> Optional[TurnProfiler]:
+    """Turn per-turn profiling on for the whole process, a falsy `directory` leaves it off"""
+    global _profiler
+    if directory:
+        _profiler = TurnProfiler(directory, top)
+    return _profiler
+
+
+def stop() -> Optional[Path]:
+    """Write the combined summary, returns its path"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler.close() if profiler is not None else None
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+@contextmanager
+def turn(label: str = ""):
+    """Profile one REPL turn and print its report afterwards, a no-op while profiling is off"""
+    if _profiler is None:
+        yield
+        return
+    _profiler.start_turn()
+    try:
+        yield
+    finally:
+        print(_profiler.end_turn(label))
+
+
+def thread():
+    """`with thread():` around work another thread does for the current turn"""
+    if _profiler is None:
+        return _DISABLED
+    return _profiler.thread()
+
+
+async def profiled(coroutine):
+    """Await `coroutine` with the event loop thread profiled as part of the current turn"""
+    with thread():
+        return await coroutine
@@ -0,0 +1,146 @@
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+
+# Keyword groups that each map to a single tool
+INTENTS = {
+    "get_balances": re.compile(r"\bbalances?\b|tokens do i have"),
+    "check_positions": re.compile(r"\bpositions?\b|\bopen orders\b|\bpending\b|\bclaimable\b"),
+    "get_hook_permissions": re.compile(r"\bpermissions?\b"),
+    "swap": re.compile(r"\bswap\b"),
+    "place_order": re.compile(r"\b(buy|sell|place|create position|limit order)\b"),
+}
+
+# Requests that need planning or several dependent steps
+MULTI_STEP = re.compile(r"\b(and|then|after|afterwards|also|grid|strategy|plan|rebalance|why|explain|should i)\b|[;,]")
+
+JSON_TYPES = {"integer": int, "boolean": bool, "string": str, "number": (int, float), "object": dict, "array": list}
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str
+    escalated: bool = False
+    # The one tool a single intent request asks for, None when it needs planning or several tools
+    intent: Optional[str] = None
+
+
+@dataclass
+class ModelUsage:
+    calls: int = 0
+    latency: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+
+class ModelRouter:
+    def __init__(self, large_model: str, small_model: Optional[str], prices: Dict[str, Any] = None):
+        """
+        Pick the model for a turn from its text and the conversation so far: single tool intents
+        go to `small_model`, anything that needs planning stays on `large_model`.
+        """
+        self.large_model = large_model
+        self.small_model = small_model
+        self.prices = prices or {}
+        self.decisions: List[RouteDecision] = []
+        self.usage: Dict[str, ModelUsage] = {}
+        self._lock = threading.Lock()
+
+
+    def route(self, user_input: str, messages: List[Dict[str, Any]]) -> RouteDecision:
+        text = user_input.lower()
+        intents = [name for name, pattern in INTENTS.items() if pattern.search(text)]
+        multi_step = MULTI_STEP.search(text)
+
+        if not self.small_model:
+            decision = RouteDecision(self.large_model, "no small model configured")
+        elif multi_step:
+            decision = RouteDecision(self.large_model, "multi-step request")
+        elif len(intents) != 1:
+            decision = RouteDecision(self.large_model, f"{len(intents)} tool intents")
+        elif self._last_tool_failed(messages):
+            decision = RouteDecision(self.large_model, "previous tool call failed")
+        else:
+            decision = RouteDecision(self.small_model, f"single {intents[0]} intent")
+        if len(intents) == 1 and not multi_step:
+            decision.intent = intents[0]
+
+        self.log(decision)
+        return decision
+
+
+    def escalate(self, decision: RouteDecision, reason: str) -> RouteDecision:
+        escalated = RouteDecision(self.large_model, f"escalated: {reason}", escalated=True)
+        self.log(escalated)
+        return escalated
+
+
+    def log(self, decision: RouteDecision) -> None:
+        with self._lock:
+            self.decisions.append(decision)
+
+
+    def record(self, model: str, latency: float, prompt_tokens: int, completion_tokens: int) -> None:
+        """Add one completion to the per-model latency and cost totals"""
+        input_price, output_price = self.prices.get(model, (0.0, 0.0))
+        with self._lock:
+            usage = self.usage.setdefault(model, ModelUsage())
+            usage.calls += 1
+            usage.latency += latency
+            usage.prompt_tokens += prompt_tokens
+            usage.completion_tokens += completion_tokens
+            usage.cost += (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+    def report(self) -> str:
+        with self._lock:
+            escalations = sum(decision.escalated for decision in self.decisions)
+            lines = [f"routing: {len(self.decisions) - escalations} decision(s), {escalations} escalation(s)"]
+            for model, usage in sorted(self.usage.items()):
+                lines.append(
+                    f"{model}: {usage.calls} call(s), avg {usage.latency / usage.calls:.2f}s, "
+                    f"{usage.prompt_tokens}+{usage.completion_tokens} tokens, ${usage.cost:.4f}"
+                )
+        return "\n".join(lines)
+
+
+    def _last_tool_failed(self, messages: List[Dict[str, Any]]) -> bool:
+        for message in reversed(messages):
+            if message.get("role") == "tool":
+                return '"error"' in (message.get("content") or "")
+            if message.get("role") == "user" and message is not messages[-1]:
+                return False
+        return False
+
+
+def validate_tool_call(tool_call: Dict[str, Any], tools: List[Dict[str, Any]]) -> Optional[str]:
+    """Check a tool call against the tool schemas, returns the problem or None if it is valid"""
+    name = tool_call["function"]["name"]
+    schema = next((tool["function"] for tool in tools or [] if tool["function"]["name"] == name), None)
+    if schema is None:
+        return f"unknown tool {name}"
+
+    try:
+        arguments = json.loads(tool_call["function"]["arguments"] or "{}")
+    except json.JSONDecodeError:
+        return f"{name} arguments are not valid JSON"
+    if not isinstance(arguments, dict):
+        return f"{name} arguments are not an object"
+
+    properties = schema["parameters"].get("properties", {})
+    for required in schema["parameters"].get("required", []):
+        if required not in arguments:
+            return f"{name} is missing {required}"
+    for key, value in arguments.items():
+        if key not in properties:
+            return f"{name} has unexpected argument {key}"
+        expected = JSON_TYPES.get(properties[key].get("type"))
+        # bool is a subclass of int, so integers must be checked explicitly
+        if expected and (not isinstance(value, expected) or (expected is int and isinstance(value, bool))):
+            return f"{name}.{key} should be {properties[key]['type']}"
+    return None
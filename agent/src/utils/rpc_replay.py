@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+from web3 import Web3
+from web3.middleware import Web3Middleware
+from web3.providers.base import JSONBaseProvider
+
+
+def request_key(method: str, params: Any) -> str:
+    return method + json.dumps(params, sort_keys=True, separators=(",", ":"), default=_to_json)
+
+
+def _to_json(value):
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class RPCRecorder:
+    def __init__(self, path: str):
+        """
+        Append every JSON-RPC request of a Web3 instance and its response to `path`, one compact
+        JSON line each: {"m": method, "p": params, "r": result or "e": error, "t": seconds}
+        """
+        self.path = path
+        self._file = open(path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+
+    def instrument(self, web3: Web3) -> None:
+        # Innermost layer, so it sees the provider's raw responses before any formatting
+        web3.middleware_onion.inject(RPCRecordMiddleware.build(self), "rpc_record", layer=0)
+
+
+    def record(self, method: str, params: Any, response: Dict[str, Any], elapsed: float) -> None:
+        entry = {"m": method, "p": params, "t": round(elapsed, 6)}
+        if "error" in response:
+            entry["e"] = response["error"]
+        else:
+            entry["r"] = response.get("result")
+        line = json.dumps(entry, separators=(",", ":"), default=_to_json)
+        with self._lock:
+            self._file.write(line + "\n")
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class RPCRecordMiddleware(Web3Middleware):
+    recorder: RPCRecorder = None
+
+    @staticmethod
+    def build(recorder: RPCRecorder):
+        """Middleware factory bound to `recorder`, web3 calls it with the Web3 instance"""
+        def builder(w3: Web3) -> "RPCRecordMiddleware":
+            middleware = RPCRecordMiddleware(w3)
+            middleware.recorder = recorder
+            return middleware
+
+        return builder
+
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            started = time.perf_counter()
+            response = make_request(method, params)
+            self.recorder.record(method, params, response, time.perf_counter() - started)
+            return response
+
+        return middleware
+
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            started = time.perf_counter()
+            responses = make_batch_request(requests_info)
+            # The batch took one round trip, each entry gets an equal share of it
+            elapsed = (time.perf_counter() - started) / max(len(requests_info), 1)
+            for (method, params), response in zip(requests_info, responses):
+                self.recorder.record(method, params, response, elapsed)
+            return responses
+
+        return middleware
+
+
+def load_recording(path: str) -> Dict[str, List[Tuple[Dict[str, Any], float]]]:
+    """Recorded responses by request key, in the order they were received"""
+    responses = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = {"error": entry["e"]} if "e" in entry else {"result": entry.get("r")}
+            responses[request_key(entry["m"], entry["p"])].append((response, entry.get("t", 0.0)))
+    return dict(responses)
+
+
+class ReplayProvider(JSONBaseProvider):
+    def __init__(self, recording, realtime: bool = False):
+        """
+        Serve JSON-RPC responses from a recording (a path or the result of `load_recording`),
+        without a node. Repeated identical requests get the recorded responses in order, the last
+        one is repeated once they run out. With `realtime` every response waits as long as the
+        recorded request took, otherwise replay measures only the client-side work.
+        """
+        super().__init__()
+        self.responses = load_recording(recording) if isinstance(recording, str) else recording
+        self.realtime = realtime
+        self.misses = 0
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+
+    def make_request(self, method, params) -> Dict[str, Any]:
+        key = request_key(method, params)
+        with self._lock:
+            recorded = self.responses.get(key)
+            if not recorded:
+                self.misses += 1
+                return {"jsonrpc": "2.0", "id": 0, "error": {"code": -32601, "message": f"{method} was not recorded with these params"}}
+            index = min(self._positions[key], len(recorded) - 1)
+            self._positions[key] += 1
+
+        response, elapsed = recorded[index]
+        if self.realtime:
+            time.sleep(elapsed)
+        return {"jsonrpc": "2.0", "id": 0, **response}
+
+
+    def make_batch_request(self, requests_info) -> List[Dict[str, Any]]:
+        return [self.make_request(method, params) for method, params in requests_info]
+
+
+    def rewind(self) -> None:
+        """Start every request over from its first recorded response"""
+        with self._lock:
+            self._positions.clear()
+
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
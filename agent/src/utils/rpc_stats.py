@@ -0,0 +1,268 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import rlp
+from eth_utils import function_abi_to_4byte_selector
+from web3 import Web3
+from web3.middleware import Web3Middleware
+
+# Upper bounds of the latency histogram buckets in milliseconds, the last bucket is open ended
+BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# RPC requests made outside of any tool call, e.g. at startup or by the snapshot thread
+NO_TOOL = "(no tool)"
+# Requests whose calldata is worth decoding into a contract function
+CALL_METHODS = frozenset({"eth_call", "eth_estimateGas", "eth_sendTransaction"})
+
+
+class LatencyHistogram:
+    """Request count, total and max latency and a bucketed distribution of one kind of request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound in ms of the bucket holding the `fraction` percentile, the max for the open bucket"""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max * 1000
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets_ms": list(BUCKETS_MS) + ["inf"],
+            "buckets": list(self.buckets),
+        }
+
+
+class ToolStats:
+    """RPC requests made by all invocations of one tool"""
+
+    def __init__(self):
+        self.invocations = 0
+        self.requests = 0
+        self.seconds = 0.0
+        self.max_requests = 0
+        self.histograms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+
+class RPCStats:
+    def __init__(self, contracts: Dict[str, Tuple[str, List[Dict[str, Any]]]]):
+        """
+        Count JSON-RPC requests and their latency per method and, for calls and transactions, per
+        contract function, attributed to the tool invocation that made them. `contracts` maps
+        addresses to (name, ABI) so calldata can be named, e.g. "eth_call PoolManager.extsload".
+        """
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tools: Dict[str, ToolStats] = defaultdict(ToolStats)
+        self._names = {address.lower(): name for address, (name, _) in contracts.items()}
+        self._selectors: Dict[Tuple[str, bytes], str] = {}
+        for name, abi in contracts.values():
+            for entry in abi:
+                if entry.get("type") == "function":
+                    self._selectors[(name, function_abi_to_4byte_selector(entry))] = entry["name"]
+        self._stop = threading.Event()
+        self._thread = None
+        self.path = None
+
+
+    def instrument(self, web3: Web3) -> None:
+        # Innermost layer, so requests made by other middleware (e.g. the chain ID check) are counted too
+        web3.middleware_onion.inject(RPCStatsMiddleware.build(self), "rpc_stats", layer=0)
+
+
+    @contextmanager
+    def tool(self, name: str):
+        """Attribute the RPC requests this thread makes inside the block to one invocation of tool `name`"""
+        previous = getattr(self._local, "invocation", None)
+        invocation = self._local.invocation = [name, 0]
+        try:
+            yield
+        finally:
+            self._local.invocation = previous
+            with self._lock:
+                stats = self._tools[name]
+                stats.invocations += 1
+                stats.max_requests = max(stats.max_requests, invocation[1])
+
+
+    def record(self, method: str, params: Any, seconds: float) -> None:
+        invocation = getattr(self._local, "invocation", None)
+        if invocation is not None:
+            invocation[1] += 1
+        label = self.label(method, params)
+        with self._lock:
+            stats = self._tools[invocation[0] if invocation is not None else NO_TOOL]
+            stats.requests += 1
+            stats.seconds += seconds
+            stats.histograms[label].add(seconds)
+
+
+    def label(self, method: str, params: Any) -> str:
+        """The method, followed by Contract.function when the request carries known calldata"""
+        try:
+            if method in CALL_METHODS:
+                to, data = params[0].get("to"), params[0].get("data") or params[0].get("input")
+            elif method == "eth_sendRawTransaction":
+                to, data = _raw_transaction_call(params[0])
+            else:
+                return method
+            function = self._function_name(to, data)
+        except Exception:
+            return method
+        return f"{method} {function}" if function else method
+
+
+    def _function_name(self, to, data) -> str:
+        if not data:
+            return None
+        to = "0x" + bytes(to).hex() if isinstance(to, (bytes, bytearray)) else to
+        data = bytes.fromhex(data[2:]) if isinstance(data, str) else bytes(data)
+        name = self._names.get((to or "").lower())
+        if name is None:
+            return None
+        return f"{name}.{self._selectors.get((name, data[:4]), '0x' + data[:4].hex())}"
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "since": self.started,
+                "tools": {
+                    name: {
+                        "invocations": stats.invocations,
+                        "requests": stats.requests,
+                        "seconds": round(stats.seconds, 6),
+                        "max_requests_per_invocation": stats.max_requests,
+                        "requests_by_label": {label: histogram.to_dict() for label, histogram in stats.histograms.items()},
+                    }
+                    for name, stats in self._tools.items()
+                },
+            }
+
+
+    def report(self) -> str:
+        """Per tool request counts and latency percentiles since start, most requests first"""
+        lines = [f"RPC requests by tool, last {time.time() - self.started:.0f}s:"]
+        with self._lock:
+            for name, stats in sorted(self._tools.items(), key=lambda item: -item[1].requests):
+                if stats.invocations:
+                    lines.append(
+                        f"{name}: {stats.invocations} call(s), {stats.requests / stats.invocations:.1f} requests "
+                        f"and {stats.seconds * 1000 / stats.invocations:.1f} ms per call (max {stats.max_requests} requests)"
+                    )
+                else:
+                    lines.append(f"{name}: {stats.requests} requests, {stats.seconds * 1000:.1f} ms")
+                for label, histogram in sorted(stats.histograms.items(), key=lambda item: -item[1].total):
+                    lines.append(
+                        f"  {label:<48} {histogram.count:>6}  p50 <={histogram.percentile(0.5):g} ms  "
+                        f"p95 <={histogram.percentile(0.95):g} ms  max {histogram.max * 1000:.1f} ms  "
+                        f"total {histogram.total * 1000:.1f} ms"
+                    )
+        if len(lines) == 1:
+            lines.append("no requests yet")
+        return "\n".join(lines)
+
+
+    def start(self, path, interval: float = 30.0) -> None:
+        """Write `to_dict()` to `path` every `interval` seconds on a background thread, and once more on `close`"""
+        self.path = Path(path)
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True, name="rpc-stats")
+        self._thread.start()
+
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.dump()
+
+
+    def dump(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.to_dict(), f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.dump()
+
+
+def _raw_transaction_call(raw) -> Tuple[bytes, bytes]:
+    """`to` and calldata of a signed legacy, EIP-2930 or EIP-1559 transaction"""
+    raw = bytes.fromhex(raw[2:]) if isinstance(raw, str) else bytes(raw)
+    if raw[0] >= 0xc0:
+        fields = rlp.decode(raw)
+        return fields[3], fields[5]
+    fields = rlp.decode(raw[1:])
+    return (fields[4], fields[6]) if raw[0] == 1 else (fields[5], fields[7])
+
+
+class RPCStatsMiddleware(Web3Middleware):
+    stats: RPCStats = None
+
+    @staticmethod
+    def build(stats: RPCStats):
+        """Middleware factory bound to `stats`, web3 calls it with the Web3 instance"""
+        def builder(w3: Web3) -> "RPCStatsMiddleware":
+            middleware = RPCStatsMiddleware(w3)
+            middleware.stats = stats
+            return middleware
+
+        return builder
+
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            started = time.perf_counter()
+            try:
+                return make_request(method, params)
+            finally:
+                self.stats.record(method, params, time.perf_counter() - started)
+
+        return middleware
+
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            started = time.perf_counter()
+            try:
+                return make_batch_request(requests_info)
+            finally:
+                # One round trip for the whole batch, each request gets an equal share of it
+                elapsed = (time.perf_counter() - started) / max(len(requests_info), 1)
+                for method, params in requests_info:
+                    self.stats.record(method, params, elapsed)
+
+        return middleware
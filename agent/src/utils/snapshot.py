@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict
+from web3 import Web3
+from web3.exceptions import Web3TypeError
+
+# Bump when the layout of the saved state changes, older snapshots are then ignored
+SNAPSHOT_VERSION = 2
+# One file per chain ID, so e.g. the in-process test chain never replaces the anvil snapshot
+SNAPSHOT_DIR = Path(__file__).parent.parent / ".cache"
+
+
+class WarmStartSnapshot:
+    def __init__(self, web3: Web3, chain_id: int, deployment: Dict[str, Any], directory: Path = SNAPSHOT_DIR, interval: float = 60.0):
+        """
+        Agent caches saved between sessions, in `directory`/snapshot-`chain_id`.json. A snapshot only
+        applies to the chain it was taken on: it is keyed by chain ID, genesis block hash and
+        `deployment` (addresses, pool key), and the last block it saw must still be there with the
+        same hash. A restarted anvil has a new genesis hash and a reloaded state dump is missing
+        later blocks, so either way the snapshot is dropped. All of this is one batched request on
+        load, and one on save, which only happens when the state changed.
+        """
+        self.web3 = web3
+        self.chain_id = chain_id
+        # Round-tripped through JSON so it compares equal to the saved copy
+        self.deployment = json.loads(json.dumps(deployment))
+        self.directory = Path(directory)
+        self.path = self.directory / f"snapshot-{chain_id}.json"
+        self.interval = interval
+        self.restored = False
+        self._key = None
+        self._saved_state = None
+        self._collect: Callable[[], Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def load(self) -> Dict[str, Any]:
+        """Saved state for this chain and deployment, or an empty dict"""
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+            last_block = snapshot["block"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Nothing to check, so no requests until there is something to save
+            return {}
+
+        try:
+            chain_id, genesis, block = self._fetch(last_block["number"])
+        except Exception:
+            # Node not reachable, or the snapshot's block is gone
+            return {}
+        self._key = self._make_key(chain_id, genesis)
+        if snapshot.get("key") != self._key or _hash(block) != last_block["hash"]:
+            return {}
+
+        self.restored = True
+        self._saved_state = snapshot.get("state", {})
+        return self._saved_state
+
+
+    def save(self, state: Dict[str, Any]) -> None:
+        # Round-tripped through JSON like the loaded state, tuples and lists compare equal
+        state = json.loads(json.dumps(state))
+        if state == self._saved_state:
+            return
+        try:
+            chain_id, genesis, block = self._fetch("latest")
+        except Exception:
+            # Node not reachable, keep the last snapshot
+            return
+        try:
+            if self._key is None:
+                self._key = self._make_key(chain_id, genesis)
+            if self._key != self._make_key(chain_id, genesis):
+                # The node was restarted under us, this state belongs to the old chain
+                return
+            snapshot = {
+                "key": self._key,
+                "block": {"number": block["number"], "hash": _hash(block)},
+                "state": state,
+            }
+            self.directory.mkdir(exist_ok=True)
+            # Written to a temporary file first so a crash never leaves half a snapshot
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+            self._saved_state = state
+        except Exception as e:
+            print(f"Could not save the warm-start snapshot: {str(e)}")
+
+
+    def _fetch(self, block_identifier):
+        """Chain ID, genesis block and `block_identifier`, in a single batched request where possible"""
+        try:
+            with self.web3.batch_requests() as batch:
+                batch.add(self.web3.eth.chain_id)
+                batch.add(self.web3.eth.get_block(0))
+                batch.add(self.web3.eth.get_block(block_identifier))
+                return tuple(batch.execute())
+        except Web3TypeError:
+            return self.web3.eth.chain_id, self.web3.eth.get_block(0), self.web3.eth.get_block(block_identifier)
+
+
+    def _make_key(self, chain_id: int, genesis) -> Dict[str, Any]:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "chain_id": chain_id,
+            "genesis_hash": _hash(genesis),
+            "deployment": self.deployment,
+        }
+
+
+    def start(self, collect: Callable[[], Dict[str, Any]]) -> None:
+        """Save `collect()` every `interval` seconds on a background thread, and once more on `close`"""
+        self._collect = collect
+        self._thread = threading.Thread(target=self._run, daemon=True, name="snapshot")
+        self._thread.start()
+
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.save(self._collect())
+
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._collect is not None:
+            self.save(self._collect())
+
+
+def _hash(block) -> str:
+    return "0x" + bytes(block["hash"]).hex()
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+from web3 import Web3
+from web3.middleware import Web3Middleware
+from utils import tracing
+
+
+class Timings:
+    """Thread-safe accumulator of seconds spent per category (signing, receipt, rpc, ...)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._totals: Dict[str, float] = defaultdict(float)
+
+
+    @contextmanager
+    def measure(self, category: str):
+        # RPC requests made inside a measured block (e.g. receipt polling) count towards that block,
+        # and show up nested in its span when tracing is on
+        previous = getattr(self._local, "category", None)
+        self._local.category = category
+        started = time.perf_counter()
+        try:
+            with tracing.span(category):
+                yield
+        finally:
+            self.add(category, time.perf_counter() - started)
+            self._local.category = previous
+
+
+    def add(self, category: str, seconds: float) -> None:
+        with self._lock:
+            self._totals[category] += seconds
+
+
+    @property
+    def active_category(self):
+        return getattr(self._local, "category", None)
+
+
+    def reset(self) -> Dict[str, float]:
+        """Return the totals so far and start over"""
+        with self._lock:
+            totals = dict(self._totals)
+            self._totals.clear()
+            return totals
+
+
+    def instrument(self, web3: Web3) -> None:
+        """Count time spent in JSON-RPC requests of `web3` under "rpc" """
+        web3.middleware_onion.add(RPCTimingMiddleware.build(self), "rpc_timing")
+
+
+class RPCTimingMiddleware(Web3Middleware):
+    timings: Timings = None
+
+    @staticmethod
+    def build(timings: Timings):
+        """Middleware factory bound to `timings`, web3 calls it with the Web3 instance"""
+        def builder(w3: Web3) -> "RPCTimingMiddleware":
+            middleware = RPCTimingMiddleware(w3)
+            middleware.timings = timings
+            return middleware
+
+        return builder
+
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            if self.timings.active_category is not None:
+                return make_request(method, params)
+            started = time.perf_counter()
+            try:
+                return make_request(method, params)
+            finally:
+                self.timings.add("rpc", time.perf_counter() - started)
+
+        return middleware
+
+
+class TracingMiddleware(Web3Middleware):
+    label: Callable[[str, Any], str] = None
+
+    @staticmethod
+    def build(label: Callable[[str, Any], str] = None):
+        """Middleware factory bound to `label`, web3 calls it with the Web3 instance"""
+        def builder(w3: Web3) -> "TracingMiddleware":
+            middleware = TracingMiddleware(w3)
+            middleware.label = label
+            return middleware
+
+        return builder
+
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            with tracing.span("rpc " + (self.label(method, params) if self.label else method)):
+                return make_request(method, params)
+
+        return middleware
+
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            with tracing.span("rpc batch", requests=len(requests_info), methods=sorted({method for method, _ in requests_info})):
+                return make_batch_request(requests_info)
+
+        return middleware
@@ -0,0 +1,109 @@
+import json
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, List
+from utils.tool_results import ToolResult, ErrorResult
+from utils import profiling, tracing
+
+
+@dataclass
+class ToolOutput:
+    """Tool message for the model plus the typed result, for rendering to the user"""
+    message: Dict[str, Any]
+    result: ToolResult
+
+
+class ToolExecutor:
+    def __init__(self, contract_functions, max_workers: int = 4):
+        """
+        Run tool calls in the background. Read-only tools run concurrently on a thread pool,
+        write tools run one at a time in the order they were requested so their nonces
+        (and the state they depend on) line up.
+        """
+        self.contract_functions = contract_functions
+        self.read_only_tools = contract_functions.READ_ONLY_TOOLS
+        self._readers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tool-write")
+        self._last_write: Future = None
+
+        # tool name -> [calls, tokens as rendered text, tokens as compact JSON]
+        self.token_counts = defaultdict(lambda: [0, 0, 0])
+        self._stats_lock = threading.Lock()
+
+
+    def submit(self, tool_call: Dict[str, Any], parent_id: int = None) -> Future:
+        """
+        Start a tool call, the future resolves to its ToolOutput. Its span is a child of `parent_id`,
+        by default of the calling thread's current span
+        """
+        if parent_id is None:
+            parent_id = tracing.current_span_id()
+        if tool_call["function"]["name"] in self.read_only_tools:
+            # A read requested after a write should see that write's result,
+            # so it only waits for the writes submitted before it
+            return self._readers.submit(self._run_after, self._last_write, tool_call, parent_id)
+
+        self._last_write = self._writer.submit(self.call_tool, tool_call, parent_id)
+        return self._last_write
+
+
+    def run_all(self, tool_calls: List[Dict[str, Any]]) -> List[ToolOutput]:
+        """Run a list of tool calls and return their outputs in the same order"""
+        futures = [self.submit(tool_call) for tool_call in tool_calls]
+        return [future.result() for future in futures]
+
+
+    def call_tool(self, tool_call: Dict[str, Any], parent_id: int = None) -> ToolOutput:
+        """Run a single tool call and return its tool message and result"""
+        function_name = tool_call["function"]["name"]
+        with profiling.thread(), tracing.span(f"tool {function_name}", parent_id, arguments=tool_call["function"]["arguments"]) as span:
+            try:
+                function_args = json.loads(tool_call["function"]["arguments"] or "{}")
+
+                # Call the appropriate function
+                if hasattr(self.contract_functions, function_name):
+                    with self.contract_functions.rpc_stats.tool(function_name):
+                        result = getattr(self.contract_functions, function_name)(**function_args)
+                else:
+                    result = ErrorResult(f"calling {function_name}", "function not found")
+            except Exception as e:
+                result = ErrorResult(f"calling {function_name}", str(e))
+            span["ok"] = not isinstance(result, ErrorResult)
+
+        text_tokens, llm_tokens = result.token_counts()
+        with self._stats_lock:
+            counts = self.token_counts[function_name]
+            counts[0] += 1
+            counts[1] += text_tokens
+            counts[2] += llm_tokens
+
+        message = {
+            "role": "tool",
+            "tool_call_id": tool_call["id"],
+            "name": function_name,
+            "content": result.to_llm()
+        }
+        return ToolOutput(message, result)
+
+
+    def token_report(self) -> str:
+        """Per tool tokens sent to the model as compact JSON, compared to the rendered text"""
+        with self._stats_lock:
+            lines = [
+                f"{name}: {calls} call(s), ~{text} tokens as text -> ~{llm} as JSON"
+                for name, (calls, text, llm) in sorted(self.token_counts.items())
+            ]
+        return "\n".join(lines)
+
+
+    def _run_after(self, barrier: Future, tool_call: Dict[str, Any], parent_id: int = None) -> ToolOutput:
+        if barrier is not None:
+            barrier.exception()  # wait, the write's own error is reported in its tool message
+        return self.call_tool(tool_call, parent_id)
+
+
+    def shutdown(self) -> None:
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
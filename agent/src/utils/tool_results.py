@@ -0,0 +1,168 @@
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Any, List, Tuple
+
+
+def fixed_point(amount: int, decimals: int = 18) -> str:
+    """Exact decimal string for a token amount, e.g. 100000000000000000 -> "0.1" """
+    if amount == 0:
+        return "0"
+    value = Decimal(amount).scaleb(-decimals).normalize()
+    return f"{value:f}"
+
+
+def short_id(value: int) -> str:
+    """First 4 bytes of a 32 byte ID, enough to tell positions apart in a conversation"""
+    return f"0x{value:064x}"[:10]
+
+
+def _compact(fields: Dict[str, Any]) -> Dict[str, Any]:
+    # Zero amounts and missing values carry no information for the model
+    return {k: v for k, v in fields.items() if v is not None and v != "0"}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+class ToolResult(ABC):
+    """Base class for tool results: `to_llm` is what the model sees, `render` is what a user sees"""
+
+    @abstractmethod
+    def llm_fields(self) -> Dict[str, Any]:
+        ...
+
+
+    @abstractmethod
+    def render(self) -> str:
+        ...
+
+
+    def to_llm(self) -> str:
+        return json.dumps(_compact(self.llm_fields()), separators=(",", ":"))
+
+
+    def token_counts(self) -> Tuple[int, int]:
+        """Approximate tokens of the rendered text and of the compact JSON form"""
+        return estimate_tokens(self.render()), estimate_tokens(self.to_llm())
+
+
+    def __str__(self) -> str:
+        return self.render()
+
+
+@dataclass
+class ErrorResult(ToolResult):
+    action: str
+    error: str
+
+    def llm_fields(self) -> Dict[str, Any]:
+        return {"error": f"{self.action}: {self.error}"}
+
+    def render(self) -> str:
+        return f"Error {self.action}: {self.error}"
+
+
+@dataclass
+class TransactionResult(ToolResult):
+    action: str
+    tx_hash: str
+    success: bool
+    gas_used: int
+
+    def llm_fields(self) -> Dict[str, Any]:
+        return {"tx": self.tx_hash[:10], "ok": self.success, "gas": self.gas_used}
+
+    def render(self) -> str:
+        return (
+            f"{self.action} transaction sent! Hash: {self.tx_hash}\n"
+            f"Transaction status: {'Success' if self.success else 'Failed'}\n"
+            f"Gas used: {self.gas_used}"
+        )
+
+
+@dataclass
+class Position:
+    tick: int
+    zero_for_one: bool
+    position_id: int
+    pending: int
+    claimable: int
+    supply: int
+    balance: int
+
+    def llm_fields(self) -> Dict[str, Any]:
+        amounts = _compact({
+            "pending": fixed_point(self.pending),
+            "claimable": fixed_point(self.claimable),
+            "supply": fixed_point(self.supply),
+            "mine": fixed_point(self.balance),
+        })
+        return {"tick": self.tick, "sell": "token0" if self.zero_for_one else "token1", "id": short_id(self.position_id), **amounts}
+
+
+@dataclass
+class PositionsResult(ToolResult):
+    positions: List[Position] = field(default_factory=list)
+    current_tick: int = None
+
+    def llm_fields(self) -> Dict[str, Any]:
+        return {"current_tick": self.current_tick, "positions": [position.llm_fields() for position in self.positions]}
+
+    def render(self) -> str:
+        current = f"Current pool tick: {self.current_tick}\n" if self.current_tick is not None else ""
+        if not self.positions:
+            return current + "No active positions found"
+        return current + "\n".join(
+            f"\nPosition at tick {p.tick} ({'sell token0' if p.zero_for_one else 'sell token1'}):\n"
+            f"Position ID: {p.position_id}\n"
+            f"Pending order amount: {float(fixed_point(p.pending)):.4f} tokens\n"
+            f"Claimable output tokens: {float(fixed_point(p.claimable)):.4f} tokens\n"
+            f"Total claim tokens supply: {float(fixed_point(p.supply)):.4f} tokens\n"
+            f"Your claim tokens: {float(fixed_point(p.balance)):.4f} tokens"
+            for p in self.positions
+        )
+
+
+@dataclass
+class PermissionsResult(ToolResult):
+    permissions: Dict[str, bool]
+
+    def llm_fields(self) -> Dict[str, Any]:
+        return {"enabled": [name for name, enabled in self.permissions.items() if enabled]}
+
+    def render(self) -> str:
+        result = "GridHook Permissions:\n"
+        result += "-------------------\n"
+        for name, enabled in self.permissions.items():
+            result += f"{name}: {'✅' if enabled else '❌'}\n"
+        return result
+
+
+@dataclass
+class TokenBalance:
+    symbol: str
+    name: str
+    amount: int
+
+
+@dataclass
+class BalancesResult(ToolResult):
+    label: str
+    address: str
+    tokens: List[TokenBalance]
+    eth: int
+
+    def llm_fields(self) -> Dict[str, Any]:
+        balances = {token.symbol: fixed_point(token.amount) for token in self.tokens}
+        balances["ETH"] = fixed_point(self.eth)
+        return {"owner": self.label, "balances": _compact(balances)}
+
+    def render(self) -> str:
+        lines = [f"{self.label} balances:"]
+        lines += [f"• {float(fixed_point(t.amount)):.6f} {t.symbol} ({t.name})" for t in self.tokens]
+        lines.append(f"• {float(fixed_point(self.eth)):.6f} ETH")
+        return "\n" + "\n".join(lines) + "\n"
+
@@ -0,0 +1,129 @@
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional
+
+_tracer = None
+
+
+class Tracer:
+    def __init__(self, path: str):
+        """
+        Write nested timing spans to `path` as they end. A `.jsonl` path gets one JSON object per
+        span (name, start and duration in seconds, thread, id, parent id, attributes), anything else
+        gets Chrome trace events, which chrome://tracing and ui.perfetto.dev open directly. The
+        array is never closed, the trace format allows that, so a crashed session is still readable.
+        """
+        self.path = path
+        self.chrome = not path.endswith(".jsonl")
+        self._file = open(path, "w", buffering=1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._threads = set()
+        self._origin = time.perf_counter()
+        if self.chrome:
+            self._file.write("[\n")
+            self._write({"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "grid trading agent"}})
+
+
+    @contextmanager
+    def span(self, name: str, parent_id: int = None, **attrs):
+        """
+        Time the block as a child of this thread's current span, or of `parent_id` for work handed
+        to another thread. Yields the span's attribute dict, so results can be added before it ends.
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        span_id = next(self._ids)
+        if parent_id is None and stack:
+            parent_id = stack[-1]
+        stack.append(span_id)
+        started = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            self._end(name, span_id, parent_id, started, time.perf_counter(), attrs)
+
+
+    def current_span_id(self) -> Optional[int]:
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+
+    def _end(self, name: str, span_id: int, parent_id: int, started: float, ended: float, attrs: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        if not self.chrome:
+            self._write({
+                "name": name, "id": span_id, "parent": parent_id, "thread": thread.name,
+                "start": round(started - self._origin, 6), "duration": round(ended - started, 6), **attrs
+            })
+            return
+
+        if thread.ident not in self._threads:
+            self._threads.add(thread.ident)
+            self._write({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread.ident, "args": {"name": thread.name}})
+        self._write({
+            "name": name, "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+            "ts": round((started - self._origin) * 1e6, 1), "dur": round((ended - started) * 1e6, 1),
+            "args": {"id": span_id, "parent": parent_id, **attrs}
+        })
+
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, separators=(",", ":"), default=str)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + (",\n" if self.chrome else "\n"))
+
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def start(path: str) -> Optional[Tracer]:
+    """Turn tracing on for the whole process, a falsy `path` leaves it off"""
+    global _tracer
+    if path:
+        _tracer = Tracer(str(path))
+    return _tracer
+
+
+def stop() -> None:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, parent_id: int = None, **attrs):
+    """`with span("llm", model=...) as attrs:` - a no-op while tracing is off"""
+    if _tracer is None:
+        # A fresh dict each time, callers fill in attributes and must not see each other's
+        return nullcontext({})
+    return _tracer.span(name, parent_id, **attrs)
+
+
+def current_span_id() -> Optional[int]:
+    return _tracer.current_span_id() if _tracer is not None else None
+
+
+def instrument(web3, label: Callable[[str, Any], str] = None) -> None:
+    """Add a span per JSON-RPC request of `web3`, named by `label(method, params)`. Only while tracing is on"""
+    if _tracer is not None:
+        # The middleware lives with the other RPC timing middleware, this module does not depend on web3
+        from utils.timings import TracingMiddleware
+        web3.middleware_onion.inject(TracingMiddleware.build(label), "tracing", layer=0)
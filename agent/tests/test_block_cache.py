@@ -0,0 +1,113 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from web3 import EthereumTesterProvider, Web3
+from utils.block_cache import BlockCache
+from utils.prefetch import Prefetcher
+from utils.rpc_stats import RPCStats
+from utils.timings import Timings
+
+
+@pytest.fixture
+def web3():
+    return Web3(EthereumTesterProvider())
+
+
+@pytest.fixture
+def cache(web3):
+    # Check the block number on every read so tests do not depend on timing
+    return BlockCache(web3, poll_interval=0)
+
+
+def test_reads_are_cached_until_the_block_changes(web3, cache):
+    load = itertools.count(1).__next__
+    assert cache.get("slot0", load) == 1
+    assert cache.get("slot0", load) == 1
+    web3.testing.mine(1)
+    assert cache.get("slot0", load) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_invalidate_drops_entries(cache):
+    load = itertools.count(1).__next__
+    assert cache.get("balances", load) == 1
+    cache.invalidate()
+    assert cache.get("balances", load) == 2
+
+
+def test_failed_reads_are_not_cached(cache):
+    def fail():
+        raise ValueError("node unavailable")
+
+    with pytest.raises(ValueError):
+        cache.get("slot0", fail)
+    assert cache.get("slot0", lambda: 7) == 7
+
+
+def test_concurrent_reads_share_one_request(cache):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(cache.get, "slot0", slow)
+        started.wait(5)
+        second = pool.submit(cache.get, "slot0", slow)
+        release.set()
+        assert first.result(5) == second.result(5) == "value"
+    assert len(calls) == 1
+
+
+def test_prefetched_reads_are_counted_once_used(cache):
+    with cache.prefetching():
+        cache.get("slot0", lambda: 1)
+    cache.get("slot0", lambda: 2)
+    cache.get("slot0", lambda: 2)
+    assert (cache.prefetched, cache.prefetch_hits, cache.hits, cache.misses) == (1, 1, 2, 0)
+    assert "1/1 prefetched reads used (100%)" in cache.report()
+
+
+class Tools:
+    def __init__(self, cache):
+        self.cache = cache
+        self.timings = Timings()
+        self.rpc_stats = RPCStats({})
+        self.reads = []
+
+    def check_positions(self, tick: int = None, lower_tick: int = None, upper_tick: int = None):
+        return self.cache.get(("positions", tick, lower_tick, upper_tick), lambda: self.reads.append("positions"))
+
+    def get_balances(self, address: str = None):
+        return self.cache.get(("balances", address), lambda: self.reads.append("balances"))
+
+
+@pytest.mark.parametrize("text, calls", [
+    ("what are my balances?", [("get_balances", {})]),
+    ("balance of the pool", [("get_balances", {"address": "pool"})]),
+    ("show my positions between tick 120 and -60", [("check_positions", {"lower_tick": -60, "upper_tick": 120})]),
+    ("pending orders at tick -60", [("check_positions", {"tick": -60})]),
+    ("any open orders?", [("check_positions", {})]),
+    ("swap 1 token0", []),
+])
+def test_prefetcher_guess(cache, text, calls):
+    prefetcher = Prefetcher(Tools(cache))
+    assert prefetcher.guess(text) == calls
+    prefetcher.shutdown()
+
+
+def test_prefetched_read_serves_the_tool_call(cache):
+    tools = Tools(cache)
+    prefetcher = Prefetcher(tools)
+    assert prefetcher.start("what are my balances?") == ["get_balances"]
+    prefetcher.shutdown()
+
+    tools.get_balances()
+    assert tools.reads == ["balances"]
+    assert cache.prefetch_hits == 1
+    assert tools.rpc_stats.to_dict()["tools"]["prefetch get_balances"]["invocations"] == 1
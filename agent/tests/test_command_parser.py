@@ -0,0 +1,59 @@
+import pytest
+from utils.command_parser import CommandParser, FastPathStats, ParsedCommand
+from utils.tool_results import ErrorResult, TransactionResult
+
+ADDRESS = "0x" + "ab" * 20
+
+
+@pytest.fixture
+def parser():
+    return CommandParser({"tickSpacing": 60})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Swap 1.5 token0 for token1", ParsedCommand("swap", {"amount": "1.5", "zero_for_one": True})),
+    ("swap 2 token1 to token0.", ParsedCommand("swap", {"amount": "2", "zero_for_one": False})),
+    ("create position 100 token0 for token1 at tick -60",
+     ParsedCommand("place_order", {"amount": "100", "zero_for_one": True, "tick": -60})),
+    ("what gridhook permissions exist?", ParsedCommand("get_hook_permissions", {})),
+    ("how many open orders do we have?", ParsedCommand("check_positions", {})),
+    ("show position at tick 120", ParsedCommand("check_positions", {"tick": 120})),
+    ("show orders between tick -120 and 120", ParsedCommand("check_positions", {"lower_tick": -120, "upper_tick": 120})),
+    ("what is my balance", ParsedCommand("get_balances", {})),
+    ("check pool balance", ParsedCommand("get_balances", {"address": "pool"})),
+    (f"balance of {ADDRESS}", ParsedCommand("get_balances", {"address": ADDRESS})),
+])
+def test_parses_regular_commands(parser, text, expected):
+    assert parser.parse(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "swap 0 token0 for token1",
+    "swap 1 token0 for token0",
+    "place order 1 token0 for token1 at tick 900000",
+    "show orders between tick 120 and -120",
+    "check my balance then swap half",
+    "swap 1 token0 for token1 and tell me what happened",
+])
+def test_leaves_everything_else_to_the_llm(parser, text):
+    assert parser.parse(text) is None
+
+
+def test_render(parser):
+    order = parser.parse("place order 1 token1 for token0 at tick 90")
+    sent = TransactionResult("Order", "0xab", True, 21000)
+    assert parser.render(order, sent).startswith(
+        "Placed an order selling 1 token1 for token0 at tick 90 (rounded down to a multiple of the tick spacing 60)."
+    )
+    assert parser.render(order, TransactionResult("Order", "0xab", False, 21000)).startswith("The order transaction reverted.")
+    assert parser.render(order, ErrorResult("placing order", "boom")) == "Error placing order: boom"
+
+
+def test_fast_path_stats():
+    stats = FastPathStats()
+    assert stats.hit_rate == 0.0 and stats.time_saved == 0.0
+    stats.record_hit("swap", 0.1)
+    stats.record_miss(2.0)
+    assert stats.hit_rate == 0.5
+    assert stats.time_saved == pytest.approx(1.9)
+    assert str(stats) == "fast path 1/2 turns (50%), ~1.9s saved"
@@ -0,0 +1,72 @@
+import threading
+from utils.conversation import ConversationManager, digest_tool_output, estimate_tokens
+
+
+class SummarizingLLM:
+    def __init__(self):
+        self.transcripts = []
+        self.called = threading.Event()
+
+    def summarize(self, transcript: str) -> str:
+        self.transcripts.append(transcript)
+        self.called.set()
+        return "user placed orders"
+
+
+def add_turn(conversation, text, tool_output=""):
+    conversation.add_user_message(text)
+    conversation.append({"role": "assistant", "content": None, "tool_calls": [
+        {"id": "call", "type": "function", "function": {"name": "check_positions", "arguments": "{}"}}
+    ]})
+    conversation.append({"role": "tool", "tool_call_id": "call", "name": "check_positions", "content": tool_output})
+    conversation.append({"role": "assistant", "content": f"done: {text}"})
+
+
+def test_digest_elides_long_numbers_and_truncates():
+    assert digest_tool_output("id 98503915914194906783043586618936865486 ok") == "id 9850… ok"
+    digest = digest_tool_output("x" * 500, max_chars=20)
+    assert digest.startswith("x" * 20) and digest.endswith("[500 chars]")
+
+
+def test_recent_turns_verbatim_older_tool_outputs_digested():
+    conversation = ConversationManager(SummarizingLLM(), token_budget=100_000, keep_recent_turns=1)
+    output = "position 98503915914194906783043586618936865486115098976371611728845358547292137225057"
+    add_turn(conversation, "first", output)
+    add_turn(conversation, "second", output)
+    tool_messages = [m for m in conversation.context() if m["role"] == "tool"]
+    assert tool_messages[0]["content"] == "position 9850…"
+    assert tool_messages[1]["content"] == output
+
+
+def test_context_drops_oldest_turns_to_fit_the_budget():
+    conversation = ConversationManager(SummarizingLLM(), token_budget=200, keep_recent_turns=1)
+    for i in range(10):
+        add_turn(conversation, f"turn {i}", "y" * 100)
+    context = conversation.context()
+    assert estimate_tokens(context) <= 200
+    assert context[-4]["content"] == "turn 9"
+    assert all(m["content"] != "turn 0" for m in context)
+
+
+def test_old_turns_are_summarized_in_the_background():
+    llm = SummarizingLLM()
+    conversation = ConversationManager(llm, token_budget=50, keep_recent_turns=1)
+    for i in range(3):
+        add_turn(conversation, f"turn {i}", "z" * 100)
+        conversation.end_turn()
+    assert llm.called.wait(5)
+    conversation._pending_summary.result()
+    assert "call: check_positions({})" in llm.transcripts[0]
+
+    context = conversation.context()
+    assert context[0] == {"role": "system", "content": "Summary of the earlier conversation:\nuser placed orders"}
+    assert [m["content"] for m in context if m["role"] == "user"] == ["turn 2"]
+    conversation.shutdown()
+
+
+def test_drop_last_turn():
+    conversation = ConversationManager(SummarizingLLM())
+    add_turn(conversation, "kept")
+    conversation.add_user_message("failed halfway")
+    conversation.drop_last_turn()
+    assert conversation.context()[-1]["content"] == "done: kept"
@@ -0,0 +1,78 @@
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+from config import Config
+from utils.grid_events import GridEventDecoder, OrderBook, position_id
+
+HOOK = "0x9D71E6f99da38505b3c50cb0ec2ed754Ea13D040"
+ZERO = "0x0000000000000000000000000000000000000000"
+ALICE = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+BOB = "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"
+POOL_ID = bytes(range(32))
+
+
+def make_log(name, log_index=0, block_number=1, **args):
+    """A raw log as eth_getLogs returns it, ABI-encoded from the GridHook event definition"""
+    abi = next(e for e in Config.GRID_HOOK_ABI if e.get("type") == "event" and e["name"] == name)
+    indexed = [i for i in abi["inputs"] if i["indexed"]]
+    data = [i for i in abi["inputs"] if not i["indexed"]]
+    return {
+        "address": HOOK,
+        "topics": [event_abi_to_log_topic(abi)] + [encode([i["type"]], [args[i["name"]]]) for i in indexed],
+        "data": encode([i["type"] for i in data], [args[i["name"]] for i in data]),
+        "blockNumber": block_number,
+        "logIndex": log_index,
+        "transactionIndex": 0,
+        "transactionHash": b"\x11" * 32,
+        "blockHash": b"\x22" * 32,
+    }
+
+
+def decoder():
+    return GridEventDecoder(Web3(), HOOK, Config.GRID_HOOK_ABI)
+
+
+def test_decode_order_placed():
+    event = decoder().decode(make_log("OrderPlaced", poolId=POOL_ID, owner=ALICE, tick=-60, zeroForOne=False, inputAmount=5))
+    assert event["event"] == "OrderPlaced"
+    assert event["poolId"] == POOL_ID
+    assert (event["owner"], event["tick"], event["zeroForOne"], event["inputAmount"]) == (ALICE, -60, False, 5)
+
+
+def test_decode_transfer_batch_and_ignore_unknown():
+    events = decoder()
+    event = events.decode(make_log("TransferBatch", operator=ALICE, **{"from": ZERO, "to": ALICE}, ids=[1, 2], amounts=[3, 4]))
+    assert (event["from"], event["to"], event["ids"], event["amounts"]) == (ZERO, ALICE, [1, 2], [3, 4])
+    assert events.decode(make_log("OwnershipTransferred", previousOwner=ZERO, newOwner=ALICE)) is None
+    assert events.decode({"topics": []}) is None
+
+
+def test_order_book_replays_claim_balances():
+    pid = position_id(POOL_ID, 60, True)
+    grid_pid = 12345
+    logs = [
+        # placeOrder: OrderPlaced and the claim token mint
+        make_log("TransferSingle", operator=ALICE, **{"from": ZERO, "to": ALICE}, id=pid, amount=10),
+        make_log("OrderPlaced", poolId=POOL_ID, owner=ALICE, tick=60, zeroForOne=True, inputAmount=10),
+        # half of the claims change hands, then the order fills
+        make_log("TransferSingle", operator=ALICE, **{"from": ALICE, "to": BOB}, id=pid, amount=4),
+        make_log("OrderFilled", poolId=POOL_ID, tick=60, zeroForOne=True, inputAmount=10, outputAmount=9),
+        # Bob redeems his claims
+        make_log("TransferSingle", operator=BOB, **{"from": BOB, "to": ZERO}, id=pid, amount=4),
+        make_log("Redeemed", positionId=pid, owner=BOB, claimAmount=4, outputAmount=3),
+        # createGridPosition mints amountPerGrid without an OrderPlaced
+        make_log("TransferSingle", operator=BOB, **{"from": ZERO, "to": BOB}, id=grid_pid, amount=7),
+        make_log("GridCreated", poolId=POOL_ID, owner=BOB, lowerTick=-60, upperTick=60, gridSpacing=60, amountPerGrid=7, block_number=2),
+    ]
+    events = [decoder().decode(log) for log in logs]
+    book = OrderBook().apply_all(events)
+
+    assert book.balances[(ALICE, pid)] == 6
+    assert book.balances[(BOB, pid)] == 0
+    assert book.claim_supply[pid] == 6
+    assert book.claimable[pid] == 6
+    assert book.balances[(BOB, grid_pid)] == 7
+    assert book.claim_supply[grid_pid] == 7
+    assert book.pending[(POOL_ID, 60, True)] == 7
+    assert book.pending[(POOL_ID, -60, False)] == 7
+    assert book.last_block == 2
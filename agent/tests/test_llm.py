@@ -0,0 +1,84 @@
+import pytest
+from config import Config
+from utils.contract_functions import TOOL_SCHEMAS
+from utils.llm import LLMAgent
+from utils.mock_llm_server import ScriptedResponses, start_mock_server
+from utils.router import RouteDecision
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return LLMAgent(Config)
+
+
+def test_system_prompt_added_before_summary(agent):
+    messages = [
+        {"role": "system", "content": "Summary of the earlier conversation:\nuser placed an order"},
+        {"role": "user", "content": "check my balance"},
+    ]
+    agent._add_system_prompt(messages)
+    assert [m["content"] for m in messages[:3]] == [Config.PROMPT, Config.DEPLOYMENT_PROMPT, messages[2]["content"]]
+    assert messages[2]["content"].startswith("Summary of the earlier conversation")
+
+
+def test_system_prompt_added_once(agent):
+    messages = [{"role": "user", "content": "hi"}]
+    agent._add_system_prompt(messages)
+    agent._add_system_prompt(messages)
+    assert [m["content"] for m in messages] == [Config.PROMPT, Config.DEPLOYMENT_PROMPT, "hi"]
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    servers = []
+
+    def routed(*responses):
+        script = ScriptedResponses(list(responses))
+        server = start_mock_server(script)
+        servers.append(server)
+        monkeypatch.setenv("OPENAI_API_KEY", "mock")
+        monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+        agent = LLMAgent(Config)
+        events = []
+        completion, decision = agent.routed_chat_completion(
+            [{"role": "user", "content": "what is my balance"}], list(TOOL_SCHEMAS),
+            RouteDecision(Config.SMALL_LLM_MODEL, "single get_balances intent"),
+            on_content=lambda text: events.append(("content", text)),
+            on_tool_call=lambda tool_call, parent_id: events.append(("tool", tool_call["function"]["name"]))
+        )
+        return completion, decision, events, script
+
+    yield routed
+    for server in servers:
+        server.shutdown()
+
+
+def test_small_model_tool_calls_start_before_its_text(routed):
+    completion, decision, events, script = routed(
+        {"content": "Checking", "tool_calls": [{"name": "get_balances", "arguments": {"address": "user"}}]}
+    )
+    assert events == [("tool", "get_balances"), ("content", "Checking")]
+    assert (decision.model, decision.escalated, script.requests) == (Config.SMALL_LLM_MODEL, False, 1)
+
+
+def test_invalid_call_escalates_and_counts_both_attempts(routed):
+    completion, decision, events, script = routed(
+        {"content": "hmm", "tool_calls": [{"name": "get_balances", "arguments": {"address": 1}}]},
+        {"content": "Your balances", "tool_calls": [{"name": "get_balances", "arguments": {"address": "user"}}]},
+    )
+    # The small model's text never reaches the user
+    assert "hmm" not in "".join(text for kind, text in events if kind == "content")
+    assert ("tool", "get_balances") in events
+    assert (decision.model, decision.escalated, script.requests) == (Config.LLM_MODEL, True, 2)
+    assert completion.prompt_tokens > 0 and completion.total_time > 0
+
+
+def test_started_calls_stay_when_a_later_one_is_invalid(routed):
+    completion, decision, events, script = routed({"tool_calls": [
+        {"name": "get_balances", "arguments": {"address": "user"}},
+        {"name": "no_such_tool", "arguments": {}},
+    ]})
+    assert [tool_call["function"]["name"] for tool_call in completion.tool_calls] == ["get_balances"]
+    assert events == [("tool", "get_balances")]
+    assert (decision.model, decision.escalated, script.requests) == (Config.LLM_MODEL, True, 1)
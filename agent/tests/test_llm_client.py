@@ -0,0 +1,57 @@
+import pytest
+from openai import AsyncOpenAI
+from utils.llm_client import DeadlineExceeded, ResilientLLMClient
+from utils.mock_llm_server import ScriptedResponses, start_mock_server
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def serve(*responses, **client_options):
+        script = ScriptedResponses(list(responses))
+        server = start_mock_server(script)
+        servers.append(server)
+        openai = AsyncOpenAI(base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="mock", max_retries=0)
+        client_options.setdefault("backoff", 0.01)
+        return script, ResilientLLMClient(openai, **client_options)
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+
+
+def stream_content(client):
+    async def consume():
+        chunks = [chunk async for chunk in client.stream(model="mock", messages=MESSAGES, stream=True)]
+        return "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices)
+
+    return client.run(consume())
+
+
+def test_retries_server_errors(serve):
+    script, client = serve({"content": "hello", "faults": [{"status": 500}, {"status": 503}]})
+    completion = client.run(client.create(model="mock", messages=MESSAGES))
+    assert completion.choices[0].message.content == "hello"
+    assert (client.retries, script.requests) == (2, 3)
+
+
+def test_retries_stalled_first_chunk(serve):
+    script, client = serve({"content": "hello", "faults": [{"stall": 1.0}]}, deadline=5.0, attempt_timeout=0.2)
+    assert stream_content(client) == "hello"
+    assert (client.retries, script.requests) == (1, 2)
+
+
+def test_deadline_expires(serve):
+    _, client = serve({"content": "hello", "faults": [{"stall": 1.0}] * 5}, deadline=0.3, attempt_timeout=0.1, max_retries=5)
+    with pytest.raises(DeadlineExceeded):
+        stream_content(client)
+
+
+def test_hedge_wins_over_stalled_request(serve):
+    script, client = serve({"content": "hello", "faults": [{"stall": 1.0}]}, hedge_percentile=0.5, hedge_min_samples=1)
+    client.latencies.extend([0.05] * 10)
+    assert stream_content(client) == "hello"
+    assert (client.hedges, client.hedge_wins, client.retries, script.requests) == (1, 1, 0, 2)
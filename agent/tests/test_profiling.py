@@ -0,0 +1,39 @@
+import cProfile
+import tracemalloc
+import pytest
+from utils.profiling import TurnProfiler
+
+
+def test_turn_report(tmp_path):
+    profiler = TurnProfiler(tmp_path)
+    profiler.start_turn()
+    with profiler.thread():
+        sum(range(1000))
+    report = profiler.end_turn("label")
+    assert not tracemalloc.is_tracing()
+    assert "turn-001.pstats" in report and (tmp_path / "turn-001.pstats").exists()
+    assert profiler.close() == tmp_path / "summary.txt"
+
+
+def test_profiler_held_by_another_thread(tmp_path, monkeypatch):
+    # Python 3.12+ refuses a second active profiler
+    def enable(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, "enable", enable)
+    profiler = TurnProfiler(tmp_path)
+    profiler.start_turn()
+    report = profiler.end_turn()
+    assert not tracemalloc.is_tracing()
+    assert "still running" in report
+    assert profiler.close() is None
+
+
+def test_tracemalloc_stopped_when_enable_fails(tmp_path, monkeypatch):
+    def enable(self):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(cProfile.Profile, "enable", enable)
+    with pytest.raises(RuntimeError):
+        TurnProfiler(tmp_path).start_turn()
+    assert not tracemalloc.is_tracing()
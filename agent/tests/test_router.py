@@ -0,0 +1,16 @@
+from utils.router import ModelRouter
+
+
+def test_single_read_intent():
+    decision = ModelRouter("large", "small").route("what is my balance", [])
+    assert (decision.model, decision.intent) == ("small", "get_balances")
+
+
+def test_multi_step_request_has_no_intent():
+    decision = ModelRouter("large", "small").route("check my balance then swap half", [])
+    assert (decision.model, decision.intent) == ("large", None)
+
+
+def test_intent_without_small_model():
+    decision = ModelRouter("large", None).route("show my positions", [])
+    assert (decision.model, decision.intent) == ("large", "check_positions")
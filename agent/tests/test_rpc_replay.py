@@ -0,0 +1,67 @@
+import json
+import pytest
+from web3 import EthereumTesterProvider, Web3
+from utils.initialize_web3 import initialize_web3
+from utils.rpc_replay import RPCRecorder, ReplayProvider, load_recording
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """A short session against eth-tester: two block numbers with a block mined in between, and a balance"""
+    path = tmp_path / "session.jsonl"
+    web3 = Web3(EthereumTesterProvider())
+    recorder = RPCRecorder(str(path))
+    recorder.instrument(web3)
+
+    account = web3.eth.accounts[0]
+    observed = {
+        "blocks": [web3.eth.block_number],
+        "balance": web3.eth.get_balance(account),
+        "account": account,
+    }
+    web3.testing.mine(1)
+    observed["blocks"].append(web3.eth.block_number)
+    recorder.close()
+    return path, observed
+
+
+def test_recorder_writes_one_line_per_request(recording):
+    path, _ = recording
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [entry["m"] for entry in entries if entry["m"] == "eth_blockNumber"] == ["eth_blockNumber"] * 2
+    assert all("r" in entry and entry["t"] >= 0 for entry in entries)
+
+
+def test_replay_returns_recorded_responses_in_order(recording):
+    path, observed = recording
+    web3 = initialize_web3(f"replay://{path}")
+    assert isinstance(web3.provider, ReplayProvider)
+
+    assert web3.eth.block_number == observed["blocks"][0]
+    assert web3.eth.get_balance(observed["account"]) == observed["balance"]
+    assert web3.eth.block_number == observed["blocks"][1]
+    # Once the recorded responses run out the last one is repeated
+    assert web3.eth.block_number == observed["blocks"][1]
+
+    web3.provider.rewind()
+    assert web3.eth.block_number == observed["blocks"][0]
+    assert web3.provider.misses == 0
+
+
+def test_unrecorded_requests_are_errors(recording):
+    path, _ = recording
+    provider = ReplayProvider(load_recording(str(path)))
+    response = provider.make_request("eth_gasPrice", [])
+    assert response["error"]["message"] == "eth_gasPrice was not recorded with these params"
+    assert provider.misses == 1
+
+
+def test_errors_are_recorded_and_replayed(tmp_path):
+    path = tmp_path / "errors.jsonl"
+    recorder = RPCRecorder(str(path))
+    recorder.record("eth_call", [{"to": "0x" + "00" * 20, "data": b"\x01"}, "latest"], {"error": {"code": 3, "message": "execution reverted"}}, 0.001)
+    recorder.close()
+
+    provider = ReplayProvider(str(path))
+    response = provider.make_request("eth_call", [{"to": "0x" + "00" * 20, "data": "0x01"}, "latest"])
+    assert response["error"] == {"code": 3, "message": "execution reverted"}
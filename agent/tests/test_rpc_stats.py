@@ -0,0 +1,87 @@
+import json
+import pytest
+from eth_account import Account
+from eth_utils import function_abi_to_4byte_selector
+from web3 import EthereumTesterProvider, Web3
+from utils.rpc_stats import NO_TOOL, LatencyHistogram, RPCStats, RPCStatsMiddleware
+
+
+POOL_MANAGER = "0x" + "ab" * 20
+EXTSLOAD = {"type": "function", "name": "extsload", "inputs": [{"name": "slot", "type": "bytes32"}], "outputs": []}
+SELECTOR = "0x" + function_abi_to_4byte_selector(EXTSLOAD).hex()
+
+
+@pytest.fixture
+def stats():
+    return RPCStats({POOL_MANAGER: ("PoolManager", [EXTSLOAD])})
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in (0.1, 0.4, 0.8, 3, 20):
+        histogram.add(ms / 1000)
+    assert histogram.percentile(0.5) == 1
+    assert histogram.percentile(0.95) == 25
+    assert histogram.to_dict()["buckets"][:6] == [1, 1, 1, 0, 1, 0]
+
+    histogram.add(7.5)
+    assert histogram.percentile(1.0) == 7500
+
+
+def test_label_names_known_functions(stats):
+    call = {"to": Web3.to_checksum_address(POOL_MANAGER), "data": SELECTOR + "00" * 32}
+    assert stats.label("eth_call", [call, "latest"]) == "eth_call PoolManager.extsload"
+    assert stats.label("eth_call", [{"to": POOL_MANAGER, "data": "0xdeadbeef"}, "latest"]) == "eth_call PoolManager.0xdeadbeef"
+    assert stats.label("eth_call", [{"to": "0x" + "22" * 20, "data": SELECTOR}, "latest"]) == "eth_call"
+    assert stats.label("eth_blockNumber", []) == "eth_blockNumber"
+
+
+@pytest.mark.parametrize("fees", [
+    {"gasPrice": 10**9},
+    {"maxFeePerGas": 2 * 10**9, "maxPriorityFeePerGas": 10**9},
+])
+def test_label_decodes_signed_transactions(stats, fees):
+    transaction = {"to": Web3.to_checksum_address(POOL_MANAGER), "data": SELECTOR + "00" * 32, "value": 0, "gas": 50000, "nonce": 0, "chainId": 1, **fees}
+    raw = Account.sign_transaction(transaction, Account.create().key).raw_transaction
+    assert stats.label("eth_sendRawTransaction", ["0x" + raw.hex()]) == "eth_sendRawTransaction PoolManager.extsload"
+
+
+def test_requests_are_attributed_to_tools(stats):
+    web3 = Web3(EthereumTesterProvider())
+    stats.instrument(web3)
+    first, second = web3.eth.accounts[:2]
+    with stats.tool("get_balances"):
+        web3.eth.get_balance(first)
+        web3.eth.get_balance(second)
+    with stats.tool("get_balances"):
+        web3.eth.get_balance(first)
+
+    tools = stats.to_dict()["tools"]
+    assert tools["get_balances"]["invocations"] == 2
+    assert tools["get_balances"]["max_requests_per_invocation"] == 2
+    assert tools["get_balances"]["requests_by_label"]["eth_getBalance"]["count"] == 3
+    assert tools[NO_TOOL]["invocations"] == 0
+
+    report = stats.report()
+    assert "get_balances: 2 call(s), 1.5 requests" in report
+    assert f"{NO_TOOL}: " in report
+
+
+def test_batch_requests_share_the_round_trip(stats):
+    middleware = RPCStatsMiddleware.build(stats)(None)
+    batch = middleware.wrap_make_batch_request(lambda requests_info: [{"result": "0x1"}] * len(requests_info))
+    with stats.tool("check_positions"):
+        batch([("eth_call", [{"to": POOL_MANAGER, "data": SELECTOR}, "latest"])] * 3)
+
+    tool = stats.to_dict()["tools"]["check_positions"]
+    assert tool["requests"] == 3
+    assert tool["requests_by_label"]["eth_call PoolManager.extsload"]["count"] == 3
+
+
+def test_stats_are_written_on_close(stats, tmp_path):
+    path = tmp_path / "stats" / "rpc.json"
+    stats.start(path, interval=60)
+    with stats.tool("get_hook_permissions"):
+        stats.record("eth_call", [{"to": POOL_MANAGER, "data": SELECTOR}, "latest"], 0.002)
+    stats.close()
+    assert json.loads(path.read_text())["tools"]["get_hook_permissions"]["requests"] == 1
@@ -0,0 +1,38 @@
+from web3 import EthereumTesterProvider, Web3
+from utils.snapshot import WarmStartSnapshot
+
+DEPLOYMENT = {"pool_key": {"fee": 3000, "tickSpacing": 60}}
+STATE = {"token_metadata": ["MockA", "A", "MockB", "B"]}
+
+
+def test_round_trip(tmp_path):
+    web3 = Web3(EthereumTesterProvider())
+    chain_id = web3.eth.chain_id
+    snapshot = WarmStartSnapshot(web3, chain_id, DEPLOYMENT, tmp_path)
+    assert snapshot.load() == {}
+    snapshot.save(STATE)
+    assert (tmp_path / f"snapshot-{chain_id}.json").exists()
+
+    restored = WarmStartSnapshot(web3, chain_id, DEPLOYMENT, tmp_path)
+    assert restored.load() == STATE
+    assert restored.restored
+
+
+def test_dropped_for_other_deployment_or_chain(tmp_path):
+    web3 = Web3(EthereumTesterProvider())
+    web3.provider.ethereum_tester.mine_blocks(3)
+    chain_id = web3.eth.chain_id
+    WarmStartSnapshot(web3, chain_id, DEPLOYMENT, tmp_path).save(STATE)
+
+    assert WarmStartSnapshot(web3, chain_id, {"pool_key": {"fee": 500}}, tmp_path).load() == {}
+    # Like a reloaded state dump, the block the snapshot saw is missing
+    assert WarmStartSnapshot(Web3(EthereumTesterProvider()), chain_id, DEPLOYMENT, tmp_path).load() == {}
+
+
+def test_unchanged_state_is_not_saved_again(tmp_path):
+    web3 = Web3(EthereumTesterProvider())
+    snapshot = WarmStartSnapshot(web3, web3.eth.chain_id, DEPLOYMENT, tmp_path)
+    snapshot.save(STATE)
+    (tmp_path / f"snapshot-{web3.eth.chain_id}.json").unlink()
+    snapshot.save({"token_metadata": ("MockA", "A", "MockB", "B")})
+    assert not (tmp_path / f"snapshot-{web3.eth.chain_id}.json").exists()
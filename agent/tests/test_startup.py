@@ -0,0 +1,12 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+def test_main_does_not_import_heavy_modules():
+    # openai and web3 are imported in the background once the prompt is up
+    code = "import sys, main; print(sorted(m for m in ('web3', 'openai', 'eth_abi') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,74 @@
+import json
+import threading
+import time
+from web3 import EthereumTesterProvider, Web3
+from utils.nonce_manager import NonceManager
+from utils.rpc_stats import RPCStats
+from utils.tool_executor import ToolExecutor
+from utils.tool_results import PermissionsResult, TransactionResult
+
+
+class Tools:
+    READ_ONLY_TOOLS = frozenset({"get_hook_permissions", "check_positions"})
+
+    def __init__(self):
+        self.rpc_stats = RPCStats({})
+        self.log = []
+        self.readers = threading.Barrier(2, timeout=5)
+
+    def get_hook_permissions(self):
+        # Only passes when a second read runs at the same time
+        self.readers.wait()
+        return PermissionsResult({"afterSwap": True})
+
+    def check_positions(self):
+        self.log.append("read")
+        return PermissionsResult({})
+
+    def swap(self, amount: str):
+        time.sleep(0.05)
+        self.log.append(f"swap {amount}")
+        return TransactionResult("Swap", "0x" + "ab" * 32, True, 21000)
+
+
+def call(name, call_id="call", **arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+def test_reads_run_concurrently():
+    executor = ToolExecutor(Tools())
+    outputs = executor.run_all([call("get_hook_permissions", "a"), call("get_hook_permissions", "b")])
+    assert [output.message["tool_call_id"] for output in outputs] == ["a", "b"]
+    assert outputs[0].message["content"] == '{"enabled":["afterSwap"]}'
+    executor.shutdown()
+
+
+def test_writes_run_in_order_and_later_reads_wait_for_them():
+    tools = Tools()
+    executor = ToolExecutor(tools)
+    executor.run_all([call("swap", amount="1"), call("swap", amount="2"), call("check_positions")])
+    assert tools.log == ["swap 1", "swap 2", "read"]
+    assert "swap: 2 call(s)" in executor.token_report()
+    executor.shutdown()
+
+
+def test_errors_become_tool_messages():
+    executor = ToolExecutor(Tools())
+    missing, bad_arguments = executor.run_all([call("no_such_tool"), call("swap", amount="1", extra=True)])
+    assert json.loads(missing.message["content"]) == {"error": "calling no_such_tool: function not found"}
+    assert "unexpected keyword argument" in json.loads(bad_arguments.message["content"])["error"]
+    executor.shutdown()
+
+
+def test_nonces_are_consecutive_across_threads():
+    web3 = Web3(EthereumTesterProvider())
+    nonces = NonceManager(web3, web3.eth.accounts[0])
+    reserved = []
+    threads = [threading.Thread(target=lambda: reserved.append(nonces.next_nonce())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(reserved) == list(range(20))
+    nonces.reset()
+    assert nonces.next_nonce() == 0
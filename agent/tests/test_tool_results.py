@@ -0,0 +1,56 @@
+import json
+import pytest
+from utils.tool_results import (
+    BalancesResult, ErrorResult, Position, PositionsResult, ToolResult, TokenBalance, TransactionResult, fixed_point,
+)
+
+
+@pytest.mark.parametrize("amount, decimals, text", [
+    (0, 18, "0"),
+    (10 ** 17, 18, "0.1"),
+    (123 * 10 ** 18, 18, "123"),
+    (1, 18, "0.000000000000000001"),
+    (1500000, 6, "1.5"),
+])
+def test_fixed_point_is_exact(amount, decimals, text):
+    assert fixed_point(amount, decimals) == text
+
+
+def test_tool_result_is_abstract():
+    with pytest.raises(TypeError):
+        ToolResult()
+
+
+def test_balances_drop_zero_amounts_for_the_llm():
+    result = BalancesResult("user", "0x0", [TokenBalance("A", "MockA", 10 ** 18), TokenBalance("B", "MockB", 0)], 0)
+    assert json.loads(result.to_llm()) == {"owner": "user", "balances": {"A": "1"}}
+    # The user still sees every token
+    assert "• 0.000000 B (MockB)" in result.render()
+
+
+def test_positions_llm_form_is_compact():
+    position = Position(tick=-60, zero_for_one=False, position_id=0xabcdef12 << 224, pending=5 * 10 ** 17,
+                        claimable=0, supply=5 * 10 ** 17, balance=5 * 10 ** 17)
+    result = PositionsResult([position], current_tick=0)
+    assert result.to_llm() == (
+        '{"current_tick":0,"positions":[{"tick":-60,"sell":"token1","id":"0xabcdef12",'
+        '"pending":"0.5","supply":"0.5","mine":"0.5"}]}'
+    )
+    assert "Position at tick -60 (sell token1)" in result.render()
+    rendered, compact = result.token_counts()
+    assert compact < rendered
+
+
+def test_empty_positions():
+    assert json.loads(PositionsResult().to_llm()) == {"positions": []}
+    assert str(PositionsResult(current_tick=60)) == "Current pool tick: 60\nNo active positions found"
+
+
+def test_transaction_and_error_results():
+    transaction = TransactionResult("Swap", "0x" + "ab" * 32, False, 21000)
+    assert json.loads(transaction.to_llm()) == {"tx": "0xabababab", "ok": False, "gas": 21000}
+    assert "Transaction status: Failed" in transaction.render()
+
+    error = ErrorResult("calling swap", "insufficient balance")
+    assert json.loads(error.to_llm()) == {"error": "calling swap: insufficient balance"}
+    assert str(error) == "Error calling swap: insufficient balance"
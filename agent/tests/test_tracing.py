@@ -0,0 +1,87 @@
+import json
+import threading
+import pytest
+from config import Config
+from utils import tracing
+from utils.llm import LLMAgent
+from utils.mock_llm_server import ScriptedResponses, start_mock_server
+from utils.rpc_stats import RPCStats
+from utils.tool_executor import ToolExecutor
+from utils.tool_results import BalancesResult, TokenBalance
+
+
+@pytest.fixture
+def trace(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracing.start(str(path))
+
+    def spans():
+        tracing.stop()
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield spans
+    tracing.stop()
+
+
+class Tools:
+    READ_ONLY_TOOLS = frozenset({"get_balances"})
+
+    def __init__(self):
+        self.rpc_stats = RPCStats({})
+
+    def get_balances(self, address: str = "user"):
+        return BalancesResult(address, "0x0", [TokenBalance("A", "MockA", 10 ** 18)], 0)
+
+
+def test_spans_nest_within_and_across_threads(trace):
+    with tracing.span("turn") as attrs:
+        attrs["ok"] = True
+        with tracing.span("llm"):
+            pass
+        parent_id = tracing.current_span_id()
+
+        def work():
+            with tracing.span("tool", parent_id):
+                pass
+
+        worker = threading.Thread(target=work)
+        worker.start()
+        worker.join()
+    spans = {span["name"]: span for span in trace()}
+    assert spans["turn"]["parent"] is None and spans["turn"]["ok"] is True
+    assert spans["llm"]["parent"] == spans["turn"]["id"]
+    assert spans["tool"]["parent"] == spans["turn"]["id"]
+
+
+def test_disabled_span_is_a_no_op():
+    assert not tracing.enabled()
+    with tracing.span("anything") as attrs:
+        assert attrs == {}
+    assert tracing.current_span_id() is None
+
+
+def test_tool_spans_are_children_of_the_llm_span(trace, monkeypatch):
+    # Two tool calls: the first completes on the LLM client's loop thread, the last when the stream ends
+    script = ScriptedResponses([{"tool_calls": [
+        {"name": "get_balances", "arguments": {"address": "user"}},
+        {"name": "get_balances", "arguments": {"address": "pool"}},
+    ]}])
+    server = start_mock_server(script)
+    monkeypatch.setenv("OPENAI_API_KEY", "mock")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    executor = ToolExecutor(Tools())
+    try:
+        pending = []
+        LLMAgent(Config).stream_chat_completion(
+            [{"role": "user", "content": "balances"}], [],
+            on_tool_call=lambda tool_call, parent_id: pending.append(executor.submit(tool_call, parent_id))
+        )
+        assert len([future.result() for future in pending]) == 2
+    finally:
+        executor.shutdown()
+        server.shutdown()
+
+    spans = trace()
+    llm = next(span for span in spans if span["name"] == "llm")
+    tools = [span for span in spans if span["name"] == "tool get_balances"]
+    assert [span["parent"] for span in tools] == [llm["id"], llm["id"]]
@@ -42,12 +42,26 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
     error OnlyByPoolManager();
     error InvalidGridSpacing();
 
+    // Events
+    event OrderPlaced(PoolId indexed poolId, address indexed owner, int24 indexed tick, bool zeroForOne, uint256 inputAmount);
+    event OrderCancelled(
+        PoolId indexed poolId, address indexed owner, int24 indexed tick, bool zeroForOne, uint256 claimAmount, uint256 inputAmount
+    );
+    event OrderFilled(PoolId indexed poolId, int24 indexed tick, bool indexed zeroForOne, uint256 inputAmount, uint256 outputAmount);
+    event Redeemed(uint256 indexed positionId, address indexed owner, uint256 claimAmount, uint256 outputAmount);
+    event GridCreated(
+        PoolId indexed poolId, address indexed owner, int24 lowerTick, int24 upperTick, int24 gridSpacing, uint256 amountPerGrid
+    );
+    event BalancesSynced(
+        uint256 indexed positionId, PoolId indexed poolId, int24 indexed tick, bool zeroForOne, uint256 claimableOutputTokens, uint256 pendingOrders
+    );
 
     mapping(PoolId poolId => int24 lastTick) public lastTicks;
     mapping(uint256 positionId => uint256 claimsSupply) public claimTokensSupply;
     mapping(uint256 positionId => uint256 outputClaimable) public claimableOutputTokens;
     mapping(address user => mapping(PoolId poolId => GridPosition)) public userGridPositions;
     mapping(PoolId poolId => mapping(int24 tickToSellAt => mapping(bool zeroForOne => uint256 inputAmount))) public pendingOrders;
+    mapping(PoolId poolId => mapping(bool zeroForOne => ActiveTicks)) public activeTicks;
 
 
     struct GridPosition {
@@ -57,6 +71,14 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         uint256 amountPerGrid;
     }
 
+    /// @dev Number of ticks with a non-zero pending order for one pool and direction, and bounds
+    /// containing all of them. The bounds only widen while `count > 0`, so they may be loose.
+    struct ActiveTicks {
+        uint128 count;
+        int24 minTick;
+        int24 maxTick;
+    }
+
     /// @notice Modifier to restrict access to the pool manager.
     /// @dev Reverts if the caller is not the pool manager.
     modifier onlyByPoolManager() {
@@ -126,6 +148,16 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         // rabbit hole again
         if (sender == address(this)) return (this.afterSwap.selector, 0);
 
+        // Fast path: if no order in the executing direction can sit between the last known tick
+        // and the current one, there is nothing to try, only the last tick needs updating
+        PoolId poolId = key.toId();
+        ActiveTicks memory active = activeTicks[poolId][!params.zeroForOne];
+        (, int24 tickAfterSwap,,) = poolManager.getSlot0(poolId);
+        if (active.count == 0 || !_crossesActiveTicks(lastTicks[poolId], tickAfterSwap, active)) {
+            lastTicks[poolId] = tickAfterSwap;
+            return (this.afterSwap.selector, 0);
+        }
+
         // Should we try to find and execute orders? True initially
         bool tryMore = true;
         int24 currentTick;
@@ -147,10 +179,20 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
 
         // New last known tick for this pool is the tick value
         // after our orders are executed
-        lastTicks[key.toId()] = currentTick;
+        lastTicks[poolId] = currentTick;
         return (this.afterSwap.selector, 0);
     }
 
+    /// @notice Returns true if the range between `lastTick` and `currentTick` overlaps `active`.
+    function _crossesActiveTicks(int24 lastTick, int24 currentTick, ActiveTicks memory active)
+        private
+        pure
+        returns (bool)
+    {
+        (int24 lower, int24 upper) = lastTick < currentTick ? (lastTick, currentTick) : (currentTick, lastTick);
+        return active.minTick <= upper && active.maxTick >= lower;
+    }
+
     function getLowerUsableTick(int24 tick, int24 tickSpacing) private pure returns (int24) {
         // e.g. tickSpacing = 60, tick = -100
         // closest usable tick rounded-down will be -120
@@ -168,7 +210,110 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
     }
 
     function getPositionId(PoolKey calldata key, int24 tick, bool zeroForOne) public pure returns (uint256) {
-        return uint256(keccak256(abi.encode(key.toId(), tick, zeroForOne)));
+        return _getPositionId(key.toId(), tick, zeroForOne);
+    }
+
+    function _getPositionId(PoolId poolId, int24 tick, bool zeroForOne) internal pure returns (uint256) {
+        return uint256(keccak256(abi.encode(poolId, tick, zeroForOne)));
+    }
+
+    /// @notice Reads both directions of every position at `ticks` in a single call.
+    /// @dev Entry `2 * i` of each array is the zeroForOne position at `ticks[i]`, entry `2 * i + 1`
+    /// the oneForZero one. Ticks are used as given, they are not rounded to usable ticks.
+    /// @param key The PoolKey for the pool.
+    /// @param user The address whose claim token balances are returned.
+    /// @param ticks The ticks to read.
+    /// @return pending The `pendingOrders` amount of each position.
+    /// @return supply The `claimTokensSupply` of each position.
+    /// @return claimable The `claimableOutputTokens` of each position.
+    /// @return balances The claim token balance of `user` for each position.
+    function getPositionsBatch(PoolKey calldata key, address user, int24[] calldata ticks)
+        external
+        view
+        returns (uint256[] memory pending, uint256[] memory supply, uint256[] memory claimable, uint256[] memory balances)
+    {
+        return _getPositionsBatch(key.toId(), user, ticks);
+    }
+
+    /// @notice Reads both directions of every position from `startTick` to `endTick` in steps of `step`.
+    /// @dev Same layout as the tick list overload.
+    /// @param key The PoolKey for the pool.
+    /// @param user The address whose claim token balances are returned.
+    /// @param startTick The first tick to read.
+    /// @param endTick The last tick to read, inclusive.
+    /// @param step The distance between two read ticks.
+    function getPositionsBatch(PoolKey calldata key, address user, int24 startTick, int24 endTick, int24 step)
+        external
+        view
+        returns (uint256[] memory pending, uint256[] memory supply, uint256[] memory claimable, uint256[] memory balances)
+    {
+        if (startTick > endTick) revert InvalidRange();
+        if (step <= 0) revert InvalidGridSpacing();
+
+        uint256 count = uint256(int256((endTick - startTick) / step)) + 1;
+        int24[] memory ticks = new int24[](count);
+        for (uint256 i = 0; i < count; i++) {
+            ticks[i] = startTick + int24(int256(i)) * step;
+        }
+        return _getPositionsBatch(key.toId(), user, ticks);
+    }
+
+    function _getPositionsBatch(PoolId poolId, address user, int24[] memory ticks)
+        internal
+        view
+        returns (uint256[] memory pending, uint256[] memory supply, uint256[] memory claimable, uint256[] memory balances)
+    {
+        pending = new uint256[](ticks.length * 2);
+        supply = new uint256[](ticks.length * 2);
+        claimable = new uint256[](ticks.length * 2);
+        balances = new uint256[](ticks.length * 2);
+
+        for (uint256 i = 0; i < ticks.length; i++) {
+            for (uint256 side = 0; side < 2; side++) {
+                bool zeroForOne = side == 0;
+                uint256 positionId = _getPositionId(poolId, ticks[i], zeroForOne);
+                uint256 j = 2 * i + side;
+
+                pending[j] = pendingOrders[poolId][ticks[i]][zeroForOne];
+                supply[j] = claimTokensSupply[positionId];
+                claimable[j] = claimableOutputTokens[positionId];
+                balances[j] = balanceOf(user, positionId);
+            }
+        }
+    }
+
+    function _increasePendingOrder(PoolId poolId, int24 tick, bool zeroForOne, uint256 amount) internal {
+        uint256 previous = pendingOrders[poolId][tick][zeroForOne];
+        _writePendingOrder(poolId, tick, zeroForOne, previous, previous + amount);
+    }
+
+    function _decreasePendingOrder(PoolId poolId, int24 tick, bool zeroForOne, uint256 amount) internal {
+        uint256 previous = pendingOrders[poolId][tick][zeroForOne];
+        _writePendingOrder(poolId, tick, zeroForOne, previous, previous - amount);
+    }
+
+    function _setPendingOrder(PoolId poolId, int24 tick, bool zeroForOne, uint256 amount) internal {
+        _writePendingOrder(poolId, tick, zeroForOne, pendingOrders[poolId][tick][zeroForOne], amount);
+    }
+
+    /// @notice Writes a pending order amount and keeps `activeTicks` in sync with it.
+    /// @param previous The amount currently stored for this tick and direction.
+    /// @param amount The new amount.
+    function _writePendingOrder(PoolId poolId, int24 tick, bool zeroForOne, uint256 previous, uint256 amount) internal {
+        pendingOrders[poolId][tick][zeroForOne] = amount;
+
+        // Only a tick becoming active or inactive changes the tracker
+        if ((previous == 0) == (amount == 0)) return;
+
+        ActiveTicks memory active = activeTicks[poolId][zeroForOne];
+        if (amount == 0) {
+            active.count--;
+        } else {
+            if (active.count == 0 || tick < active.minTick) active.minTick = tick;
+            if (active.count == 0 || tick > active.maxTick) active.maxTick = tick;
+            active.count++;
+        }
+        activeTicks[poolId][zeroForOne] = active;
     }
 
     /// @notice Places a new order in the pool.
@@ -184,7 +329,7 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         // Get lower actually usable tick given `tickToSellAt`
         int24 tick = getLowerUsableTick(tickToSellAt, key.tickSpacing);
         // Create a pending order
-        pendingOrders[key.toId()][tick][zeroForOne] += inputAmount;
+        _increasePendingOrder(key.toId(), tick, zeroForOne, inputAmount);
 
         // Mint claim tokens to user equal to their `inputAmount`
         uint256 positionId = getPositionId(key, tick, zeroForOne);
@@ -196,6 +341,8 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         address sellToken = zeroForOne ? Currency.unwrap(key.currency0) : Currency.unwrap(key.currency1);
         IERC20(sellToken).transferFrom(msg.sender, address(this), inputAmount);
 
+        emit OrderPlaced(key.toId(), msg.sender, tick, zeroForOne, inputAmount);
+
         // Return the tick at which the order was actually placed
         return tick;
     }
@@ -215,7 +362,7 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         if (positionTokens < amountToCancel) revert NotEnoughToClaim();
 
         // Remove their `amountToCancel` worth of position from pending orders
-        pendingOrders[key.toId()][tick][zeroForOne] -= amountToCancel;
+        _decreasePendingOrder(key.toId(), tick, zeroForOne, amountToCancel);
         // Reduce claim token total supply and burn their share
         claimTokensSupply[positionId] -= amountToCancel;
         _burn(msg.sender, positionId, amountToCancel);
@@ -223,6 +370,8 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         // Send them their input token
         Currency token = zeroForOne ? key.currency0 : key.currency1;
         token.transfer(msg.sender, amountToCancel);
+
+        emit OrderCancelled(key.toId(), msg.sender, tick, zeroForOne, amountToCancel, amountToCancel);
     }
 
     /// @notice Redeems tokens based on the order.
@@ -261,6 +410,8 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         // Transfer output tokens
         Currency token = zeroForOne ? key.currency1 : key.currency0;
         token.transfer(msg.sender, outputAmount);
+
+        emit Redeemed(positionId, msg.sender, inputAmountToClaimFor, outputAmount);
     }
 
     /// @notice Swaps tokens and settles balances.
@@ -408,12 +559,14 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         );
 
         // `inputAmount` has been deducted from this position
-        pendingOrders[key.toId()][tick][zeroForOne] -= inputAmount;
+        _decreasePendingOrder(key.toId(), tick, zeroForOne, inputAmount);
         uint256 positionId = getPositionId(key, tick, zeroForOne);
         uint256 outputAmount = zeroForOne ? uint256(int256(delta.amount1())) : uint256(int256(delta.amount0()));
 
         // `outputAmount` worth of tokens now can be claimed/redeemed by position holders
         claimableOutputTokens[positionId] += outputAmount;
+
+        emit OrderFilled(key.toId(), tick, zeroForOne, inputAmount, outputAmount);
     }
 
 
@@ -444,45 +597,116 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         uint256 pendingOrdersPrev;
         uint256 pendingOrdersNew;
     }
+
+    /// @notice Applies a batch of burns, balance updates and new orders computed off-chain.
+    /// @dev `burns` and `orders` should be grouped by owner and then by position: every
+    /// consecutive run of entries for the same owner is settled with a single ERC1155 batch
+    /// burn/mint, and every consecutive run for the same position within it costs a single
+    /// storage write. Ungrouped input is still applied correctly, only less efficiently.
+    /// @param burns The claim tokens to burn, grouped by owner and position.
+    /// @param orders The orders to create, grouped by owner and position.
+    /// @param newBalances The claimable and pending amounts to overwrite.
     // @audit this function can be dos id frontruned
     function offChainComputation(BurnToken[] calldata burns, NewOrder[] calldata orders, Balances[] calldata newBalances) external onlyOwner {
-        // Off-chain computation can be done here
-        for (uint256 i = 0; i < burns.length; i++) {
-            PoolId keyId = burns[i].key.toId();
-            address _owner = burns[i].owner;
-            bool zeroForOne = burns[i].zeroForOne;
-            uint256 amountPendingRemove = burns[i].amountPendingRemove;
-            uint256 amount = burns[i].amount;
-            int24 tick = burns[i].tick;
-            uint256 positionId = getPositionId(burns[i].key, tick, zeroForOne);
-
-            //console.log("pendingOrders[keyId][tick][zeroForOne]",pendingOrders[keyId][tick][zeroForOne]);
-            //console.log("claimTokensSupply[positionId]",claimTokensSupply[positionId]);
-            // Remove their `amountToCancel` worth of position from pending orders
-            pendingOrders[keyId][tick][zeroForOne] -= amountPendingRemove;
-            claimTokensSupply[positionId] -= amount;
-            _burn(_owner, positionId, amount);
-        }
+        _applyBurns(burns);
+
         // update balances
+        PoolId poolId;
         for (uint256 i = 0; i < newBalances.length; i++) {
-            Balances memory balances = newBalances[i];
+            Balances calldata balances = newBalances[i];
+            if (i == 0 || !_samePoolKey(balances.idPending, newBalances[i - 1].idPending)) {
+                poolId = balances.idPending.toId();
+            }
             require(claimableOutputTokens[balances.idClaimable] == balances.claimableOutputTokensPrev, "Invalid claimable output tokens");
-            require(pendingOrders[balances.idPending.toId()][balances.tick][balances.zeroForOne] == balances.pendingOrdersPrev, "Invalid pending orders");
+            uint256 pendingOrdersPrev = pendingOrders[poolId][balances.tick][balances.zeroForOne];
+            require(pendingOrdersPrev == balances.pendingOrdersPrev, "Invalid pending orders");
 
             claimableOutputTokens[balances.idClaimable] = balances.claimableOutputTokensNew;
-            pendingOrders[balances.idPending.toId()][balances.tick][balances.zeroForOne] = balances.pendingOrdersNew;
+            _writePendingOrder(poolId, balances.tick, balances.zeroForOne, pendingOrdersPrev, balances.pendingOrdersNew);
+
+            emit BalancesSynced(
+                balances.idClaimable, poolId, balances.tick, balances.zeroForOne, balances.claimableOutputTokensNew, balances.pendingOrdersNew
+            );
+        }
+
+        _applyOrders(orders);
+    }
+
+    /// @notice Burns claim tokens and removes pending amounts, one batch burn per owner run.
+    /// @param burns The claim tokens to burn, grouped by owner and position.
+    function _applyBurns(BurnToken[] calldata burns) private {
+        PoolId poolId;
+        uint256 i = 0;
+        while (i < burns.length) {
+            address _owner = burns[i].owner;
+            uint256 end = i + 1;
+            while (end < burns.length && burns[end].owner == _owner) end++;
+            uint256[] memory ids = new uint256[](end - i);
+            uint256[] memory amounts = new uint256[](end - i);
+            uint256 count = 0;
+
+            while (i < end) {
+                BurnToken calldata burn = burns[i];
+                if (i == 0 || !_samePoolKey(burn.key, burns[i - 1].key)) poolId = burn.key.toId();
+
+                // Fold every consecutive entry for the same position into one update
+                uint256 amount = burn.amount;
+                uint256 amountPendingRemove = burn.amountPendingRemove;
+                while (++i < end && _samePosition(burns[i].key, burns[i].tick, burns[i].zeroForOne, burn.key, burn.tick, burn.zeroForOne)) {
+                    amount += burns[i].amount;
+                    amountPendingRemove += burns[i].amountPendingRemove;
+                }
+
+                uint256 positionId = _getPositionId(poolId, burn.tick, burn.zeroForOne);
+                // Remove their `amountToCancel` worth of position from pending orders
+                if (amountPendingRemove != 0) _decreasePendingOrder(poolId, burn.tick, burn.zeroForOne, amountPendingRemove);
+                claimTokensSupply[positionId] -= amount;
+                emit OrderCancelled(poolId, _owner, burn.tick, burn.zeroForOne, amount, amountPendingRemove);
+
+                ids[count] = positionId;
+                amounts[count] = amount;
+                count++;
+            }
+
+            _burnAll(_owner, ids, amounts, count);
         }
+    }
 
-        for (uint256 i = 0; i < orders.length; i++) {
-            NewOrder memory order = orders[i];
-            uint256 positionId = getPositionId(orders[i].key, order.tickToSellAt, order.zeroForOne);
+    /// @notice Creates pending orders and mints claim tokens, one batch mint per owner run.
+    /// @param orders The orders to create, grouped by owner and position.
+    function _applyOrders(NewOrder[] calldata orders) private {
+        PoolId poolId;
+        uint256 i = 0;
+        while (i < orders.length) {
+            address _owner = orders[i].owner;
+            uint256 end = i + 1;
+            while (end < orders.length && orders[end].owner == _owner) end++;
+            uint256[] memory ids = new uint256[](end - i);
+            uint256[] memory amounts = new uint256[](end - i);
+            uint256 count = 0;
+
+            while (i < end) {
+                NewOrder calldata order = orders[i];
+                if (i == 0 || !_samePoolKey(order.key, orders[i - 1].key)) poolId = order.key.toId();
+
+                uint256 inputAmount = order.inputAmount;
+                while (++i < end && _samePosition(orders[i].key, orders[i].tickToSellAt, orders[i].zeroForOne, order.key, order.tickToSellAt, order.zeroForOne)) {
+                    inputAmount += orders[i].inputAmount;
+                }
 
-            // Create a pending order
-            pendingOrders[orders[i].key.toId()][order.tickToSellAt][order.zeroForOne] += order.inputAmount;
+                uint256 positionId = _getPositionId(poolId, order.tickToSellAt, order.zeroForOne);
+                // Create a pending order
+                _increasePendingOrder(poolId, order.tickToSellAt, order.zeroForOne, inputAmount);
+                claimTokensSupply[positionId] += inputAmount;
+                emit OrderPlaced(poolId, _owner, order.tickToSellAt, order.zeroForOne, inputAmount);
+
+                ids[count] = positionId;
+                amounts[count] = inputAmount;
+                count++;
+            }
 
-            claimTokensSupply[positionId] += order.inputAmount;
             // @audit beware of transfer hooks
-            _mint(order.owner, positionId, order.inputAmount, "");
+            _mintAll(_owner, ids, amounts, count);
         }
     }
 
@@ -495,39 +719,113 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         uint256 amount;
     }
 
+    /// @notice Turns filled claims into new pending orders instead of paying them out.
+    /// @dev `rebuys` should be grouped by owner and then by position, as in `offChainComputation`.
+    /// Each owner run is settled with one batch burn followed by one batch mint, so a rebuy cannot
+    /// spend claim tokens minted by an earlier rebuy in the same call.
+    /// @param rebuys The claims to roll over, grouped by owner and position.
     function offChainRebuy(RebuyOrder[] calldata rebuys) external onlyOwner {
-        for (uint256 i = 0; i < rebuys.length; i++) {
-            RebuyOrder memory rebuy = rebuys[i];
-            uint256 maxAmount = balanceOf(rebuy.owner, rebuy.positionId);
-            require(maxAmount >= rebuy.amount, "Not enough balance");
-
-            uint256 totalClaimableForPosition = claimableOutputTokens[rebuy.positionId];
+        PoolId poolId;
+        uint256 i = 0;
+        while (i < rebuys.length) {
+            address _owner = rebuys[i].owner;
+            uint256 end = i + 1;
+            while (end < rebuys.length && rebuys[end].owner == _owner) end++;
+            uint256[] memory burnIds = new uint256[](end - i);
+            uint256[] memory burnAmounts = new uint256[](end - i);
+            uint256[] memory mintIds = new uint256[](end - i);
+            uint256[] memory mintAmounts = new uint256[](end - i);
+            uint256 count = 0;
+
+            while (i < end) {
+                RebuyOrder calldata rebuy = rebuys[i];
+                if (i == 0 || !_samePoolKey(rebuy.key, rebuys[i - 1].key)) poolId = rebuy.key.toId();
+
+                uint256 amount = rebuy.amount;
+                while (
+                    ++i < end && rebuys[i].positionId == rebuy.positionId
+                        && _samePosition(rebuys[i].key, rebuys[i].tick, rebuys[i].zeroForOne, rebuy.key, rebuy.tick, rebuy.zeroForOne)
+                ) {
+                    amount += rebuys[i].amount;
+                }
 
-            uint256 outputAmount = (rebuy.amount).mulDivDown(totalClaimableForPosition, claimTokensSupply[rebuy.positionId]);
+                require(balanceOf(_owner, rebuy.positionId) >= amount, "Not enough balance");
+
+                uint256 totalClaimableForPosition = claimableOutputTokens[rebuy.positionId];
+                uint256 totalInputAmountForPosition = claimTokensSupply[rebuy.positionId];
+                uint256 outputAmount = amount.mulDivDown(totalClaimableForPosition, totalInputAmountForPosition);
+
+                // Reduce claimable output tokens amount
+                // Reduce claim token total supply for position
+                // Burn claim tokens
+                claimableOutputTokens[rebuy.positionId] = totalClaimableForPosition - outputAmount;
+                claimTokensSupply[rebuy.positionId] = totalInputAmountForPosition - amount;
+                burnIds[count] = rebuy.positionId;
+                burnAmounts[count] = amount;
+                emit Redeemed(rebuy.positionId, _owner, amount, outputAmount);
+
+                // dont Transfer output tokens, make a rebuy order
+                _increasePendingOrder(poolId, rebuy.tick, rebuy.zeroForOne, outputAmount);
+
+                // Mint claim tokens to user equal to their `outputAmount`
+                uint256 positionId = _getPositionId(poolId, rebuy.tick, rebuy.zeroForOne);
+                claimTokensSupply[positionId] += outputAmount;
+                emit OrderPlaced(poolId, _owner, rebuy.tick, rebuy.zeroForOne, outputAmount);
+                mintIds[count] = positionId;
+                mintAmounts[count] = outputAmount;
+                count++;
+            }
 
-            // Reduce claimable output tokens amount
-            // Reduce claim token total supply for position
-            // Burn claim tokens
-            claimableOutputTokens[rebuy.positionId] -= outputAmount;
-            claimTokensSupply[rebuy.positionId] -= rebuy.amount;
-            _burn(rebuy.owner, rebuy.positionId, rebuy.amount);
+            _burnAll(_owner, burnIds, burnAmounts, count);
+            _mintAll(_owner, mintIds, mintAmounts, count);
+        }
+    }
 
-            // dont Transfer output tokens, make a rebuy order
-            //Currency token = rebuy.zeroForOne ? rebuy.key.currency1 : rebuy.key.currency0;
-            //token.transfer(msg.sender, outputAmount);
+    /// @notice Returns true if both keys describe the same pool, without hashing them.
+    function _samePoolKey(PoolKey calldata a, PoolKey calldata b) private pure returns (bool) {
+        return Currency.unwrap(a.currency0) == Currency.unwrap(b.currency0)
+            && Currency.unwrap(a.currency1) == Currency.unwrap(b.currency1) && a.fee == b.fee
+            && a.tickSpacing == b.tickSpacing && address(a.hooks) == address(b.hooks);
+    }
 
-            // Get lower actually usable tick given `tickToSellAt`
-            // int24 tick = getLowerUsableTick(tickToSellAt, key.tickSpacing);
-            // Create a pending order
-            pendingOrders[rebuy.key.toId()][rebuy.tick][rebuy.zeroForOne] += outputAmount;
+    /// @notice Returns true if both (key, tick, direction) triples map to the same position.
+    function _samePosition(
+        PoolKey calldata keyA,
+        int24 tickA,
+        bool zeroForOneA,
+        PoolKey calldata keyB,
+        int24 tickB,
+        bool zeroForOneB
+    ) private pure returns (bool) {
+        return tickA == tickB && zeroForOneA == zeroForOneB && _samePoolKey(keyA, keyB);
+    }
 
-            // Mint claim tokens to user equal to their `outputAmount`
-            uint256 positionId = getPositionId(rebuys[i].key, rebuy.tick, rebuy.zeroForOne);
-            claimTokensSupply[positionId] += outputAmount;
+    /// @notice Mints the first `count` ids/amounts to `to`, using a single mint when possible.
+    function _mintAll(address to, uint256[] memory ids, uint256[] memory amounts, uint256 count) private {
+        if (count == 1) {
+            _mint(to, ids[0], amounts[0], "");
+        } else {
+            _shrink(ids, amounts, count);
+            _batchMint(to, ids, amounts, "");
+        }
+    }
 
-            // @audit should we do a batch mint??
-            _mint(rebuy.owner, positionId, outputAmount, "");
+    /// @notice Burns the first `count` ids/amounts from `from`, using a single burn when possible.
+    function _burnAll(address from, uint256[] memory ids, uint256[] memory amounts, uint256 count) private {
+        if (count == 1) {
+            _burn(from, ids[0], amounts[0]);
+        } else {
+            _shrink(ids, amounts, count);
+            _batchBurn(from, ids, amounts);
+        }
+    }
 
+    /// @notice Truncates two equally sized memory arrays to their first `count` elements in place.
+    function _shrink(uint256[] memory ids, uint256[] memory amounts, uint256 count) private pure {
+        /// @solidity memory-safe-assembly
+        assembly {
+            mstore(ids, count)
+            mstore(amounts, count)
         }
     }
 
@@ -596,9 +894,12 @@ contract GridHook is BaseHook, ERC1155, Ownable(msg.sender) {
         });
 
         // Place orders at each grid line
+        PoolId poolId = key.toId();
         for (int24 tick = lowerTick; tick <= upperTick; tick += gridSpacing) {
-            pendingOrders[key.toId()][tick][tick > 0] = amountPerGrid;
+            _setPendingOrder(poolId, tick, tick > 0, amountPerGrid);
         }
+
+        emit GridCreated(poolId, msg.sender, lowerTick, upperTick, gridSpacing, amountPerGrid);
     }
 
 
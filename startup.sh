@@ -1,27 +1,77 @@
 #!/bin/bash
+# Boot anvil from a state dump that already has the contracts deployed and the pool seeded.
+# The dump is rebuilt (tests, deploy, dump) only when the contract sources changed since it was made.
+#   FRESH=1      rebuild the dump even if the sources did not change
+#   RUN_TESTS=1  run the Foundry tests before deploying when the dump is rebuilt
+#   APP_DIR      repository root, defaults to the working directory (/app in the container)
+set -e
+set -o pipefail
+cd "${APP_DIR:-$PWD}"
 
-# Start anvil in the background
-echo "Starting Anvil..."
-anvil --host 0.0.0.0 &
-ANVIL_PID=$!
+RPC_URL=http://localhost:8545
+PRIVATE_KEY=0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80
+STATE_DIR=.anvil
+STATE_FILE=$STATE_DIR/state.json
+HASH_FILE=$STATE_DIR/sources.sha256
+
+# Contract sources and build settings, lib/ is pinned by its submodules and not hashed
+sources_hash() {
+    find src script foundry.toml remappings.txt -type f -print0 | sort -z | xargs -0 sha256sum | sha256sum | cut -d' ' -f1
+}
+
+# Poll until anvil answers instead of sleeping a fixed time
+wait_for_rpc() {
+    for _ in $(seq 1 200); do
+        if curl -sf -X POST -H "Content-Type: application/json" \
+            --data '{"jsonrpc":"2.0","id":1,"method":"eth_chainId","params":[]}' "$RPC_URL" > /dev/null; then
+            return 0
+        fi
+        sleep 0.05
+    done
+    echo "Anvil did not start listening on $RPC_URL" >&2
+    return 1
+}
+
+mkdir -p "$STATE_DIR"
+HASH=$(sources_hash)
+
+# Whichever anvil is running when the script exits is stopped, also when a deploy step fails
+ANVIL_PID=
+trap '[ -n "$ANVIL_PID" ] && kill $ANVIL_PID 2> /dev/null' EXIT
 
-# Wait for anvil to start
-sleep 2
+if [ "$FRESH" = "1" ] || [ ! -f "$STATE_FILE" ] || [ "$(cat "$HASH_FILE" 2>/dev/null)" != "$HASH" ]; then
+    echo "Contract sources changed, rebuilding the anvil state dump..."
+    rm -f "$STATE_FILE" "$HASH_FILE"
+    anvil --host 0.0.0.0 --dump-state "$STATE_FILE" > /dev/null &
+    ANVIL_PID=$!
+    wait_for_rpc
 
-# Run Foundry tests
-echo "Running Foundry tests..."
-forge test -vv
+    if [ "$RUN_TESTS" = "1" ]; then
+        echo "Running Foundry tests..."
+        forge test -vv
+    fi
 
-# Deploy contracts
-echo "Deploying contracts..."
-forge script script/Deploy.s.sol --broadcast --rpc-url http://localhost:8545 --private-key 0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80
+    echo "Deploying contracts..."
+    forge script script/Anvil.s.sol --broadcast --rpc-url "$RPC_URL" --private-key "$PRIVATE_KEY"
+
+    # anvil writes the dump when it exits
+    kill -INT $ANVIL_PID
+    wait $ANVIL_PID || true
+    ANVIL_PID=
+    echo "$HASH" > "$HASH_FILE"
+fi
+
+echo "Starting Anvil from $STATE_FILE..."
+anvil --host 0.0.0.0 --load-state "$STATE_FILE" > /dev/null &
+ANVIL_PID=$!
+wait_for_rpc
 
 # Activate Python virtual environment
-source .venv/bin/activate
+if [ -f agent/.venv/bin/activate ]; then
+    source agent/.venv/bin/activate
+fi
 
 # Start the Python bot
 echo "Starting Grid Trading Bot..."
-python3 src/main.py
-
-# If the Python bot exits, kill anvil
-kill $ANVIL_PID
\ No newline at end of file
+cd agent/src
+python3 main.py
@@ -1,61 +1,36 @@
 // SPDX-License-Identifier: UNLICENSED
 pragma solidity ^0.8.0;
 
-import {Test} from "forge-std/Test.sol";
-import {Deployers} from "@uniswap/v4-core/test/utils/Deployers.sol";
 import {PoolSwapTest} from "v4-core/src/test/PoolSwapTest.sol";
-import {MockERC20} from "solmate/src/test/utils/mocks/MockERC20.sol";
 import {PoolManager} from "v4-core/src/PoolManager.sol";
 import {IPoolManager} from "v4-core/src/interfaces/IPoolManager.sol";
 import {PoolId, PoolIdLibrary} from "v4-core/src/types/PoolId.sol";
 import {Currency, CurrencyLibrary} from "v4-core/src/types/Currency.sol";
 import {StateLibrary} from "v4-core/src/libraries/StateLibrary.sol";
 import {PoolKey} from "v4-core/src/types/PoolKey.sol";
-import {Hooks} from "v4-core/src/libraries/Hooks.sol";
 import {TickMath} from "v4-core/src/libraries/TickMath.sol";
 import {LiquidityAmounts} from "@uniswap/v4-core/test/utils/LiquidityAmounts.sol";
 import {console} from "forge-std/console.sol";
 
 import {GridHook} from "../src/GridHook.sol";
+import {GridHookFixture} from "./utils/GridHookFixture.sol";
 
 
 
-contract GridHookTest is Test, Deployers {
+contract GridHookTest is GridHookFixture {
      // Use the libraries
     using StateLibrary for IPoolManager;
     using PoolIdLibrary for PoolKey;
     using CurrencyLibrary for Currency;
 
-    // The two currencies (tokens) from the pool
-    Currency token0;
-    Currency token1;
-
     address public bob = makeAddr("Bob");
     address public alice = makeAddr("Alice");
 
-    GridHook hook;
-
     function setUp() public {
-        // Deploy uniswap v4 pool manager + periphery contracts
-        // - https://github.com/Uniswap/v4-core/blob/main/test/utils/Deployers.sol#L86-L104
-        deployFreshManagerAndRouters();
-
-        // Deploy two test tokens
-        (token0, token1) = deployMintAndApprove2Currencies();
-
-        // Select hook trigger flags
-        uint160 flags = uint160(Hooks.AFTER_INITIALIZE_FLAG | Hooks.AFTER_SWAP_FLAG);
-        address hookAddress = address(flags);
-        // Deploy to anvil with vm.etch: hook name + constructor + hook flags
-        // @note Must use `HookMiner` library to deploy to actual blockchain
-        deployCodeTo("GridHook.sol", abi.encode(manager, ""), hookAddress);
-        hook = GridHook(hookAddress);
-
-        // Approve hook address to spend these tokens as well
-        MockERC20(Currency.unwrap(token0)).approve(address(hook), type(uint256).max);
-        MockERC20(Currency.unwrap(token1)).approve(address(hook), type(uint256).max);
-
-        // Create a pool
+        // Manager, routers, tokens and the hook at its flag address, see GridHookFixture
+        deployHook();
+
+        // Create a pool, the fee-derived tick spacing (20) is what these tests were written against
         (key, ) = initPool({
             _currency0: token0,           // Currency0
             _currency1: token1,           // Currency1
@@ -64,40 +39,10 @@ contract GridHookTest is Test, Deployers {
             sqrtPriceX96: SQRT_PRICE_1_1  // Exchange rate 1:1
         });
 
-
-        // Add liquidity from -60 to +60 tick range
-        modifyLiquidityRouter.modifyLiquidity(
-            key,
-            IPoolManager.ModifyLiquidityParams({
-                tickLower: -60,
-                tickUpper: 60,
-                liquidityDelta: 10 ether,
-                salt: bytes32(0)
-            }),
-            ZERO_BYTES
-        );
-        // Add liquidity from -120 to +120 tick range
-        modifyLiquidityRouter.modifyLiquidity(
-            key,
-            IPoolManager.ModifyLiquidityParams({
-                tickLower: -120,
-                tickUpper: 120,
-                liquidityDelta: 10 ether,
-                salt: bytes32(0)
-            }),
-            ZERO_BYTES
-        );
-        // Add liquidity for full range
-        modifyLiquidityRouter.modifyLiquidity(
-            key,
-            IPoolManager.ModifyLiquidityParams({
-                tickLower: TickMath.minUsableTick(60),
-                tickUpper: TickMath.maxUsableTick(60),
-                liquidityDelta: 10 ether,
-                salt: bytes32(0)
-            }),
-            ZERO_BYTES
-        );
+        // Liquidity from -60 to +60, from -120 to +120 and over the full range
+        addLiquidity(key, -60, 60, 10 ether);
+        addLiquidity(key, -120, 120, 10 ether);
+        addLiquidity(key, TickMath.minUsableTick(60), TickMath.maxUsableTick(60), 10 ether);
     }
 
 
@@ -152,10 +97,6 @@ contract GridHookTest is Test, Deployers {
         hook.offChainComputation(burns, newOrders, newBalances);
     }
 
-    function onERC1155Received(address, address, uint256, uint256, bytes calldata) external pure returns (bytes4) {
-        return this.onERC1155Received.selector;
-    }
-
 
     function test_orderExecute_zeroForOne() public {
         int24 tick = 100;
@@ -197,7 +138,6 @@ contract GridHookTest is Test, Deployers {
 
         assertEq(newtoken1Balance - originaltoken1Balance, claimableOutputTokens);
     }
-`
 
     function test_orderExecute_zeroForOne_rebuy() public {
         int24 tick = 100;
@@ -276,6 +216,175 @@ contract GridHookTest is Test, Deployers {
         hook.offChainComputation(burns, newOrders, newBalances);
     }
 
+    function test_events_placeAndFill() public {
+        uint256 amount = 1 ether;
+
+        vm.expectEmit(true, true, true, true, address(hook));
+        emit GridHook.OrderPlaced(key.toId(), address(this), 100, true, amount);
+        int24 tickLower = hook.placeOrder(key, 100, true, amount);
+
+        // Only check the indexed fields, the output amount depends on the pool state
+        vm.expectEmit(true, true, true, false, address(hook));
+        emit GridHook.OrderFilled(key.toId(), tickLower, true, amount, 0);
+        swapRouter.swap(
+            key,
+            IPoolManager.SwapParams({zeroForOne: false, amountSpecified: -1 ether, sqrtPriceLimitX96: TickMath.MAX_SQRT_PRICE - 1}),
+            PoolSwapTest.TestSettings({takeClaims: false, settleUsingBurn: false}),
+            ZERO_BYTES
+        );
+
+        uint256 positionId = hook.getPositionId(key, tickLower, true);
+        uint256 claimable = hook.claimableOutputTokens(positionId);
+        vm.expectEmit(true, true, true, true, address(hook));
+        emit GridHook.Redeemed(positionId, address(this), amount, claimable);
+        hook.redeem(key, tickLower, true, amount);
+    }
+
+    function test_getPositionsBatch() public {
+        hook.placeOrder(key, 60, true, 1 ether);
+        hook.placeOrder(key, -60, false, 2 ether);
+
+        int24[] memory ticks = new int24[](3);
+        ticks[0] = -60;
+        ticks[1] = 0;
+        ticks[2] = 60;
+        (uint256[] memory pending, uint256[] memory supply, uint256[] memory claimable, uint256[] memory balances) =
+            hook.getPositionsBatch(key, address(this), ticks);
+
+        assertEq(pending.length, 6);
+        // [-60 zeroForOne, -60 oneForZero, 0 zeroForOne, 0 oneForZero, 60 zeroForOne, 60 oneForZero]
+        assertEq(pending[1], 2 ether);
+        assertEq(supply[1], 2 ether);
+        assertEq(balances[1], 2 ether);
+        assertEq(pending[4], 1 ether);
+        assertEq(supply[4], 1 ether);
+        assertEq(balances[4], 1 ether);
+        assertEq(pending[0] + pending[2] + pending[3] + pending[5], 0);
+        assertEq(claimable[1] + claimable[4], 0);
+
+        // The range overload reads the same ticks
+        (uint256[] memory rangePending,,, uint256[] memory rangeBalances) =
+            hook.getPositionsBatch(key, address(this), -60, 60, 60);
+        assertEq(keccak256(abi.encode(rangePending)), keccak256(abi.encode(pending)));
+        assertEq(keccak256(abi.encode(rangeBalances)), keccak256(abi.encode(balances)));
+
+        (, , , balances) = hook.getPositionsBatch(key, bob, ticks);
+        assertEq(balances[4], 0);
+    }
+
+    function test_activeTicks_trackOrders() public {
+        hook.placeOrder(key, 60, true, 1 ether);
+        hook.placeOrder(key, 120, true, 1 ether);
+        hook.placeOrder(key, 60, true, 1 ether);
+
+        (uint128 count, int24 minTick, int24 maxTick) = hook.activeTicks(key.toId(), true);
+        assertEq(count, 2);
+        assertEq(minTick, 60);
+        assertEq(maxTick, 120);
+
+        (count,,) = hook.activeTicks(key.toId(), false);
+        assertEq(count, 0);
+
+        hook.cancelOrder(key, 120, true, 1 ether);
+        (count,,) = hook.activeTicks(key.toId(), true);
+        assertEq(count, 1);
+
+        hook.cancelOrder(key, 60, true, 2 ether);
+        (count,,) = hook.activeTicks(key.toId(), true);
+        assertEq(count, 0);
+    }
+
+    function test_afterSwap_skipsWhenNoOrdersCrossed() public {
+        // A zeroForOne order far above the swap range stays untouched, but the last tick still moves
+        hook.placeOrder(key, 6000, true, 1 ether);
+
+        swapRouter.swap(
+            key,
+            IPoolManager.SwapParams({zeroForOne: false, amountSpecified: -0.1 ether, sqrtPriceLimitX96: TickMath.MAX_SQRT_PRICE - 1}),
+            PoolSwapTest.TestSettings({takeClaims: false, settleUsingBurn: false}),
+            ZERO_BYTES
+        );
+
+        (, int24 currentTick,,) = manager.getSlot0(key.toId());
+        assertGt(currentTick, 0);
+        assertEq(hook.lastTicks(key.toId()), currentTick);
+        assertEq(hook.pendingOrders(key.toId(), 6000, true), 1 ether);
+    }
+
+    function test_offChainComputation_groupsRepeatedPositions() public {
+        // Three entries for the same owner and position, then a second position
+        GridHook.NewOrder[] memory newOrders = new GridHook.NewOrder[](4);
+        for (uint256 i = 0; i < 3; i++) {
+            newOrders[i] = GridHook.NewOrder({owner: bob, key: key, tickToSellAt: 60, zeroForOne: true, inputAmount: 1 ether});
+        }
+        newOrders[3] = GridHook.NewOrder({owner: bob, key: key, tickToSellAt: 120, zeroForOne: true, inputAmount: 2 ether});
+
+        hook.offChainComputation(new GridHook.BurnToken[](0), newOrders, new GridHook.Balances[](0));
+
+        uint256 positionId = hook.getPositionId(key, 60, true);
+        assertEq(hook.pendingOrders(key.toId(), 60, true), 3 ether);
+        assertEq(hook.claimTokensSupply(positionId), 3 ether);
+        assertEq(hook.balanceOf(bob, positionId), 3 ether);
+        assertEq(hook.balanceOf(bob, hook.getPositionId(key, 120, true)), 2 ether);
+
+        // Burn the first position back in two entries, the second one untouched
+        GridHook.BurnToken[] memory burns = new GridHook.BurnToken[](2);
+        for (uint256 i = 0; i < 2; i++) {
+            burns[i] = GridHook.BurnToken({
+                key: key,
+                tick: 60,
+                zeroForOne: true,
+                owner: bob,
+                amount: 1 ether,
+                amountPendingRemove: 1 ether
+            });
+        }
+        hook.offChainComputation(burns, new GridHook.NewOrder[](0), new GridHook.Balances[](0));
+
+        assertEq(hook.pendingOrders(key.toId(), 60, true), 1 ether);
+        assertEq(hook.claimTokensSupply(positionId), 1 ether);
+        assertEq(hook.balanceOf(bob, positionId), 1 ether);
+    }
+
+    function test_offChainRebuy_groupsRepeatedPositions() public {
+        GridHook.NewOrder[] memory newOrders = new GridHook.NewOrder[](2);
+        newOrders[0] = GridHook.NewOrder({owner: bob, key: key, tickToSellAt: 60, zeroForOne: true, inputAmount: 2 ether});
+        newOrders[1] = GridHook.NewOrder({owner: alice, key: key, tickToSellAt: 60, zeroForOne: true, inputAmount: 2 ether});
+        hook.offChainComputation(new GridHook.BurnToken[](0), newOrders, new GridHook.Balances[](0));
+
+        // Pretend the position was filled for 8 token1
+        uint256 positionId = hook.getPositionId(key, 60, true);
+        GridHook.Balances[] memory newBalances = new GridHook.Balances[](1);
+        newBalances[0] = GridHook.Balances({
+            idClaimable: positionId,
+            claimableOutputTokensPrev: 0,
+            claimableOutputTokensNew: 8 ether,
+            idPending: key,
+            tick: 60,
+            zeroForOne: true,
+            pendingOrdersPrev: 4 ether,
+            pendingOrdersNew: 0
+        });
+        hook.offChainComputation(new GridHook.BurnToken[](0), new GridHook.NewOrder[](0), newBalances);
+
+        // Bob rolls his claim over in two halves, Alice in one go
+        GridHook.RebuyOrder[] memory rebuys = new GridHook.RebuyOrder[](3);
+        rebuys[0] = GridHook.RebuyOrder({owner: bob, positionId: positionId, key: key, tick: 0, zeroForOne: false, amount: 1 ether});
+        rebuys[1] = GridHook.RebuyOrder({owner: bob, positionId: positionId, key: key, tick: 0, zeroForOne: false, amount: 1 ether});
+        rebuys[2] = GridHook.RebuyOrder({owner: alice, positionId: positionId, key: key, tick: 0, zeroForOne: false, amount: 2 ether});
+        hook.offChainRebuy(rebuys);
+
+        uint256 rebuyPositionId = hook.getPositionId(key, 0, false);
+        assertEq(hook.balanceOf(bob, positionId), 0);
+        assertEq(hook.balanceOf(alice, positionId), 0);
+        assertEq(hook.claimTokensSupply(positionId), 0);
+        assertEq(hook.claimableOutputTokens(positionId), 0);
+        assertEq(hook.balanceOf(bob, rebuyPositionId), 4 ether);
+        assertEq(hook.balanceOf(alice, rebuyPositionId), 4 ether);
+        assertEq(hook.claimTokensSupply(rebuyPositionId), 8 ether);
+        assertEq(hook.pendingOrders(key.toId(), 0, false), 8 ether);
+    }
+
     function test_orderExecute_oneForZero() public {
         int24 tick = -100;
         uint256 amount = 10 ether;
@@ -375,15 +484,4 @@ contract GridHookTest is Test, Deployers {
         tokensLeftToSell = hook.pendingOrders(key.toId(), 60, true);
         assertEq(tokensLeftToSell, 0);
     }
-
-    function onERC1155BatchReceived(address, address, uint256[] calldata, uint256[] calldata, bytes calldata)
-        external
-        pure
-        returns (bytes4)
-    {
-        return this.onERC1155BatchReceived.selector;
-    }
-
-
-
-}
\ No newline at end of file
+}
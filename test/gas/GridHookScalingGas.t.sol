@@ -0,0 +1,163 @@
+// SPDX-License-Identifier: UNLICENSED
+pragma solidity ^0.8.0;
+
+import {IHooks} from "v4-core/src/interfaces/IHooks.sol";
+import {PoolKey} from "v4-core/src/types/PoolKey.sol";
+import {Currency} from "v4-core/src/types/Currency.sol";
+import {MockERC20} from "solmate/src/test/utils/mocks/MockERC20.sol";
+
+import {GridHookFixture} from "../utils/GridHookFixture.sol";
+
+/// @notice Sweeps GridHook hot paths over the number of active ticks, orders per tick, swap size
+/// and grid spacing. Each case starts from the same state and writes one entry to
+/// `snapshots/GridHookScaling.json`; the batch entry points are covered by `OffChainBatchGas.t.sol`.
+/// @dev Run with `FOUNDRY_PROFILE=gas forge test --match-path "test/gas/*"` so every call is
+/// metered as its own transaction, then compare runs with `agent/src/utils/gas_report.py`.
+contract GridHookScalingGasTest is GridHookFixture {
+    string constant GROUP = "GridHookScaling";
+    uint256 constant ORDER_AMOUNT = 0.01 ether;
+
+    uint256[] activeTickCounts = [uint256(1), 5, 20];
+    uint256[] ordersPerTickCounts = [uint256(1), 10, 50];
+    uint256[] swapAmounts = [uint256(0.01 ether), 0.1 ether, 1 ether];
+    int24[] tickSpacings = [int24(10), 60, 200];
+    uint256[] gridSizes = [uint256(10), 50, 200];
+
+    function setUp() public {
+        deployHookAndPool(60);
+    }
+
+    function test_placeOrder_activeTicks() public {
+        for (uint256 i = 0; i < activeTickCounts.length; i++) {
+            uint256 snapshot = vm.snapshotState();
+            uint256 n = activeTickCounts[i];
+            _placeLadder(key, n, 1);
+
+            // One more order on a fresh tick, and one on a tick that already holds an order
+            hook.placeOrder(key, int24(int256(n + 1)) * key.tickSpacing, true, ORDER_AMOUNT);
+            vm.snapshotGasLastCall(GROUP, string.concat("placeOrder_newTick_activeTicks_", vm.toString(n)));
+            hook.placeOrder(key, key.tickSpacing, true, ORDER_AMOUNT);
+            vm.snapshotGasLastCall(GROUP, string.concat("placeOrder_existingTick_activeTicks_", vm.toString(n)));
+
+            vm.revertToState(snapshot);
+        }
+    }
+
+    function test_createGridPosition_gridSizeAndSpacing() public {
+        for (uint256 i = 0; i < gridSizes.length; i++) {
+            for (uint256 j = 0; j < tickSpacings.length; j++) {
+                uint256 snapshot = vm.snapshotState();
+                int24 gridSpacing = tickSpacings[j];
+                int24 lowerTick = -int24(int256(gridSizes[i] / 2)) * gridSpacing;
+                int24 upperTick = lowerTick + int24(int256(gridSizes[i] - 1)) * gridSpacing;
+
+                hook.createGridPosition(key, lowerTick, upperTick, gridSpacing, ORDER_AMOUNT);
+                vm.snapshotGasLastCall(
+                    GROUP,
+                    string.concat(
+                        "createGridPosition_grids_", vm.toString(gridSizes[i]), "_spacing_", vm.toString(gridSpacing)
+                    )
+                );
+
+                vm.revertToState(snapshot);
+            }
+        }
+    }
+
+    function test_afterSwap_activeTicksAndSwapSize() public {
+        for (uint256 i = 0; i < activeTickCounts.length; i++) {
+            for (uint256 j = 0; j < swapAmounts.length; j++) {
+                uint256 snapshot = vm.snapshotState();
+                _placeLadder(key, activeTickCounts[i], 1);
+
+                swapExactIn(key, false, swapAmounts[j]);
+                vm.snapshotGasLastCall(
+                    GROUP,
+                    string.concat(
+                        "afterSwap_activeTicks_", vm.toString(activeTickCounts[i]), "_swap_", vm.toString(swapAmounts[j])
+                    )
+                );
+
+                vm.revertToState(snapshot);
+            }
+        }
+    }
+
+    function test_afterSwap_ordersPerTick() public {
+        for (uint256 i = 0; i < ordersPerTickCounts.length; i++) {
+            uint256 snapshot = vm.snapshotState();
+            _placeLadder(key, 5, ordersPerTickCounts[i]);
+
+            swapExactIn(key, false, 0.1 ether);
+            vm.snapshotGasLastCall(GROUP, string.concat("afterSwap_ordersPerTick_", vm.toString(ordersPerTickCounts[i])));
+
+            vm.revertToState(snapshot);
+        }
+    }
+
+    function test_afterSwap_tickSpacing() public {
+        for (uint256 i = 0; i < tickSpacings.length; i++) {
+            uint256 snapshot = vm.snapshotState();
+            // setUp already initialized and seeded the pool with this spacing, a second initPool would revert
+            PoolKey memory poolKey = key;
+            if (tickSpacings[i] != key.tickSpacing) {
+                (poolKey,) = initPool(token0, token1, IHooks(address(hook)), 1000, tickSpacings[i], SQRT_PRICE_1_1);
+                addDefaultLiquidity(poolKey);
+            }
+            _placeLadder(poolKey, 5, 1);
+
+            swapExactIn(poolKey, false, 0.1 ether);
+            vm.snapshotGasLastCall(GROUP, string.concat("afterSwap_tickSpacing_", vm.toString(tickSpacings[i])));
+
+            vm.revertToState(snapshot);
+        }
+    }
+
+    function test_redeem_ordersPerTick() public {
+        for (uint256 i = 0; i < ordersPerTickCounts.length; i++) {
+            uint256 snapshot = vm.snapshotState();
+            uint256 n = ordersPerTickCounts[i];
+            _placeLadder(key, 1, n);
+            swapExactIn(key, false, 0.5 ether);
+
+            // First and last claimant of the same filled position
+            address first = _owner(0);
+            address last = _owner(n - 1);
+            vm.prank(first);
+            hook.redeem(key, key.tickSpacing, true, ORDER_AMOUNT);
+            vm.snapshotGasLastCall(GROUP, string.concat("redeem_first_ordersPerTick_", vm.toString(n)));
+            if (n > 1) {
+                vm.prank(last);
+                hook.redeem(key, key.tickSpacing, true, ORDER_AMOUNT);
+                vm.snapshotGasLastCall(GROUP, string.concat("redeem_last_ordersPerTick_", vm.toString(n)));
+            }
+
+            vm.revertToState(snapshot);
+        }
+    }
+
+    /// @dev Places `ordersPerTick` zeroForOne orders, one per owner, on each of the first
+    /// `activeTicks` usable ticks above the current tick.
+    function _placeLadder(PoolKey memory poolKey, uint256 activeTicks, uint256 ordersPerTick) internal {
+        for (uint256 t = 1; t <= activeTicks; t++) {
+            for (uint256 o = 0; o < ordersPerTick; o++) {
+                address owner = _owner(o);
+                _fund(poolKey, owner);
+                vm.prank(owner);
+                hook.placeOrder(poolKey, int24(int256(t)) * poolKey.tickSpacing, true, ORDER_AMOUNT);
+            }
+        }
+    }
+
+    function _fund(PoolKey memory poolKey, address owner) internal {
+        MockERC20 sellToken = MockERC20(Currency.unwrap(poolKey.currency0));
+        if (sellToken.allowance(owner, address(hook)) != 0) return;
+        sellToken.mint(owner, 1_000 ether);
+        vm.prank(owner);
+        sellToken.approve(address(hook), type(uint256).max);
+    }
+
+    function _owner(uint256 index) internal returns (address) {
+        return makeAddr(string.concat("owner", vm.toString(index)));
+    }
+}
@@ -0,0 +1,155 @@
+// SPDX-License-Identifier: UNLICENSED
+pragma solidity ^0.8.0;
+
+import {GridHook} from "../../src/GridHook.sol";
+import {GridHookFixture} from "../utils/GridHookFixture.sol";
+
+/// @notice Gas benchmark for the owner-only batch entry points at 10, 100 and 1000 entries.
+/// @dev Results are written to `snapshots/OffChainBatch.json` by `forge test --match-path "test/gas/*"`.
+contract OffChainBatchGasTest is GridHookFixture {
+    string constant GROUP = "OffChainBatch";
+    uint256 constant OWNERS = 10;
+    uint256 constant AMOUNT = 1 ether;
+
+    function setUp() public {
+        deployHookAndPool(60);
+    }
+
+    function test_offChainComputation_orders_10() public {
+        _benchOrders(10);
+    }
+
+    function test_offChainComputation_orders_100() public {
+        _benchOrders(100);
+    }
+
+    function test_offChainComputation_orders_1000() public {
+        _benchOrders(1000);
+    }
+
+    function test_offChainComputation_repeatedOrders_10() public {
+        _benchRepeatedOrders(10);
+    }
+
+    function test_offChainComputation_repeatedOrders_100() public {
+        _benchRepeatedOrders(100);
+    }
+
+    function test_offChainComputation_repeatedOrders_1000() public {
+        _benchRepeatedOrders(1000);
+    }
+
+    function test_offChainComputation_burns_10() public {
+        _benchBurns(10);
+    }
+
+    function test_offChainComputation_burns_100() public {
+        _benchBurns(100);
+    }
+
+    function test_offChainComputation_burns_1000() public {
+        _benchBurns(1000);
+    }
+
+    function test_offChainRebuy_10() public {
+        _benchRebuy(10);
+    }
+
+    function test_offChainRebuy_100() public {
+        _benchRebuy(100);
+    }
+
+    function test_offChainRebuy_1000() public {
+        _benchRebuy(1000);
+    }
+
+    /// @dev `n` orders on `n` distinct positions, spread over `OWNERS` owners and grouped by owner.
+    function _benchOrders(uint256 n) internal {
+        GridHook.NewOrder[] memory orders = _distinctOrders(n);
+        hook.offChainComputation(new GridHook.BurnToken[](0), orders, new GridHook.Balances[](0));
+        vm.snapshotGasLastCall(GROUP, string.concat("offChainComputation_orders_", vm.toString(n)));
+    }
+
+    /// @dev `n` entries for one owner and one position, which collapse into a single update.
+    function _benchRepeatedOrders(uint256 n) internal {
+        address owner = makeAddr("owner0");
+        GridHook.NewOrder[] memory orders = new GridHook.NewOrder[](n);
+        for (uint256 i = 0; i < n; i++) {
+            orders[i] = GridHook.NewOrder({owner: owner, key: key, tickToSellAt: 60, zeroForOne: true, inputAmount: AMOUNT});
+        }
+        hook.offChainComputation(new GridHook.BurnToken[](0), orders, new GridHook.Balances[](0));
+        vm.snapshotGasLastCall(GROUP, string.concat("offChainComputation_repeatedOrders_", vm.toString(n)));
+
+        assertEq(hook.balanceOf(owner, hook.getPositionId(key, 60, true)), n * AMOUNT);
+    }
+
+    function _benchBurns(uint256 n) internal {
+        GridHook.NewOrder[] memory orders = _distinctOrders(n);
+        hook.offChainComputation(new GridHook.BurnToken[](0), orders, new GridHook.Balances[](0));
+
+        GridHook.BurnToken[] memory burns = new GridHook.BurnToken[](n);
+        for (uint256 i = 0; i < n; i++) {
+            burns[i] = GridHook.BurnToken({
+                key: key,
+                tick: orders[i].tickToSellAt,
+                zeroForOne: orders[i].zeroForOne,
+                owner: orders[i].owner,
+                amount: AMOUNT,
+                amountPendingRemove: AMOUNT
+            });
+        }
+        hook.offChainComputation(burns, new GridHook.NewOrder[](0), new GridHook.Balances[](0));
+        vm.snapshotGasLastCall(GROUP, string.concat("offChainComputation_burns_", vm.toString(n)));
+    }
+
+    function _benchRebuy(uint256 n) internal {
+        GridHook.NewOrder[] memory orders = _distinctOrders(n);
+        hook.offChainComputation(new GridHook.BurnToken[](0), orders, new GridHook.Balances[](0));
+
+        // Mark every position as filled so the rebuy has output tokens to roll over
+        GridHook.Balances[] memory filled = new GridHook.Balances[](n);
+        for (uint256 i = 0; i < n; i++) {
+            filled[i] = GridHook.Balances({
+                idClaimable: hook.getPositionId(key, orders[i].tickToSellAt, true),
+                claimableOutputTokensPrev: 0,
+                claimableOutputTokensNew: AMOUNT,
+                idPending: key,
+                tick: orders[i].tickToSellAt,
+                zeroForOne: true,
+                pendingOrdersPrev: AMOUNT,
+                pendingOrdersNew: 0
+            });
+        }
+        hook.offChainComputation(new GridHook.BurnToken[](0), new GridHook.NewOrder[](0), filled);
+
+        GridHook.RebuyOrder[] memory rebuys = new GridHook.RebuyOrder[](n);
+        for (uint256 i = 0; i < n; i++) {
+            rebuys[i] = GridHook.RebuyOrder({
+                owner: orders[i].owner,
+                positionId: filled[i].idClaimable,
+                key: key,
+                tick: orders[i].tickToSellAt - 60,
+                zeroForOne: false,
+                amount: AMOUNT
+            });
+        }
+        hook.offChainRebuy(rebuys);
+        vm.snapshotGasLastCall(GROUP, string.concat("offChainRebuy_", vm.toString(n)));
+    }
+
+    /// @dev One order per position, on ticks 0, 60, 120, ... so every position holds exactly `AMOUNT`.
+    /// Consecutive runs of `n / OWNERS` orders share an owner.
+    function _distinctOrders(uint256 n) internal returns (GridHook.NewOrder[] memory orders) {
+        orders = new GridHook.NewOrder[](n);
+        uint256 perOwner = n / OWNERS;
+        for (uint256 i = 0; i < n; i++) {
+            orders[i] = GridHook.NewOrder({
+                owner: makeAddr(string.concat("owner", vm.toString(i / perOwner))),
+                key: key,
+                tickToSellAt: int24(int256(i)) * 60,
+                zeroForOne: true,
+                inputAmount: AMOUNT
+            });
+        }
+    }
+}
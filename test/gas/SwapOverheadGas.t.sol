@@ -0,0 +1,55 @@
+// SPDX-License-Identifier: UNLICENSED
+pragma solidity ^0.8.0;
+
+import {IHooks} from "v4-core/src/interfaces/IHooks.sol";
+import {PoolKey} from "v4-core/src/types/PoolKey.sol";
+
+import {GridHookFixture} from "../utils/GridHookFixture.sol";
+
+/// @notice Gas of a plain swap on a pool without hooks versus the same swap through GridHook.
+/// @dev Results are written to `snapshots/SwapOverhead.json`.
+contract SwapOverheadGasTest is GridHookFixture {
+    string constant GROUP = "SwapOverhead";
+    uint256 constant SWAP_AMOUNT = 0.1 ether;
+
+    PoolKey noHookKey;
+
+    function setUp() public {
+        deployHookAndPool(60);
+
+        // Same tokens, fee and liquidity, no hook attached
+        (noHookKey,) = initPool(token0, token1, IHooks(address(0)), 1000, 60, SQRT_PRICE_1_1);
+        addDefaultLiquidity(noHookKey);
+    }
+
+    function test_swap_noHook() public {
+        swapExactIn(noHookKey, false, SWAP_AMOUNT);
+        vm.snapshotGasLastCall(GROUP, "swap_noHook");
+    }
+
+    function test_swap_hook_noOrders() public {
+        swapExactIn(key, false, SWAP_AMOUNT);
+        vm.snapshotGasLastCall(GROUP, "swap_hook_noOrders");
+    }
+
+    function test_swap_hook_ordersOtherDirection() public {
+        // oneForZero orders are only executed when the tick goes down
+        hook.placeOrder(key, 60, false, 1 ether);
+        swapExactIn(key, false, SWAP_AMOUNT);
+        vm.snapshotGasLastCall(GROUP, "swap_hook_ordersOtherDirection");
+    }
+
+    function test_swap_hook_ordersOutOfRange() public {
+        hook.placeOrder(key, 6000, true, 1 ether);
+        swapExactIn(key, false, SWAP_AMOUNT);
+        vm.snapshotGasLastCall(GROUP, "swap_hook_ordersOutOfRange");
+    }
+
+    function test_swap_hook_ordersInRangeNotFilled() public {
+        // Bounds overlap the crossed range but no order sits on a crossed tick, so the slow path runs
+        hook.placeOrder(key, -6000, true, 1 ether);
+        hook.placeOrder(key, 6000, true, 1 ether);
+        swapExactIn(key, false, SWAP_AMOUNT);
+        vm.snapshotGasLastCall(GROUP, "swap_hook_ordersInRangeNotFilled");
+    }
+}
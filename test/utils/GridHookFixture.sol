@@ -0,0 +1,90 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.24;
+
+import {Test} from "forge-std/Test.sol";
+import {Deployers} from "@uniswap/v4-core/test/utils/Deployers.sol";
+import {MockERC20} from "solmate/src/test/utils/mocks/MockERC20.sol";
+import {PoolSwapTest} from "v4-core/src/test/PoolSwapTest.sol";
+import {IPoolManager} from "v4-core/src/interfaces/IPoolManager.sol";
+import {IHooks} from "v4-core/src/interfaces/IHooks.sol";
+import {Currency} from "v4-core/src/types/Currency.sol";
+import {PoolKey} from "v4-core/src/types/PoolKey.sol";
+import {Hooks} from "v4-core/src/libraries/Hooks.sol";
+import {TickMath} from "v4-core/src/libraries/TickMath.sol";
+
+import {GridHook} from "../../src/GridHook.sol";
+
+/// @notice Shared setup for GridHook tests and gas benchmarks: deploys the manager, routers,
+/// two tokens, the hook at its flag address and a pool with liquidity around the current tick.
+abstract contract GridHookFixture is Test, Deployers {
+    Currency token0;
+    Currency token1;
+
+    GridHook hook;
+
+    function deployHookAndPool(int24 tickSpacing) internal {
+        deployHook();
+        (key,) = initPool(token0, token1, IHooks(address(hook)), 1000, tickSpacing, SQRT_PRICE_1_1);
+        addDefaultLiquidity(key);
+    }
+
+    /// @dev Manager, routers, both tokens and the hook at its flag address, approved for the hook. No pool yet.
+    function deployHook() internal {
+        deployFreshManagerAndRouters();
+        (token0, token1) = deployMintAndApprove2Currencies();
+
+        uint160 flags = uint160(Hooks.AFTER_INITIALIZE_FLAG | Hooks.AFTER_SWAP_FLAG);
+        deployCodeTo("GridHook.sol", abi.encode(manager, ""), address(flags));
+        hook = GridHook(address(flags));
+
+        MockERC20(Currency.unwrap(token0)).approve(address(hook), type(uint256).max);
+        MockERC20(Currency.unwrap(token1)).approve(address(hook), type(uint256).max);
+    }
+
+    /// @dev Two narrow ranges around tick 0 plus full range liquidity.
+    function addDefaultLiquidity(PoolKey memory poolKey) internal {
+        int24 tickSpacing = poolKey.tickSpacing;
+        addLiquidity(poolKey, -tickSpacing, tickSpacing, 10 ether);
+        addLiquidity(poolKey, -2 * tickSpacing, 2 * tickSpacing, 10 ether);
+        addLiquidity(poolKey, TickMath.minUsableTick(tickSpacing), TickMath.maxUsableTick(tickSpacing), 10 ether);
+    }
+
+    function addLiquidity(PoolKey memory poolKey, int24 tickLower, int24 tickUpper, int256 liquidityDelta) internal {
+        modifyLiquidityRouter.modifyLiquidity(
+            poolKey,
+            IPoolManager.ModifyLiquidityParams({
+                tickLower: tickLower,
+                tickUpper: tickUpper,
+                liquidityDelta: liquidityDelta,
+                salt: bytes32(0)
+            }),
+            ZERO_BYTES
+        );
+    }
+
+    /// @dev Exact input swap with no price limit.
+    function swapExactIn(PoolKey memory poolKey, bool zeroForOne, uint256 amountIn) internal {
+        swapRouter.swap(
+            poolKey,
+            IPoolManager.SwapParams({
+                zeroForOne: zeroForOne,
+                amountSpecified: -int256(amountIn),
+                sqrtPriceLimitX96: zeroForOne ? TickMath.MIN_SQRT_PRICE + 1 : TickMath.MAX_SQRT_PRICE - 1
+            }),
+            PoolSwapTest.TestSettings({takeClaims: false, settleUsingBurn: false}),
+            ZERO_BYTES
+        );
+    }
+
+    function onERC1155Received(address, address, uint256, uint256, bytes calldata) external pure returns (bytes4) {
+        return this.onERC1155Received.selector;
+    }
+
+    function onERC1155BatchReceived(address, address, uint256[] calldata, uint256[] calldata, bytes calldata)
+        external
+        pure
+        returns (bytes4)
+    {
+        return this.onERC1155BatchReceived.selector;
+    }
+}